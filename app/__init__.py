@@ -1,11 +1,13 @@
 # location: app/__init__.py
-# Lädt Einstellungen beim Start und stellt sie effizient für Templates bereit.
+# warm_caches/after_fork für den Gunicorn-Betrieb (wsgi.py): Caches vor dem Fork laden, im Worker alle Sperren neu anlegen.
 
-from flask import Flask
+from flask import Flask, jsonify
 import json
 import os
 from .config import Config
-from .extensions import data_manager
+from .extensions import catalog, data_manager, profiler, render_cache, search_index, settings_service, telemetry, template_registry
+from .services.json_service import VersionConflictError
+from .services.session_store import create_session_interface
 
 def create_app(mode='offline', settings=None):
     """
@@ -17,17 +19,29 @@ def create_app(mode='offline', settings=None):
     # Die initialen Einstellungen werden beim Start geladen
     if settings is None:
         settings = {}
-    app.config['APP_SETTINGS'] = settings
+    settings_service.init_app(app, initial=settings)  # setzt auch app.config['APP_SETTINGS']
     if settings.get('debug_mode'):
         print("DEBUG-MODUS ist aktiviert.")
 
     data_manager.init_app(mode, app_config=app.config)
+    data_manager.init_request_hooks(app)
+    telemetry.init_app(app, data_manager)
+    profiler.init_app(app, data_manager)
+    render_cache.init_app(app, data_manager)
+    search_index.init_app(app, data_manager)
+    catalog.init_app(app, data_manager)
+    template_registry.init_app(app, data_manager)
+    session_interface = create_session_interface(app.config)
+    if session_interface is not None: app.session_interface = session_interface
 
-    # KORRIGIERT: Dieser Context Processor liest die Einstellungen nun effizient
-    # aus der App-Konfiguration, anstatt bei jeder Anfrage die Datei neu zu laden.
+    # Liefert den Schnappschuss aus dem Speicher; Änderungen anderer Worker zieht der Watcher nach
     @app.context_processor
     def inject_settings():
-        return dict(app_settings=app.config.get('APP_SETTINGS', {}))
+        return dict(app_settings=settings_service.snapshot())
+
+    @app.errorhandler(VersionConflictError)
+    def handle_version_conflict(e):
+        return jsonify({'status': 'error', 'message': str(e), 'retryable': True}), 409
 
     from .routes.main import main_bp
     from .routes.projects import projects_bp
@@ -39,8 +53,9 @@ def create_app(mode='offline', settings=None):
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(admin_bp, url_prefix='/admin')
 
-    # Erstellt Test-Benutzer, falls der Test-Modus in den initialen Einstellungen aktiv ist
-    if settings.get('test_mode') and mode == 'offline':
+    # Erstellt Test-Benutzer, falls der Test-Modus in den initialen Einstellungen aktiv ist.
+    # Vorhandene werden nur nachgeschlagen; gehasht wird ausschließlich für neu angelegte.
+    if settings.get('test_mode') and mode != 'cloud':
         from .models.user import User
         print("Test-Modus: Überprüfe Test-Benutzer...")
         test_users = {
@@ -53,17 +68,43 @@ def create_app(mode='offline', settings=None):
                 user = User(
                     username=details["username"],
                     email=email,
-                    password=details["password"]
+                    password=details["password"],
+                    hash_method=app.config['PASSWORD_HASH_METHOD']
                 )
                 user.is_admin = details["is_admin"]
                 data_manager.save_user(user.to_dict())
 
-    if mode == 'offline':
+    if mode != 'cloud':
         from .models.project import create_initial_project
         projects = data_manager.get_all_projects()
         if not projects:
             print("Erstelle initiales Beispielprojekt...")
             initial_project = create_initial_project()
+            initial_project.owner = next((user['id'] for user in data_manager.get_all_users() if user.get('is_admin')), None)
             data_manager.save_project(initial_project.to_dict())
 
     return app
+
+def warm_caches():
+    """
+    Lädt Suchindex und Katalog sofort statt beim ersten Request. Mit Gunicorns preload_app geschieht
+    das einmal im Master; die Worker übernehmen die Daten per fork (copy-on-write). Dabei startet
+    kein Hintergrund-Thread, der Master bleibt threadfrei.
+    """
+    search_index.warm()
+    catalog.warm()
+
+def after_fork(app):
+    """
+    Im per fork gestarteten Worker: Verbindungen und Sperren neu anlegen - auch die der DataManager-
+    Beobachter, die bei jedem Aufruf sperren. Hintergrund-Threads starten erst im Worker bei Bedarf.
+    """
+    data_manager.after_fork()
+    settings_service.after_fork()
+    telemetry.after_fork()
+    profiler.after_fork()
+    render_cache.after_fork()
+    search_index.after_fork()
+    catalog.after_fork()
+    store = getattr(app.session_interface, 'store', None)
+    if hasattr(store, 'after_fork'): store.after_fork()
@@ -1,5 +1,5 @@
 # location: app/config.py
-# Konfigurationsdatei für die Anwendung.
+# Konfigurationsdatei für die Anwendung; Verzeichnis der Projektvorlagen und Obergrenze für das Anlegen im Block.
 
 import os
 
@@ -9,6 +9,14 @@ BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 class Config:
     """Enthält Konfigurationsvariablen für die Flask-App."""
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'eine-sehr-geheime-zeichenkette'
+
+    # Globale Einstellungen; Änderungen anderer Worker werden nach spätestens SETTINGS_POLL_INTERVAL Sekunden übernommen
+    SETTINGS_PATH = os.path.join(BASE_DIR, 'settings.json')
+    SETTINGS_POLL_INTERVAL = 1.0
+
+    # Passwort-Hashes (Werkzeug-Syntax, z.B. 'scrypt:32768:8:1' oder 'pbkdf2:sha256:600000').
+    # Ältere Hashes werden beim nächsten erfolgreichen Login mit diesem Verfahren neu erzeugt.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'scrypt:32768:8:1'
     
     # Pfad zur Firebase Service Account Schlüsseldatei im Hauptverzeichnis
     FIREBASE_CREDENTIALS_PATH = os.path.join(BASE_DIR, 'firebase-credentials.json')
@@ -16,3 +24,60 @@ class Config:
     # Pfade für den Offline-Modus (im 'data'-Ordner im Hauptverzeichnis)
     JSON_USERS_PATH = os.path.join(BASE_DIR, 'data', 'users.json')
     JSON_PROJECTS_PATH = os.path.join(BASE_DIR, 'data', 'projects.json')
+
+    # Journal-Modus: Append-only-Log neben den Snapshot-Dateien
+    JSON_JOURNAL_PATH = os.path.join(BASE_DIR, 'data', 'journal.log')
+    JOURNAL_COMPACT_THRESHOLD = 1000  # Einträge, ab denen im Hintergrund kompaktiert wird
+    JOURNAL_FSYNC = True
+
+    # SQLite-Modus: Datenbankdatei; beim ersten Start werden vorhandene JSON-Daten importiert
+    SQLITE_PATH = os.path.join(BASE_DIR, 'data', 'projektplaner.db')
+    SQLITE_IMPORT_JSON = True
+
+    # Sessions: 'memory' (LRU im Prozess), 'sqlite' (für mehrere Worker) oder 'cookie' (Flask-Standard).
+    # Serverseitig enthält das Cookie nur die signierte Session-id; TTL gleitend in Sekunden.
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND') or 'memory'
+    SESSION_SQLITE_PATH = os.path.join(BASE_DIR, 'data', 'sessions.db')
+    SESSION_TTL = 12 * 3600
+    SESSION_MAX_ENTRIES = 10000
+
+    # Request-Telemetrie für die Debug-Konsole (/admin/api/telemetry): Anzahl der gehaltenen Requests
+    TELEMETRY_ENABLED = os.environ.get('TELEMETRY_ENABLED', '1') == '1'
+    TELEMETRY_BUFFER_SIZE = 500
+
+    # Latenz-Histogramme je Backend/Operation unter /admin/metrics; mit PROFILING_METRICS_TOKEN
+    # darf ein Scraper den Endpunkt per 'Authorization: Bearer <token>' auch ohne Admin-Login abrufen
+    PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '1') == '1'
+    PROFILING_BYTES_SAMPLE = 16
+    PROFILING_BYTES_MAX_ENTRIES = 2000  # größere Ergebnisse (Einträge aller Ebenen) werden nicht vermessen
+    PROFILING_METRICS_TOKEN = os.environ.get('PROFILING_METRICS_TOKEN')
+
+    # Gerenderte Dashboard-/Übersichts-/Checklisten-Fragmente im Speicher (LRU) plus ETag/304
+    RENDER_CACHE_ENABLED = os.environ.get('RENDER_CACHE_ENABLED', '1') == '1'
+    RENDER_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+    # Änderungsfeed der Projekte (project_changes): Suchindex und Katalog holen Änderungen anderer
+    # Worker höchstens alle CHANGE_FEED_POLL_INTERVAL Sekunden beim Lesen nach (0 = bei jedem Lesen).
+    # JSON/Journal/Firestore halten je Prozess die letzten CHANGE_FEED_MAX_ENTRIES geänderten Projekte.
+    CHANGE_FEED_POLL_INTERVAL = 2.0
+    CHANGE_FEED_MAX_ENTRIES = 10000
+
+    # Suchindex über Projekt-/Knotennamen und Kommentare; Änderungen werden verzögert gespeichert
+    SEARCH_INDEX_PATH = os.path.join(BASE_DIR, 'data', 'search_index.json')
+    SEARCH_INDEX_SAVE_DELAY = 5.0
+
+    # /discover: Seitengröße und Cache-Dauer für anonyme Besucher (Sekunden)
+    DISCOVER_PAGE_SIZE = 24
+    DISCOVER_MAX_AGE = 60
+
+    # Projektvorlagen (eine JSON-Datei je Vorlage, werden beim Start geladen) und die maximale
+    # Anzahl Projekte je Aufruf von /admin/api/projects/bulk
+    PROJECT_TEMPLATES_DIR = os.path.join(BASE_DIR, 'app', 'project_templates')
+    PROJECT_BULK_MAX = 1000
+
+    # Anzahl der Projekte pro Dashboard-Seite (list_projects)
+    DASHBOARD_PAGE_SIZE = 24
+
+    # Cloud-Modus: AsyncClient mit nebenläufigen Abrufen statt des synchronen Clients
+    FIRESTORE_ASYNC = os.environ.get('FIRESTORE_ASYNC') == '1'
+    FIRESTORE_MAX_CONCURRENCY = 16
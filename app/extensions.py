@@ -2,6 +2,20 @@
 # Diese Datei bricht zirkuläre Importe auf, indem sie gemeinsam genutzte
 # Erweiterungsinstanzen (wie den DataManager) an einem zentralen Ort bereitstellt.
 
+from .services.catalog import PublicCatalog
 from .services.data_manager import DataManager
+from .services.profiling import DataManagerProfiler
+from .services.render_cache import RenderCache
+from .services.search_index import SearchIndex
+from .services.settings_service import SettingsService
+from .services.telemetry import Telemetry
+from .services.template_registry import TemplateRegistry
 
 data_manager = DataManager()
+settings_service = SettingsService()
+telemetry = Telemetry()
+profiler = DataManagerProfiler()
+render_cache = RenderCache()
+search_index = SearchIndex()
+catalog = PublicCatalog()
+template_registry = TemplateRegistry()
@@ -1,27 +1,292 @@
 # location: app/models/project.py
-# Definiert die Datenstruktur für ein Projekt.
+# Projekte ohne Besitzer dürfen nur Administratoren lesen, bearbeiten und verwalten, bis sie einem Benutzer zugeordnet sind.
 
 import uuid
 from datetime import datetime
 
+def _field(name, default=None):
+    """Attribut, das direkt im zugrunde liegenden Dictionary liest und schreibt (keine Kopie)."""
+    return property(lambda self: self._data.get(name, default), lambda self, value: self._data.__setitem__(name, value))
+
+class Node:
+    """Sicht auf einen Strukturknoten (Phase, Aufgabe, Unteraufgabe); teilt sich das Dictionary mit dem Projekt."""
+    __slots__ = ('_data', '_children')
+    def __init__(self, data):
+        self._data = data
+        self._children = None
+    id = _field('id')
+    type = _field('type')
+    name = _field('name')
+    completed = _field('completed', False)
+    comment = _field('comment', '')
+    stats = _field('stats')
+    @property
+    def children(self):
+        """Kindknoten; werden erst beim ersten Zugriff (und nur für diese Ebene) verpackt."""
+        if self._children is None: self._children = [Node(child) for child in self._data.get('children', [])]
+        return self._children
+    def to_dict(self): return self._data
+
 class Project:
     """Repräsentiert ein Projekt mit seinen Phasen, Aufgaben und Unteraufgaben."""
-    def __init__(self, name, template="leer", project_id=None):
+    __slots__ = ('id', 'name', 'template', 'created_at', 'owner', 'members', 'stats', '_structure', '_nodes', '_extra')
+    FIELDS = ('id', 'name', 'template', 'created_at', 'owner', 'members', 'structure', 'stats')
+
+    def __init__(self, name, template="leer", project_id=None, owner=None):
         self.id = project_id or str(uuid.uuid4())
         self.name = name
         self.template = template
         self.created_at = datetime.utcnow().isoformat()
-        self.structure = [] # Liste von Phasen (dict)
+        self.owner = owner # Benutzer-id; None bei Altprojekten (für alle angemeldeten Benutzer sichtbar)
+        self.members = [] # Benutzer-ids mit Zugriff (Freunde des Besitzers)
+        self.stats = {"completed": 0, "total": 0} # Fortschrittszähler, siehe compute_progress
+        self._structure = [] # Liste von Phasen (dict)
+        self._nodes = None
+        self._extra = None # weitere gespeicherte Felder (public, _version, ...), bleiben beim Speichern erhalten
+
+    @property
+    def structure(self): return self._structure
+    @structure.setter
+    def structure(self, value):
+        self._structure = value
+        self._nodes = None
+
+    @property
+    def nodes(self):
+        """Phasen als Node-Objekte; die Struktur wird erst bei Bedarf und ohne Kopie verpackt."""
+        if self._nodes is None: self._nodes = [Node(phase) for phase in self._structure]
+        return self._nodes
 
     def to_dict(self):
-        """Konvertiert das Projektobjekt in ein Dictionary."""
-        return {
+        """Konvertiert das Projektobjekt in ein Dictionary (die Struktur wird nicht kopiert)."""
+        data = dict(self._extra) if self._extra else {}
+        data.update({
             "id": self.id,
             "name": self.name,
             "template": self.template,
             "created_at": self.created_at,
-            "structure": self.structure
-        }
+            "owner": self.owner,
+            "members": self.members,
+            "structure": self._structure,
+            "stats": self.stats
+        })
+        return data
+
+    @staticmethod
+    def from_dict(data):
+        """Erstellt ein Projekt aus einem Dictionary; die Struktur wird übernommen, nicht kopiert oder umgewandelt."""
+        project = Project.__new__(Project)
+        project.id = data.get('id')
+        project.name = data.get('name')
+        project.template = data.get('template', 'leer')
+        project.created_at = data.get('created_at')
+        project.owner = data.get('owner')
+        project.members = data.get('members') or []
+        project.stats = data.get('stats') or {"completed": 0, "total": 0}
+        structure = data.get('structure')
+        project._structure = structure if structure is not None else []
+        project._nodes = None
+        project._extra = {key: value for key, value in data.items() if key not in Project.FIELDS} or None
+        return project
+
+def can_access(project, user_id, is_admin=False):
+    """Lesen und Bearbeiten: Besitzer, Mitglieder und Administratoren. Projekte ohne Besitzer nur Administratoren, bis sie zugeordnet sind."""
+    if is_admin: return True
+    owner = project.get('owner')
+    return bool(owner) and (owner == user_id or user_id in (project.get('members') or ()))
+
+def can_manage(project, user_id, is_admin=False):
+    """Sichtbarkeit und Mitglieder ändern darf nur der Besitzer bzw. ein Administrator (bei Projekten ohne Besitzer nur dieser)."""
+    if is_admin: return True
+    owner = project.get('owner')
+    return bool(owner) and owner == user_id
+
+def compute_progress(project):
+    """
+    Berechnet die Zähler {'completed', 'total'} für jede Aufgabe, jede Phase und das Projekt
+    und speichert sie unter 'stats' in den jeweiligen Knoten. Gibt die Projekt-Zähler zurück.
+    """
+    project_completed, project_total = 0, 0
+    for phase in project.get('structure', []):
+        phase_completed, phase_total = 0, 0
+        for task in phase.get('children', []):
+            subtasks = task.get('children', [])
+            task_completed = sum(1 for subtask in subtasks if subtask.get('completed'))
+            task['stats'] = {'completed': task_completed, 'total': len(subtasks)}
+            phase_completed += task_completed
+            phase_total += len(subtasks)
+        phase['stats'] = {'completed': phase_completed, 'total': phase_total}
+        project_completed += phase_completed
+        project_total += phase_total
+    project['stats'] = {'completed': project_completed, 'total': project_total}
+    return project['stats']
+
+def adjust_progress(project, phase, task, completed_delta, total_delta=0):
+    """
+    Aktualisiert die Zähler inkrementell entlang Aufgabe -> Phase -> Projekt, z.B. wenn eine
+    Unteraufgabe abgehakt (completed_delta=±1) oder hinzugefügt/entfernt (total_delta=±1) wird.
+    """
+    if 'stats' not in project:
+        compute_progress(project)
+        return
+    for node in (task, phase, project):
+        if node is None: continue
+        stats = node.setdefault('stats', {'completed': 0, 'total': 0})
+        stats['completed'] += completed_delta
+        stats['total'] += total_delta
+
+def progress_percent(stats):
+    """Wandelt {'completed', 'total'} in einen Prozentwert (0-100) um."""
+    if not stats or not stats.get('total'): return 0
+    return stats['completed'] / stats['total'] * 100
+
+# Standardfelder der Projektzusammenfassung (list_projects); 'progress' wird aus 'stats' abgeleitet
+SUMMARY_FIELDS = ("id", "name", "template", "created_at", "progress")
+
+def summary_source_fields(fields):
+    """Gespeicherte Felder, die für die gewünschte Zusammenfassung gelesen werden müssen."""
+    source = ['id'] + [field for field in fields if field not in ('id', 'progress')]
+    if 'progress' in fields: source.append('stats')
+    return source
+
+def node_counts(project):
+    """Anzahl der Phasen, Aufgaben und Unteraufgaben eines Projekts."""
+    phases = project.get('structure') or []
+    tasks = [task for phase in phases for task in phase.get('children') or []]
+    return {'phases': len(phases), 'tasks': len(tasks), 'subtasks': sum(len(task.get('children') or []) for task in tasks)}
+
+def project_summary(project, fields=SUMMARY_FIELDS):
+    """Projektion eines Projekts auf die gewünschten Felder, ohne die Struktur zu kopieren."""
+    summary = {field: project.get(field) for field in fields if field != 'progress'}
+    summary['id'] = project.get('id')
+    if 'progress' in fields: summary['progress'] = progress_percent(project.get('stats'))
+    return summary
+
+# Felder, die über update_project_node einzeln geändert werden dürfen (Feld -> erlaubte Knotentypen)
+PATCHABLE_NODE_FIELDS = {
+    "completed": ("subtask",),
+    "comment": ("subtask",),
+    "name": ("phase", "task", "subtask"),
+}
+
+class NodeIndex:
+    """
+    Flacher Index id -> (Knoten, Elternpfad) über die Struktur eines Projekts. Der Elternpfad
+    ist das Tupel der Vorfahren-ids (z.B. (Phasen-id, Aufgaben-id) für eine Unteraufgabe).
+    insert/move/delete halten Struktur, Index und Fortschrittszähler gemeinsam konsistent.
+    """
+    def __init__(self, project):
+        self.project = project
+        self._entries = {}
+        if 'stats' not in project: compute_progress(project)
+        self._add(project.setdefault('structure', []), ())
+
+    def _add(self, nodes, path):
+        for node in nodes:
+            self._entries[node['id']] = (node, path)
+            children = node.get('children')
+            if children: self._add(children, path + (node['id'],))
+
+    def _drop(self, node):
+        self._entries.pop(node.get('id'), None)
+        for child in node.get('children', []): self._drop(child)
+
+    def __contains__(self, node_id): return node_id in self._entries
+    def __len__(self): return len(self._entries)
+
+    def get(self, node_id):
+        entry = self._entries.get(node_id)
+        return entry[0] if entry else None
+
+    def path(self, node_id):
+        """Vorfahren-ids des Knotens (leer für Phasen)."""
+        return self._entries[node_id][1]
+
+    def ancestors(self, node_id):
+        return [self._entries[ancestor_id][0] for ancestor_id in self.path(node_id)]
+
+    def _siblings(self, parent_id):
+        if parent_id is None: return self.project['structure']
+        return self._entries[parent_id][0].setdefault('children', [])
+
+    @staticmethod
+    def _contribution(node):
+        """(erledigt, gesamt) eines Knotens für die Zähler seiner Vorfahren."""
+        if node.get('type') == 'subtask': return int(bool(node.get('completed'))), 1
+        stats = node.get('stats') or {}
+        return stats.get('completed', 0), stats.get('total', 0)
+
+    @classmethod
+    def _refresh_stats(cls, node):
+        """Berechnet die Zähler eines neu eingefügten Unterbaums (beliebige Ebene)."""
+        if node.get('type') == 'subtask': return
+        completed, total = 0, 0
+        for child in node.get('children', []):
+            cls._refresh_stats(child)
+            child_completed, child_total = cls._contribution(child)
+            completed += child_completed
+            total += child_total
+        node['stats'] = {'completed': completed, 'total': total}
+
+    def _propagate(self, path, completed_delta, total_delta):
+        if not (completed_delta or total_delta): return
+        for node in [self._entries[ancestor_id][0] for ancestor_id in path] + [self.project]:
+            stats = node.setdefault('stats', {'completed': 0, 'total': 0})
+            stats['completed'] += completed_delta
+            stats['total'] += total_delta
+
+    def set_completed(self, node_id, completed):
+        """Setzt 'completed' eines Knotens und passt die Zähler der Vorfahren und des Projekts an."""
+        node, path = self._entries[node_id]
+        self._propagate(path, int(bool(completed)) - int(bool(node.get('completed'))), 0)
+        node['completed'] = completed
+        return node
+
+    def insert(self, parent_id, node, position=None):
+        """Fügt einen Knoten (samt Kindern) unter parent_id ein; parent_id=None für eine neue Phase."""
+        if node.get('id') in self._entries: raise ValueError(f"Knoten {node.get('id')} existiert bereits.")
+        if parent_id is not None and parent_id not in self._entries: raise KeyError(parent_id)
+        self._refresh_stats(node)
+        siblings = self._siblings(parent_id)
+        siblings.insert(len(siblings) if position is None else position, node)
+        path = () if parent_id is None else self._entries[parent_id][1] + (parent_id,)
+        self._add([node], path)
+        self._propagate(path, *self._contribution(node))
+        return node
+
+    def delete(self, node_id):
+        """Entfernt einen Knoten samt Unterbaum und gibt ihn zurück."""
+        node, path = self._entries[node_id]
+        siblings = self._siblings(path[-1] if path else None)
+        del siblings[next(i for i, sibling in enumerate(siblings) if sibling is node)]
+        self._drop(node)
+        completed, total = self._contribution(node)
+        self._propagate(path, -completed, -total)
+        return node
+
+    def move(self, node_id, new_parent_id, position=None):
+        """Hängt einen Knoten unter einen neuen Elternknoten (bzw. Position) um."""
+        if node_id not in self._entries: raise KeyError(node_id)
+        if new_parent_id is not None and (new_parent_id == node_id or node_id in self.path(new_parent_id)):
+            raise ValueError("Ein Knoten kann nicht unter sich selbst verschoben werden.")
+        return self.insert(new_parent_id, self.delete(node_id), position)
+
+def apply_node_changes(project, node_id, changes, index=None):
+    """
+    Ändert einzelne Felder eines Knotens direkt im Projekt und passt die Fortschrittszähler
+    inkrementell an. Idempotent: erneutes Anwenden derselben Änderung ändert nichts mehr.
+    Gibt den geänderten Knoten zurück oder None, wenn er nicht existiert; ValueError, wenn
+    ein Feld für den Knotentyp nicht änderbar ist (siehe PATCHABLE_NODE_FIELDS).
+    """
+    index = index if index is not None else NodeIndex(project)
+    node = index.get(node_id)
+    if node is None: return None
+    for field in changes:
+        if node.get('type') not in PATCHABLE_NODE_FIELDS.get(field, ()):
+            raise ValueError(f'"{field}" ist für {node.get("type")} nicht änderbar.')
+    if 'completed' in changes: index.set_completed(node_id, changes['completed'])
+    node.update(changes)
+    return node
 
 def create_initial_project():
     """Erstellt ein vordefiniertes Beispielprojekt."""
@@ -40,4 +305,5 @@ def create_initial_project():
             "id": str(uuid.uuid4()), "type": "phase", "name": "2. Entwicklung", "children": []
         }
     ]
+    proj.stats = compute_progress({"structure": proj.structure})
     return proj
@@ -1,16 +1,27 @@
 # location: app/models/user.py
-# Definiert die Datenstruktur für einen Benutzer mit Admin-Flag.
+# Benutzer-Modell mit __slots__; from_dict übernimmt den Hash und behält unbekannte Felder für to_dict.
 
 import uuid
+from functools import lru_cache
 from werkzeug.security import generate_password_hash, check_password_hash
+from ..config import Config
+
+@lru_cache(maxsize=None)
+def _hash_prefix(method):
+    """Normalisierter Verfahrensteil eines Hashes (z.B. 'pbkdf2' -> 'pbkdf2:sha256:1000000'), einmal pro Verfahren berechnet."""
+    return generate_password_hash('', method=method).split('$', 1)[0]
 
 class User:
     """Repräsentiert einen Benutzer der Anwendung."""
-    def __init__(self, username, email, password, user_id=None, is_admin=False, user_settings=None):
+    __slots__ = ('id', 'username', 'email', 'password_hash', 'friends', 'is_admin', 'user_settings', '_extra')
+    FIELDS = ('id', 'username', 'email', 'password_hash', 'friends', 'is_admin', 'user_settings')
+
+    def __init__(self, username, email, password=None, user_id=None, is_admin=False, user_settings=None, hash_method=None):
         self.id = user_id or str(uuid.uuid4())
         self.username = username
         self.email = email
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = None
+        if password is not None: self.set_password(password, hash_method)
         self.friends = []
         self.is_admin = is_admin
         self.user_settings = user_settings or {
@@ -18,14 +29,26 @@ class User:
             "language": "de",
             "notifications": True
         }
+        self._extra = None # weitere gespeicherte Felder (settings, _version, ...), bleiben beim Speichern erhalten
+
+    def set_password(self, password, hash_method=None):
+        """Setzt den Hash mit dem angegebenen bzw. konfigurierten Verfahren (Config.PASSWORD_HASH_METHOD)."""
+        self.password_hash = generate_password_hash(password, method=hash_method or Config.PASSWORD_HASH_METHOD)
 
     def check_password(self, password):
         """Überprüft das eingegebene Passwort gegen den Hash."""
+        if not self.password_hash: return False
         return check_password_hash(self.password_hash, password)
 
+    def needs_rehash(self, hash_method=None):
+        """True, wenn der gespeicherte Hash mit einem anderen Verfahren/Aufwand erzeugt wurde als konfiguriert."""
+        if not self.password_hash: return False
+        return self.password_hash.split('$', 1)[0] != _hash_prefix(hash_method or Config.PASSWORD_HASH_METHOD)
+
     def to_dict(self):
         """Konvertiert das User-Objekt in ein Dictionary zum Speichern."""
-        return {
+        data = dict(self._extra) if self._extra else {}
+        data.update({
             "id": self.id,
             "username": self.username,
             "email": self.email,
@@ -33,17 +56,16 @@ class User:
             "friends": self.friends,
             "is_admin": self.is_admin,
             "user_settings": self.user_settings
-        }
+        })
+        return data
 
     @staticmethod
     def from_dict(data):
-        """Erstellt ein User-Objekt aus einem Dictionary."""
-        user = User(
-            username=data.get('username'),
-            email=data.get('email'),
-            password="",
-            user_id=data.get('id')
-        )
+        """Erstellt ein User-Objekt aus einem Dictionary (übernimmt den gespeicherten Hash, ohne zu hashen)."""
+        user = User.__new__(User)  # ohne __init__: keine Standardwerte, die gleich wieder ersetzt würden
+        user.id = data.get('id') or str(uuid.uuid4())
+        user.username = data.get('username')
+        user.email = data.get('email')
         user.password_hash = data.get('password_hash')
         user.friends = data.get('friends', [])
         user.is_admin = data.get('is_admin', False)
@@ -52,4 +74,5 @@ class User:
             "language": "de", 
             "notifications": True
         })
+        user._extra = {key: value for key, value in data.items() if key not in User.FIELDS} or None
         return user
@@ -0,0 +1,40 @@
+# location: app/models/view.py
+# Schreibgeschützte Sichten auf gespeicherte Dictionaries/Listen ohne Kopie (z.B. für das Rendern von Templates).
+
+from collections.abc import Mapping, Sequence
+
+def read_only(value):
+    """Verpackt Dictionaries und Listen in eine Sicht; alles andere wird unverändert zurückgegeben."""
+    if isinstance(value, dict): return ReadOnlyView(value)
+    if isinstance(value, list): return ReadOnlyList(value)
+    return value
+
+class ReadOnlyView(Mapping):
+    """
+    Sicht auf ein Dictionary: Lesen per ['key'] oder .key (wie in Jinja üblich), Schreiben ist nicht
+    möglich. Verschachtelte Werte werden erst beim Zugriff verpackt, kopiert wird nichts.
+    """
+    __slots__ = ('_data',)
+    def __init__(self, data): object.__setattr__(self, '_data', data)
+    def __getitem__(self, key): return read_only(self._data[key])
+    def __iter__(self): return iter(self._data)
+    def __len__(self): return len(self._data)
+    def __getattr__(self, name):
+        try: return read_only(self._data[name])
+        except KeyError: raise AttributeError(name) from None
+    def __setattr__(self, name, value): raise TypeError("Schreibgeschützte Sicht.")
+    def __repr__(self): return f"ReadOnlyView({self._data!r})"
+    def to_dict(self):
+        """Das zugrunde liegende Dictionary - nur für Serialisierung (z.B. jsonify), nicht zum Ändern."""
+        return self._data
+
+class ReadOnlyList(Sequence):
+    """Sicht auf eine Liste; Elemente werden beim Zugriff verpackt."""
+    __slots__ = ('_items',)
+    def __init__(self, items): self._items = items
+    def __getitem__(self, index):
+        if isinstance(index, slice): return ReadOnlyList(self._items[index])
+        return read_only(self._items[index])
+    def __len__(self): return len(self._items)
+    def __iter__(self): return (read_only(item) for item in self._items)
+    def __repr__(self): return f"ReadOnlyList({self._items!r})"
@@ -1,11 +1,14 @@
 # location: app/routes/admin.py
-# Fügt eine API zum Speichern von benutzerspezifischen Admin-Einstellungen hinzu.
+# /admin/api/projects/assign-owner: Altprojekte ohne Besitzer einem Benutzer zuordnen (gebündelt per save_many).
 
 from flask import Blueprint, render_template, session, request, redirect, url_for, flash, jsonify, current_app
 from functools import wraps
+import hmac
 import json
 import os
-from ..extensions import data_manager
+from ..extensions import data_manager, profiler, settings_service, telemetry, template_registry
+from .auth import current_user, update_session_user
+from ..services.json_service import VersionConflictError
 from firebase_admin import auth as firebase_auth
 
 admin_bp = Blueprint('admin', __name__)
@@ -30,6 +33,91 @@ def index():
 def debug_settings():
     return render_template('admin/debug_settings.html')
 
+@admin_bp.route('/api/telemetry')
+@admin_required
+def telemetry_records():
+    """Server-Telemetrie als JSON; ?since=<seq> liefert nur neuere Datensätze, ?limit= die neuesten n."""
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({'status': 'success', 'records': telemetry.since(since, limit), 'last_seq': telemetry.last_seq})
+
+@admin_bp.route('/api/telemetry/stream')
+@admin_required
+def telemetry_stream():
+    """Server-Sent Events: jeder neue Request-Datensatz als Event 'request' (id = seq)."""
+    since = request.args.get('since', type=int)
+    if since is None: since = request.headers.get('Last-Event-ID', type=int)
+    if since is None or since > telemetry.last_seq: since = telemetry.last_seq  # neu verbunden bzw. Server neu gestartet
+
+    def events(seq):
+        yield 'retry: 3000\n\n'
+        while True:
+            if not telemetry.wait(seq, timeout=15):
+                yield ': keepalive\n\n'
+                continue
+            for record in telemetry.since(seq):
+                seq = record['seq']
+                yield f"id: {seq}\nevent: request\ndata: {json.dumps(record)}\n\n"
+
+    return current_app.response_class(events(since), mimetype='text/event-stream',
+                                      headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@admin_bp.route('/metrics')
+def metrics():
+    """Profiling-Daten des DataManagers für Prometheus; ?format=json liefert eine Zusammenfassung mit Quantilen."""
+    token = current_app.config.get('PROFILING_METRICS_TOKEN')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not session.get('is_admin') and not (token and hmac.compare_digest(supplied, token)):
+        return jsonify({'status': 'error', 'message': 'Nicht autorisiert.'}), 403
+    if not profiler.enabled:
+        return jsonify({'status': 'error', 'message': 'Profiling ist deaktiviert (PROFILING_ENABLED).'}), 404
+    if request.args.get('format') == 'json':
+        return jsonify({'status': 'success', 'backend': data_manager.backend_name(), 'worker': os.getpid(), 'operations': profiler.summary()})
+    return current_app.response_class(profiler.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8',
+                                      headers={'Cache-Control': 'no-store'})
+
+@admin_bp.route('/api/projects/bulk', methods=['POST'])
+@admin_required
+def bulk_create_projects():
+    """
+    Legt Projekte aus einer Vorlage an: {"template": "software", "projects": ["Name", {"name": "...", "owner": "<user-id>"}]}.
+    Ohne "owner" gehört das Projekt dem aufrufenden Administrator; unbekannte Besitzer werden abgelehnt.
+    Alle Projekte werden gemeinsam gespeichert (save_many) - bei JSON ein Schreibvorgang statt einer pro Projekt.
+    """
+    data = request.get_json(silent=True) or {}
+    template, entries = data.get('template') or 'leer', data.get('projects')
+    if template not in template_registry:
+        return jsonify({'status': 'error', 'message': f'Unbekannte Vorlage: {template}'}), 400
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'status': 'error', 'message': '"projects" muss eine nicht leere Liste sein'}), 400
+    limit = current_app.config.get('PROJECT_BULK_MAX', 1000)
+    if len(entries) > limit:
+        return jsonify({'status': 'error', 'message': f'Höchstens {limit} Projekte pro Aufruf'}), 400
+    normalized = []
+    for entry in entries:
+        name = entry.get('name') if isinstance(entry, dict) else entry
+        owner = (entry.get('owner') if isinstance(entry, dict) else None) or session['user_id']
+        if not (isinstance(name, str) and name.strip()) or not isinstance(owner, str) or (isinstance(entry, dict) and set(entry) - {'name', 'owner'}):
+            return jsonify({'status': 'error', 'message': f'Ungültiger Eintrag: {entry!r}'}), 400
+        normalized.append({'name': name, 'owner': owner})
+    owners = {entry['owner'] for entry in normalized}
+    unknown = owners - {user.get('id') for user in data_manager.get_users(list(owners))}
+    if unknown:
+        return jsonify({'status': 'error', 'message': f'Unbekannte Besitzer: {", ".join(sorted(unknown))}'}), 400
+    projects = template_registry.create_projects(template, normalized)
+    return jsonify({'status': 'success', 'created': len(projects), 'ids': [project['id'] for project in projects]}), 201
+
+@admin_bp.route('/api/projects/assign-owner', methods=['POST'])
+@admin_required
+def assign_project_owner():
+    """Ordnet alle Projekte ohne Besitzer (vor Einführung der Besitzer angelegt) dem Benutzer {"owner": "<user-id>"} zu."""
+    owner = (request.get_json(silent=True) or {}).get('owner')
+    if not owner or not data_manager.get_user(owner):
+        return jsonify({'status': 'error', 'message': 'Benutzer nicht gefunden'}), 404
+    unowned = [(project_id, dict(project, owner=owner)) for project_id, project in data_manager.iter_records('projects') if not project.get('owner')]
+    if unowned: data_manager.save_many('projects', unowned)
+    return jsonify({'status': 'success', 'assigned': len(unowned)})
+
 @admin_bp.route('/api/update-setting', methods=['POST'])
 @admin_required
 def update_setting():
@@ -40,13 +128,12 @@ def update_setting():
     if setting_key is None:
         return jsonify({'status': 'error', 'message': 'Einstellungsschlüssel fehlt'}), 400
 
-    settings_path = os.path.join(os.path.dirname(__file__), '..', '..', 'settings.json')
     try:
-        with open(settings_path, 'r', encoding='utf-8') as f: settings = json.load(f)
-        settings[setting_key] = setting_value
-        with open(settings_path, 'w', encoding='utf-8') as f: json.dump(settings, f, indent=2)
-        current_app.config['APP_SETTINGS'][setting_key] = setting_value
-        return jsonify({'status': 'success', 'message': f'Einstellung {setting_key} aktualisiert.'})
+        # Schreibt atomar und erhöht die Version; andere Worker übernehmen die Änderung über ihren Watcher
+        settings = settings_service.update({setting_key: setting_value}, expected_version=data.get('version'))
+        return jsonify({'status': 'success', 'message': f'Einstellung {setting_key} aktualisiert.', 'version': settings['_version']})
+    except VersionConflictError:
+        raise  # -> 409 (errorhandler in create_app)
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -63,6 +150,7 @@ def update_user_log_settings():
     data_manager.save_user_settings(user_id, {'log_filters': data})
     # Aktualisiere die Sitzung, damit die Änderungen sofort wirksam werden
     session['log_filters'] = data
+    update_session_user(settings={'log_filters': data})
     session.modified = True
     return jsonify({'status': 'success', 'message': 'Log-Einstellungen gespeichert.'})
 
@@ -83,6 +171,7 @@ def save_user_settings():
         if category == 'log_colors' and hasattr(data_manager._service, 'save_user_log_colors'):
             # Nutze die spezialisierte Methode für bessere Datenbankstruktur
             result = data_manager._service.save_user_log_colors(user_id, settings)
+            session.pop('user', None)  # die Ablage bestimmt das Backend - beim nächsten Lesen neu laden
         else:
             # Aktuelle Benutzereinstellungen laden
             user_data = data_manager.get_user(user_id) or {}
@@ -93,6 +182,7 @@ def save_user_settings():
             
             # Zurück speichern
             result = data_manager.save_user_settings(user_id, current_settings)
+            update_session_user(settings=current_settings)
         
         return jsonify({
             'status': 'success', 
@@ -120,8 +210,8 @@ def get_user_settings():
                 'firebase_structure': 'optimized'
             })
         else:
-            # Standard-Verhalten für andere Kategorien
-            user_data = data_manager.get_user(user_id) or {}
+            # Standard-Verhalten für andere Kategorien (Datensatz aus der Session, kein Backend-Abruf)
+            user_data = current_user() or {}
             settings = user_data.get('settings', {}).get(category, {})
             
             return jsonify({
@@ -185,16 +275,24 @@ def set_admin_status():
                 }
             }
     
-    user_data['is_admin'] = new_status
-    data_manager.save_user(user_data)
-    if data_manager._service.__class__.__name__ == 'FirestoreService':
+    if hasattr(data_manager._service, 'save_admin_status'):
+        # Async-Cloud-Modus: Dokument und Custom Claims werden gleichzeitig geschrieben
         try:
-            firebase_auth.set_custom_user_claims(user_id_to_change, {'admin': new_status})
+            data_manager._service.save_admin_status(user_data, new_status)
         except Exception as e:
             flash(f"Fehler beim Aktualisieren der Firebase-Rechte: {e}", "error")
-            user_data['is_admin'] = not new_status
-            data_manager.save_user(user_data)
             return redirect(url_for('admin.index'))
+    else:
+        user_data['is_admin'] = new_status
+        data_manager.save_user(user_data)
+        if data_manager.is_cloud():
+            try:
+                firebase_auth.set_custom_user_claims(user_id_to_change, {'admin': new_status})
+            except Exception as e:
+                flash(f"Fehler beim Aktualisieren der Firebase-Rechte: {e}", "error")
+                user_data['is_admin'] = not new_status
+                data_manager.save_user(user_data)
+                return redirect(url_for('admin.index'))
     status_text = "zum Administrator ernannt" if new_status else "die Administratorrechte entzogen"
     if new_status and 'admin_settings' in user_data:
         status_text += " (Admin-Einstellungen initialisiert)"
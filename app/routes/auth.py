@@ -1,14 +1,36 @@
 # location: app/routes/auth.py
-# Lädt benutzerspezifische Einstellungen beim Login in die Sitzung.
+# Legt den Benutzerdatensatz in der serverseitigen Session ab (current_user) und hält ihn bei Änderungen aktuell.
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app, jsonify
 from functools import wraps
 from firebase_admin import auth as firebase_auth
 from ..extensions import data_manager
 from ..models.user import User
+from ..services.json_service import VersionConflictError
 
 auth_bp = Blueprint('auth', __name__)
 
+def _server_side_session():
+    return getattr(current_app.session_interface, 'server_side', False)
+
+def remember_user(user_data):
+    """Legt den Benutzerdatensatz (ohne Passwort-Hash) in der serverseitigen Session ab."""
+    if _server_side_session():
+        session['user'] = {key: value for key, value in user_data.items() if key != 'password_hash'}
+
+def update_session_user(**changes):
+    """Write-through: übernimmt gespeicherte Änderungen in den Datensatz der Session."""
+    user = session.get('user')
+    if user is not None: session['user'] = dict(user, **changes)
+
+def current_user():
+    """Datensatz des angemeldeten Benutzers; aus dem Backend nur, wenn er noch nicht in der Session liegt."""
+    user = session.get('user')
+    if user is None and 'user_id' in session:
+        user = data_manager.get_user(session['user_id'])
+        if user is not None: remember_user(user)
+    return user
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -31,7 +53,7 @@ def register():
         if password != password_confirm:
             flash('Die Passwörter stimmen nicht überein.', 'error')
             return redirect(url_for('auth.register'))
-        if data_manager._service.__class__.__name__ == 'FirestoreService':
+        if data_manager.is_cloud():
             try:
                 user_record = firebase_auth.create_user(email=email, password=password, display_name=username)
                 user_for_db = {'id': user_record.uid, 'username': username, 'email': email, 'is_admin': False, 'friends': []}
@@ -46,7 +68,8 @@ def register():
                 flash('Ein Benutzer mit dieser E-Mail-Adresse existiert bereits.', 'error')
                 return redirect(url_for('auth.register'))
             is_first_user = data_manager._service.get_user_count() == 0
-            new_user = User(username=username, email=email, password=password, is_admin=is_first_user)
+            new_user = User(username=username, email=email, password=password, is_admin=is_first_user,
+                            hash_method=current_app.config.get('PASSWORD_HASH_METHOD'))
             data_manager.save_user(new_user.to_dict())
             flash('Registrierung erfolgreich! Sie können sich jetzt anmelden.', 'success')
             return redirect(url_for('auth.login'))
@@ -61,16 +84,18 @@ def login():
         if not user_data:
             flash('Ungültige Anmeldedaten.', 'error')
             return redirect(url_for('auth.login'))
-        if data_manager._service.__class__.__name__ == 'JsonService':
+        if not data_manager.is_cloud():
             user = User.from_dict(user_data)
             if not user.check_password(password):
                 flash('Ungültige Anmeldedaten.', 'error')
                 return redirect(url_for('auth.login'))
+            _rehash_if_needed(user, user_data, password)
         session.clear()
         session['user_id'] = user_data.get('id')
         session['username'] = user_data.get('username')
         is_admin_status = user_data.get('is_admin', False) or user_data.get('isAdmin', False)
         session['is_admin'] = is_admin_status
+        remember_user(user_data)
         
         # NEU: Lade benutzerspezifische Einstellungen für Admins
         if is_admin_status:
@@ -80,6 +105,14 @@ def login():
         return redirect(url_for('projects.dashboard'))
     return render_template('auth/login.html')
 
+def _rehash_if_needed(user, user_data, password):
+    """Erzeugt den Hash nach erfolgreichem Login mit dem aktuell konfigurierten Verfahren neu."""
+    hash_method = current_app.config.get('PASSWORD_HASH_METHOD')
+    if not user.needs_rehash(hash_method): return
+    user.set_password(password, hash_method)
+    try: data_manager.save_user(dict(user_data, password_hash=user.password_hash))
+    except VersionConflictError: pass  # parallel geändert - beim nächsten Login erneut versuchen
+
 @auth_bp.route('/logout')
 @login_required
 def logout():
@@ -108,15 +141,13 @@ def update_user_preferences():
         if not user_data:
             return jsonify({'status': 'error', 'message': 'User nicht gefunden'}), 404
             
-        # Initialize user_settings if not exists
-        if 'user_settings' not in user_data or not user_data['user_settings']:
-            user_data['user_settings'] = {"theme": "dark", "language": "de", "notifications": True}
-        
-        # Update specific setting
-        user_data['user_settings'][setting_key] = setting_value
+        # Kopie statt Änderung an Ort und Stelle: scheitert das Speichern, bleibt der gelesene Stand unberührt
+        user_settings = dict(user_data.get('user_settings') or {"theme": "dark", "language": "de", "notifications": True})
+        user_settings[setting_key] = setting_value
+        user_data['user_settings'] = user_settings
         data_manager.save_user(user_data)
         
-        # Update session if needed
+        update_session_user(user_settings=user_data['user_settings'])
         if setting_key == 'theme':
             session['user_theme'] = setting_value
         
@@ -125,5 +156,7 @@ def update_user_preferences():
             'message': f'User-Einstellung {setting_key} aktualisiert'
         })
         
+    except VersionConflictError:
+        raise  # -> 409 (errorhandler in create_app)
     except Exception as e:
         return jsonify({'status': 'error', 'message': f'Fehler beim Speichern: {str(e)}'}), 500
@@ -1,8 +1,9 @@
 # location: app/routes/main.py
-# Hauptrouten der Anwendung.
+# Hauptrouten; /discover zeigt den Katalog öffentlicher Projekte, /discover/<id> deren Übersicht ohne Anmeldung.
 
-from flask import Blueprint, redirect, url_for, render_template
-from .. import data_manager
+from flask import Blueprint, redirect, url_for, request, flash, jsonify, current_app
+from ..extensions import catalog, data_manager
+from ..services.render_cache import content_digest, project_version, render_cached
 
 main_bp = Blueprint('main', __name__)
 
@@ -11,9 +12,42 @@ def index():
     """Leitet von der Startseite zum Dashboard weiter."""
     return redirect(url_for('projects.dashboard'))
 
+def _discover_page():
+    """Aktuelle Katalogseite (?cursor=) und die beliebtesten Vorlagen; ValueError bei ungültigem Cursor."""
+    page = catalog.page(request.args.get('cursor'), current_app.config.get('DISCOVER_PAGE_SIZE', 24))
+    return page, catalog.popular_templates()
+
 @main_bp.route('/discover')
 def discover():
-    """Zeigt öffentlich geteilte Projekte an (Platzhalter)."""
-    # Hier würde die Logik stehen, um öffentliche Projekte zu laden
-    public_projects = [] 
-    return render_template('discover.html', projects=public_projects)
+    """Zeigt öffentlich geteilte Projekte an, neueste zuerst (ohne Anmeldung erreichbar)."""
+    try:
+        page, templates = _discover_page()
+    except ValueError:
+        flash('Ungültiger Seitenverweis.', 'error')
+        return redirect(url_for('main.discover'))
+    digest = content_digest([page, templates])
+    return render_cached('discover.html', (request.args.get('cursor'), digest), current_app.config.get('DISCOVER_MAX_AGE'),
+                         projects=page['items'], next_cursor=page['next_cursor'], popular_templates=templates, page_digest=digest)
+
+@main_bp.route('/discover/<project_id>')
+def public_project(project_id):
+    """Schreibgeschützte Übersicht eines öffentlichen Projekts - wie /discover ohne Anmeldung erreichbar."""
+    project = data_manager.get_project_view(project_id)
+    if not project or not project.get('public'): return "Projekt nicht gefunden", 404
+    version = project_version(project)
+    return render_cached('project_overview.html', (project_id, version), current_app.config.get('DISCOVER_MAX_AGE'),
+                         project=project, version=version, manageable=False)
+
+@main_bp.route('/discover/feed')
+def discover_feed():
+    """Dieselbe Katalogseite als JSON (?cursor=), mit ETag und öffentlicher Cache-Dauer."""
+    try:
+        page, templates = _discover_page()
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Ungültiger Seitenverweis.'}), 400
+    response = jsonify({'status': 'success', 'projects': page['items'], 'next_cursor': page['next_cursor'],
+                        'popular_templates': [{'template': name, 'count': count} for name, count in templates]})
+    response.set_etag(content_digest([page, templates]))
+    max_age = current_app.config.get('DISCOVER_MAX_AGE')
+    response.headers['Cache-Control'] = f'public, max-age={max_age}' if max_age else 'no-cache'
+    return response.make_conditional(request)
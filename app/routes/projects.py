@@ -1,27 +1,46 @@
 # location: app/routes/projects.py
-# Routen für die Projektverwaltung (jetzt mit Authentifizierungsschutz).
+# Projekte gehören ihrem Ersteller; Dashboard zeigt nur eigene und geteilte Projekte, Zugriff nur für Besitzer/Mitglieder.
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from ..extensions import data_manager
-from ..models.project import Project
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session
+from ..extensions import data_manager, search_index, template_registry
+from ..models.project import PATCHABLE_NODE_FIELDS, can_access, can_manage
+from ..services.render_cache import content_digest, project_version, render_cached
 from .auth import login_required
 
 projects_bp = Blueprint('projects', __name__)
 
+def _user():
+    """(Benutzer-id, Admin?) des angemeldeten Benutzers für die Zugriffsprüfungen."""
+    return session.get('user_id'), bool(session.get('is_admin'))
+
 @projects_bp.route('/dashboard')
 @login_required
 def dashboard():
-    projects = data_manager.get_all_projects()
-    for p in projects:
-        total, completed = 0, 0
-        for phase in p.get('structure', []):
-            for task in phase.get('children', []):
-                for subtask in task.get('children', []):
-                    total += 1
-                    if subtask.get('completed'):
-                        completed += 1
-        p['progress'] = (completed / total * 100) if total > 0 else 0
-    return render_template('dashboard.html', projects=projects)
+    # Seitenweise Zusammenfassungen (ohne Struktur) nur der eigenen bzw. geteilten Projekte - über den
+    # Besitzer-/Mitglieder-Index, die Kosten hängen also nicht von der Gesamtzahl der Projekte ab
+    user_id, page_size = session['user_id'], current_app.config.get('DASHBOARD_PAGE_SIZE', 24)
+    try:
+        page = data_manager.list_projects(owner=user_id, limit=page_size, cursor=request.args.get('cursor'), sort_by='-created_at')
+        shared = data_manager.list_projects(member=user_id, limit=page_size, cursor=request.args.get('shared_cursor'), sort_by='-created_at')
+    except ValueError:
+        flash('Ungültiger Seitenverweis.', 'error')
+        return redirect(url_for('projects.dashboard'))
+    digest = content_digest([page, shared])
+    return render_cached('dashboard.html', (request.args.get('cursor'), request.args.get('shared_cursor'), digest, template_registry.version),
+                         projects=page['items'], next_cursor=page['next_cursor'],
+                         shared_projects=shared['items'], shared_next_cursor=shared['next_cursor'],
+                         page_digest=digest, templates=template_registry.choices())
+
+@projects_bp.route('/search')
+@login_required
+def search():
+    """Volltextsuche: ?q= (alle Wörter, auch als Präfix), ?limit= (höchstens 100); Ergebnisse als JSON."""
+    query = request.args.get('q', '').strip()
+    if not query: return jsonify({'status': 'error', 'message': 'Suchbegriff fehlt.'}), 400
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    user_id, is_admin = _user()
+    results = search_index.search(query, limit, allowed=lambda project: can_access(project, user_id, is_admin))
+    return jsonify({'status': 'success', 'query': query, 'results': results})
 
 @projects_bp.route('/new', methods=['POST'])
 @login_required
@@ -30,29 +49,109 @@ def new_project():
     if not project_name:
         flash('Projektname darf nicht leer sein!', 'error')
         return redirect(url_for('projects.dashboard'))
-    
-    new_proj = Project(name=project_name, template=request.form.get('template'))
-    data_manager.save_project(new_proj.to_dict())
+    template = request.form.get('template') or 'leer'
+    if template not in template_registry:
+        flash('Unbekannte Vorlage.', 'error')
+        return redirect(url_for('projects.dashboard'))
+
+    template_registry.create_project(template, project_name, owner=session['user_id'])
     flash(f'Projekt "{project_name}" wurde erfolgreich erstellt.', 'success')
     return redirect(url_for('projects.dashboard'))
 
 @projects_bp.route('/<project_id>/editor')
 @login_required
 def editor(project_id):
-    project = data_manager.get_project(project_id)
+    project = data_manager.get_project_view(project_id)
     if not project: return "Projekt nicht gefunden", 404
+    if not can_access(project, *_user()): return "Kein Zugriff auf dieses Projekt", 403
     return render_template('project_editor.html', project=project)
 
 @projects_bp.route('/<project_id>/overview')
 @login_required
 def overview(project_id):
-    project = data_manager.get_project(project_id)
+    project = data_manager.get_project_view(project_id)
     if not project: return "Projekt nicht gefunden", 404
-    return render_template('project_overview.html', project=project)
+    # Öffentliche Projekte (/discover) darf jeder angemeldete Benutzer ansehen
+    if not (project.get('public') or can_access(project, *_user())): return "Kein Zugriff auf dieses Projekt", 403
+    version, manageable = project_version(project), can_manage(project, *_user())
+    return render_cached('project_overview.html', (project_id, version), project=project, version=version, manageable=manageable)
 
 @projects_bp.route('/<project_id>/checklist')
 @login_required
 def checklist(project_id):
-    project = data_manager.get_project(project_id)
+    project = data_manager.get_project_view(project_id)
     if not project: return "Projekt nicht gefunden", 404
-    return render_template('project_checklist.html', project=project)
+    if not can_access(project, *_user()): return "Kein Zugriff auf dieses Projekt", 403
+    version = project_version(project)
+    return render_cached('project_checklist.html', (project_id, version), project=project, version=version)
+
+@projects_bp.route('/<project_id>/visibility', methods=['POST'])
+@login_required
+def set_visibility(project_id):
+    """Macht ein Projekt öffentlich oder privat: JSON {"public": bool} oder Formularfeld public=1/0."""
+    data = request.get_json(silent=True)
+    public = data.get('public') if isinstance(data, dict) else request.form.get('public') in ('1', 'true', 'on')
+    if not isinstance(public, bool):
+        return jsonify({'status': 'error', 'message': '"public" muss true oder false sein'}), 400
+    project = data_manager.get_project(project_id)
+    if not project:
+        if request.is_json: return jsonify({'status': 'error', 'message': 'Projekt nicht gefunden'}), 404
+        return "Projekt nicht gefunden", 404
+    if not can_manage(project, *_user()):
+        if request.is_json: return jsonify({'status': 'error', 'message': 'Nur der Besitzer kann das Projekt teilen'}), 403
+        return "Nur der Besitzer kann das Projekt teilen", 403
+    project['public'] = public
+    data_manager.save_project(project)
+    if request.is_json: return jsonify({'status': 'success', 'public': public})
+    flash('Projekt ist jetzt öffentlich.' if public else 'Projekt ist jetzt privat.', 'success')
+    return redirect(url_for('projects.overview', project_id=project_id))
+
+@projects_bp.route('/<project_id>/members', methods=['POST'])
+@login_required
+def set_members(project_id):
+    """Teilt ein Projekt mit Freunden des Besitzers: JSON {"members": [Benutzer-ids]} ersetzt die Mitgliederliste."""
+    data = request.get_json(silent=True)
+    members = data.get('members') if isinstance(data, dict) else None
+    if not isinstance(members, list) or not all(isinstance(member, str) for member in members):
+        return jsonify({'status': 'error', 'message': '"members" muss eine Liste von Benutzer-ids sein'}), 400
+    project = data_manager.get_project(project_id)
+    if not project: return jsonify({'status': 'error', 'message': 'Projekt nicht gefunden'}), 404
+    if not can_manage(project, *_user()):
+        return jsonify({'status': 'error', 'message': 'Nur der Besitzer kann das Projekt teilen'}), 403
+    owner = data_manager.get_user(project['owner']) if project.get('owner') else None
+    if owner is None: return jsonify({'status': 'error', 'message': 'Projekt ohne Besitzer kann nicht geteilt werden'}), 400
+    strangers = sorted(set(members) - set(owner.get('friends') or ()))
+    if strangers:
+        return jsonify({'status': 'error', 'message': f'Nur Freunde des Besitzers können Mitglied werden: {", ".join(strangers)}'}), 400
+    project['members'] = list(dict.fromkeys(members))
+    data_manager.save_project(project)
+    return jsonify({'status': 'success', 'members': project['members']})
+
+@projects_bp.route('/<project_id>/nodes/<node_id>', methods=['PATCH'])
+@login_required
+def patch_node(project_id, node_id):
+    """Ändert einzelne Felder eines Knotens (z.B. Abhaken einer Unteraufgabe) ohne das ganze Projekt zu senden."""
+    changes = request.get_json(silent=True)
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({'status': 'error', 'message': 'Keine Änderungen erhalten'}), 400
+    unknown = set(changes) - set(PATCHABLE_NODE_FIELDS)
+    if unknown:
+        return jsonify({'status': 'error', 'message': f'Nicht änderbare Felder: {", ".join(sorted(unknown))}'}), 400
+    if 'completed' in changes and not isinstance(changes['completed'], bool):
+        return jsonify({'status': 'error', 'message': '"completed" muss true oder false sein'}), 400
+    if 'comment' in changes and not isinstance(changes['comment'], str):
+        return jsonify({'status': 'error', 'message': '"comment" muss ein Text sein'}), 400
+    if 'name' in changes and not (isinstance(changes['name'], str) and changes['name'].strip()):
+        return jsonify({'status': 'error', 'message': 'Name darf nicht leer sein'}), 400
+
+    access = data_manager.get_project_access(project_id)
+    if access is None: return jsonify({'status': 'error', 'message': 'Projekt oder Knoten nicht gefunden'}), 404
+    if not can_access(access, *_user()): return jsonify({'status': 'error', 'message': 'Kein Zugriff auf dieses Projekt'}), 403
+
+    try:
+        updated = data_manager.update_project_node(project_id, node_id, changes)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    if updated is None:
+        return jsonify({'status': 'error', 'message': 'Projekt oder Knoten nicht gefunden'}), 404
+    return jsonify({'status': 'success', 'node': updated})
@@ -0,0 +1,138 @@
+# location: app/services/catalog.py
+# Katalog öffentlicher Projekte; warm() baut vorab auf (Gunicorn preload_app), after_fork erneuert die Sperre im Worker.
+
+import threading
+import time
+from collections import Counter
+from ..models.project import SUMMARY_FIELDS, node_counts, project_summary
+from .pagination import clamp_limit, decode_cursor, encode_cursor, keyset_page, sort_value
+
+def catalog_entry(project):
+    """Zusammenfassung für den Katalog: Name, Vorlage, Fortschritt, Erstellungsdatum und Knotenzahlen."""
+    entry = project_summary(project, SUMMARY_FIELDS)
+    entry.update(node_counts(project))
+    return entry
+
+class PublicCatalog:
+    """
+    Hält die Zusammenfassungen aller Projekte mit public=True im Speicher, damit /discover nie die
+    Projekte durchsuchen muss. Aufgebaut wird beim ersten Abruf (ein Lauf über iter_records), danach
+    pflegen save_project/delete_project/update_project_node (DataManager-Beobachter) den Katalog.
+    Nebenbei wird gezählt, wie oft jede Vorlage verwendet wird (alle Projekte, nicht nur öffentliche).
+    Änderungen anderer Worker holt jeder Abruf höchstens alle CHANGE_FEED_POLL_INTERVAL Sekunden
+    aus dem Änderungsfeed (project_changes).
+    """
+    def __init__(self):
+        self.poll_interval = 2.0
+        self._data_manager = None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._token = None  # Stand des Änderungsfeeds, bis zu dem der Katalog nachgezogen ist
+        self._next_poll = 0.0
+        self._reset()
+
+    def _reset(self):
+        self._entries = {}  # id -> Katalog-Eintrag (nur öffentliche Projekte)
+        self._sorted = None  # aufsteigend sortierte (created_at, id), None = neu aufbauen
+        self._template_of = {}  # id -> Vorlage (alle Projekte)
+        self._templates = Counter()
+
+    def init_app(self, app, data_manager):
+        self.poll_interval = app.config.get('CHANGE_FEED_POLL_INTERVAL', 2.0)
+        self._data_manager = data_manager
+        with self._lock:
+            self._loaded = False
+            self._reset()
+        data_manager.add_observer(self._observe)
+
+    # --- Pflege ---
+    def _apply(self, project_id, project):
+        """Übernimmt den aktuellen Stand eines Projekts (None = gelöscht)."""
+        template = project.get('template') if project is not None else None
+        old_template = self._template_of.pop(project_id, None)
+        if old_template is not None: self._templates[old_template] -= 1
+        if project is not None:
+            self._template_of[project_id] = template or 'leer'
+            self._templates[template or 'leer'] += 1
+        old = self._entries.get(project_id)
+        if project is not None and project.get('public'):
+            entry = self._entries[project_id] = catalog_entry(dict(project, id=project_id))
+            if old is None or old.get('created_at') != entry.get('created_at'): self._sorted = None
+        elif old is not None:
+            del self._entries[project_id]
+            self._sorted = None
+
+    def _observe(self, name, seconds, args, result, error):
+        """Beobachter für DataManager.add_observer; vor dem ersten Abruf gibt es nichts zu pflegen."""
+        if not self._loaded or error is not None or not args: return
+        if name == 'save_project' and isinstance(result, dict) and result.get('id'):
+            with self._lock: self._apply(result['id'], result)
+        elif name == 'delete_project' and result:
+            with self._lock: self._apply(args[0], None)
+        elif name == 'update_project_node' and result is not None and args[0] in self._entries:
+            project = self._data_manager.get_project(args[0])  # Fortschritt und Namen haben sich geändert
+            with self._lock: self._apply(args[0], project)
+        elif name == 'save_many' and args[0] == 'projects':
+            with self._lock:
+                for key, record in args[1]: self._apply(key, record)
+
+    def rebuild(self):
+        """
+        Baut Katalog und Vorlagen-Zähler aus allen gespeicherten Projekten neu auf. Die Sperre wird über
+        den ganzen Lauf gehalten, damit keine Beobachter-Änderung beim Ersetzen verloren geht; was andere
+        Worker währenddessen schreiben, liefert der Änderungsfeed ab dem vorher geholten Token nach.
+        """
+        with self._lock:
+            token = self._data_manager.project_change_token()
+            self._reset()
+            for project_id, project in self._data_manager.iter_records('projects'): self._apply(project_id, project)
+            self._token, self._loaded = token, True
+
+    def _ensure_loaded(self):
+        if self._loaded: return
+        with self._lock:
+            if not self._loaded: self.rebuild()
+
+    def _catch_up(self):
+        """Übernimmt Änderungen anderer Worker aus dem Änderungsfeed; höchstens alle poll_interval Sekunden."""
+        self._ensure_loaded()
+        now = time.monotonic()
+        if now < self._next_poll: return
+        with self._lock:
+            if now < self._next_poll: return
+            self._next_poll = now + self.poll_interval
+            changes = self._data_manager.project_changes(self._token)
+            if changes is None:  # Feed reicht nicht mehr bis zum eigenen Stand zurück
+                self.rebuild()
+                return
+            self._token, updates = changes
+            for project_id, project in updates: self._apply(project_id, project)
+
+    def warm(self):
+        """Baut den Katalog sofort auf statt beim ersten Abruf (z.B. vor dem Fork der Worker)."""
+        self._ensure_loaded()
+
+    def after_fork(self):
+        """Im per fork gestarteten Worker: neue Sperre; der vorab gebaute Katalog wird ab seinem Token nachgezogen."""
+        self._lock = threading.RLock()
+        self._next_poll = 0.0
+
+    # --- Lesen ---
+    def page(self, cursor=None, limit=24):
+        """Eine Seite öffentlicher Projekte, neueste zuerst: {'items': [...], 'next_cursor': str|None}."""
+        self._catch_up()
+        cursor_key = decode_cursor(cursor)
+        with self._lock:
+            if self._sorted is None: self._sorted = sorted((sort_value(entry, 'created_at'), key) for key, entry in self._entries.items())
+            page, has_more = keyset_page(self._sorted, cursor_key, clamp_limit(limit), descending=True)
+            items = [dict(self._entries[key]) for _, key in page]
+        return {'items': items, 'next_cursor': encode_cursor(*page[-1]) if has_more and page else None}
+
+    def popular_templates(self, limit=5):
+        """Die am häufigsten verwendeten Vorlagen als [(Vorlage, Anzahl), ...]."""
+        self._catch_up()
+        with self._lock: return [(template, count) for template, count in self._templates.most_common(limit) if count > 0]
+
+    def __len__(self):
+        self._catch_up()
+        return len(self._entries)
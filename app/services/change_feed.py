@@ -0,0 +1,52 @@
+# location: app/services/change_feed.py
+# Änderungsprotokoll im Speicher: welche Projekte sich seit einem Stand (Token) geändert haben, ohne alle Projekte zu lesen.
+
+import threading
+from collections import OrderedDict
+
+class ChangeLog:
+    """
+    Laufende Nummer je Änderung und pro Schlüssel nur der letzte Eintrag (neueste zuletzt). Leser
+    merken sich token() und holen mit since(token) nur die seitdem geänderten Schlüssel. Es werden
+    höchstens max_entries Schlüssel gehalten; wer hinter die älteste verdrängte Änderung zurückfällt
+    (oder nach truncate()), bekommt None und muss neu aufbauen.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._seq = 0
+        self._floor = 0  # Tokens darunter sind nicht mehr lückenlos abgedeckt
+        self._entries = OrderedDict()  # Schlüssel -> (Nummer, Nutzlast)
+        self._lock = threading.Lock()
+
+    def record(self, key, payload=None):
+        with self._lock:
+            self._seq += 1
+            self._entries.pop(key, None)
+            self._entries[key] = (self._seq, payload)
+            if len(self._entries) > self.max_entries:
+                _, (seq, _) = self._entries.popitem(last=False)
+                self._floor = seq
+
+    def truncate(self):
+        """Verwirft alle bisherigen Tokens, z.B. wenn Änderungen nicht mehr nachvollziehbar sind."""
+        with self._lock:
+            self._seq += 1
+            self._floor = self._seq
+            self._entries.clear()
+
+    def token(self):
+        with self._lock: return self._seq
+
+    def since(self, token):
+        """(neues Token, [(Schlüssel, Nutzlast), ...] in Änderungsreihenfolge) oder None, wenn token zu alt ist."""
+        with self._lock:
+            if token < self._floor: return None
+            changed = []
+            for key in reversed(self._entries):
+                seq, payload = self._entries[key]
+                if seq <= token: break
+                changed.append((key, payload))
+            return self._seq, changed[::-1]
+
+    def after_fork(self):
+        self._lock = threading.Lock()
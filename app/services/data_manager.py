@@ -1,19 +1,41 @@
 # location: app/services/data_manager.py
-# Fügt eine Methode zum Speichern von Benutzereinstellungen hinzu.
+# Wählt das Speicher-Backend; after_fork reicht den Neustart nach dem Fork (Gunicorn preload_app) ans Backend weiter.
 
+import time
+from functools import wraps
 from .json_service import JsonService
+from .journal_service import JournalService
+from .sqlite_service import SqliteService
 from .firestore_service import FirestoreService
+from .firestore_async_service import FirestoreAsyncService
+from ..models.project import compute_progress, Project
+from ..models.user import User
+from ..models.view import ReadOnlyView
+
+def _as(model, data, as_model):
+    """Wandelt ein gelesenes Dictionary auf Wunsch in ein Modellobjekt um (None bleibt None)."""
+    return model.from_dict(data) if as_model and data is not None else data
+
+# Methoden, die nicht beobachtet werden (Einrichtung statt Datenzugriff)
+UNOBSERVED_METHODS = {'init_app', 'init_request_hooks', 'is_cloud', 'add_observer', 'backend_name', 'after_fork',
+                      'project_change_token', 'project_changes', 'import_chunk_size'}
 
 class DataManager:
     _instance = None
     _service = None
+    _observers = None
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DataManager, cls).__new__(cls)
         return cls._instance
     def init_app(self, mode, app_config=None):
         if mode == 'cloud':
-            self._service = FirestoreService(app_config)
+            use_async = (app_config or {}).get('FIRESTORE_ASYNC', False)
+            self._service = FirestoreAsyncService(app_config) if use_async else FirestoreService(app_config)
+        elif mode == 'journal':
+            self._service = JournalService(app_config)
+        elif mode == 'sqlite':
+            self._service = SqliteService(app_config)
         else:
             self._service = JsonService(app_config)
     
@@ -25,11 +47,118 @@ class DataManager:
         """NEU: Lädt Einstellungen für einen bestimmten Benutzer."""
         return self._service.get_user_settings(user_id)
 
-    def get_all_users(self): return self._service.get_all_users()
-    def get_all_projects(self): return self._service.get_all_projects()
-    def get_project(self, project_id): return self._service.get_project(project_id)
-    def save_project(self, project_data): return self._service.save_project(project_data)
+    def backend_name(self): return type(self._service).__name__
+    def after_fork(self):
+        """Nach fork im Worker (Gunicorn preload_app): das Backend erneuert Verbindungen, Sperren und Threads."""
+        hook = getattr(self._service, 'after_fork', None)
+        if hook: hook()
+
+    def add_observer(self, observer):
+        """
+        Registriert observer(name, seconds, args, result, error), der nach jedem delegierten Aufruf
+        (get_project, save_project, ...) aufgerufen wird. Beim ersten Beobachter werden die
+        öffentlichen Methoden der Instanz einmalig eingewickelt; ohne Beobachter kostet nichts extra.
+        """
+        if self._observers is None:
+            self._observers = []
+            for name in dir(type(self)):
+                if name.startswith('_') or name in UNOBSERVED_METHODS: continue
+                method = getattr(self, name)
+                if callable(method): setattr(self, name, self._observed(name, method))
+        if observer not in self._observers: self._observers.append(observer)
+
+    def _observed(self, name, method):
+        @wraps(method)
+        def call(*args, **kwargs):
+            result = error = None
+            start = time.perf_counter()
+            try:
+                result = method(*args, **kwargs)
+                return result
+            except Exception as e:
+                error = e
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                for observer in self._observers: observer(name, elapsed, args, result, error)
+        return call
+
+    def is_cloud(self):
+        """True, wenn Firestore/Firebase Auth das Backend ist (Passwörter prüft dann Firebase)."""
+        return isinstance(self._service, FirestoreService)
+
+    def init_request_hooks(self, app):
+        """Registriert request-bezogene Hooks des Backends (z.B. den Firestore-Schreib-Batch)."""
+        @app.after_request
+        def _commit_backend_batch(response):
+            hook = getattr(self._service, 'after_request', None)
+            return hook(response) if hook else response
+
+    # Lesemethoden: as_model=True liefert User-/Project-Objekte statt Dictionaries
+    def get_all_users(self, as_model=False): return [_as(User, u, as_model) for u in self._service.get_all_users()]
+    def get_users(self, user_ids, as_model=False): return [_as(User, u, as_model) for u in self._service.get_users(user_ids)]
+    def get_projects(self, project_ids, as_model=False):
+        """Mehrere Projekte in einem Abruf (Firestore: get_all); fehlende ids werden übersprungen."""
+        return [_as(Project, p, as_model) for p in self._service.get_projects(project_ids)]
+    def get_all_projects(self, as_model=False): return [_as(Project, p, as_model) for p in self._service.get_all_projects()]
+    def get_project(self, project_id, as_model=False): return _as(Project, self._service.get_project(project_id), as_model)
+    def get_project_view(self, project_id):
+        """
+        Schreibgeschützte Sicht auf ein Projekt zum Rendern. Backends mit residentem Cache
+        (JSON/Journal) liefern sie ohne jede Kopie; sonst wird das gelesene Dictionary verpackt.
+        """
+        getter = getattr(self._service, 'get_project_view', None)
+        if getter: return getter(project_id)
+        project = self._service.get_project(project_id)
+        return ReadOnlyView(project) if project is not None else None
+    def get_project_access(self, project_id):
+        """{'owner', 'members'} eines Projekts oder None; Backends mit Index lesen dafür nicht das ganze Projekt."""
+        getter = getattr(self._service, 'get_project_access', None)
+        if getter: return getter(project_id)
+        project = self._service.get_project(project_id)
+        return {'owner': project.get('owner'), 'members': list(project.get('members') or ())} if project is not None else None
+    def list_projects(self, owner=None, limit=20, cursor=None, sort_by='created_at', fields=None, member=None):
+        """
+        Eine Seite Projektzusammenfassungen (ohne 'structure') per Keyset-Paginierung.
+        Gibt {'items': [...], 'next_cursor': str|None} zurück; sort_by mit '-' sortiert absteigend.
+        owner/member beschränken auf Projekte eines Besitzers bzw. mit diesem Mitglied (über Indizes).
+        """
+        return self._service.list_projects(owner=owner, limit=limit, cursor=cursor, sort_by=sort_by, fields=fields, member=member)
+    def save_project(self, project_data):
+        if isinstance(project_data, Project): project_data = project_data.to_dict()
+        # Fortschrittszähler beim Schreiben aktualisieren, damit Lesezugriffe sie nicht neu berechnen müssen
+        compute_progress(project_data)
+        return self._service.save_project(project_data)
+    def update_project_node(self, project_id, node_id, changes):
+        """Ändert einzelne Felder (siehe PATCHABLE_NODE_FIELDS) eines Knotens, ohne das ganze Projekt zu speichern."""
+        return self._service.update_project_node(project_id, node_id, changes)
     def delete_project(self, project_id): return self._service.delete_project(project_id)
-    def get_user(self, user_id): return self._service.get_user(user_id)
-    def find_user_by_email(self, email): return self._service.find_user_by_email(email)
-    def save_user(self, user_data): return self._service.save_user(user_data)
+    def get_user(self, user_id, as_model=False): return _as(User, self._service.get_user(user_id), as_model)
+    def find_user_by_email(self, email, as_model=False): return _as(User, self._service.find_user_by_email(email), as_model)
+    def save_user(self, user_data): return self._service.save_user(user_data.to_dict() if isinstance(user_data, User) else user_data)
+
+    def project_change_token(self):
+        """Token für den aktuellen Stand der Projekte (siehe project_changes)."""
+        return self._service.project_change_token()
+    def project_changes(self, since):
+        """
+        Seit dem Token since geänderte Projekte aller Worker: (neues Token, [(id, Projekt oder None), ...]),
+        None = since ist nicht mehr abgedeckt, der Leser muss neu aufbauen. Kosten ~ Zahl der Änderungen.
+        """
+        return self._service.project_changes(since)
+
+    def iter_records(self, collection, start_after=None):
+        """Generator über (id, Dokument) von 'projects' bzw. 'users' in id-Reihenfolge, ohne alles zu laden."""
+        return self._service.iter_records(collection, start_after)
+    def import_chunk_size(self, default):
+        """
+        Blockgröße für import_records. Das JSON-Backend schreibt bei jedem save_many die ganze Datei neu -
+        dort wird jede Collection mit einem Aufruf übernommen (None); im Speicher liegt sie dort ohnehin.
+        """
+        return None if type(self._service) is JsonService else default
+    def save_many(self, collection, records):
+        """Schreibt eine Liste von (id, Dokument)-Paaren gebündelt (Firestore: Batches mit max. 500 Operationen)."""
+        for key, record in records:
+            record['id'] = key
+            if collection == 'projects' and 'stats' not in record: compute_progress(record)
+        return self._service.save_many(collection, records)
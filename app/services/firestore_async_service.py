@@ -0,0 +1,128 @@
+# location: app/services/firestore_async_service.py
+# Cloud-Modus auf Basis von firestore.AsyncClient mit nebenläufigen Abrufen hinter einer synchronen Fassade.
+
+import asyncio
+import threading
+from firebase_admin import auth, firestore, firestore_async
+from ..config import Config
+from .firestore_service import FirestoreService
+
+class FirestoreAsyncService(FirestoreService):
+    """
+    Wie FirestoreService (inkl. Request-Cache und Schreib-Batch), aber unabhängige Abrufe laufen
+    nebenläufig auf einer eigenen Event-Loop im Hintergrund-Thread. Die öffentlichen Methoden
+    bleiben synchron, damit die Flask-Routen unverändert funktionieren. Wie viele Anfragen
+    gleichzeitig laufen, begrenzt FIRESTORE_MAX_CONCURRENCY.
+    """
+    FETCH_CHUNK = 100  # Dokumente pro get_all()-Aufruf beim parallelen Abrufen
+
+    def __init__(self, app_config=None):
+        super().__init__(app_config)
+        self.max_concurrency = self.config.get('FIRESTORE_MAX_CONCURRENCY', Config.FIRESTORE_MAX_CONCURRENCY)
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name='firestore-async', daemon=True).start()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)  # bindet sich erst bei Benutzung an die Loop
+        # Der AsyncClient muss auf der Loop erzeugt werden, auf der er später benutzt wird
+        self.adb = self._run(self._connect()) if self.db else None
+
+    async def _connect(self):
+        return firestore_async.client()
+
+    def _run(self, coro):
+        """Führt eine Koroutine auf der Hintergrund-Loop aus und wartet auf das Ergebnis."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _bounded(self, awaitable):
+        async with self._semaphore:
+            return await awaitable
+
+    async def _gather(self, *awaitables, return_exceptions=False):
+        return await asyncio.gather(*(self._bounded(a) for a in awaitables), return_exceptions=return_exceptions)
+
+    # --- Mehrfachabrufe ---
+    def _fetch_docs(self, collection, doc_ids):
+        """get_all() in Blöcken, die Blöcke laufen parallel."""
+        return self._run(self._fetch_docs_async(collection, doc_ids))
+
+    async def _fetch_docs_async(self, collection, doc_ids):
+        async def fetch(chunk):
+            refs = [self.adb.collection(collection).document(doc_id) for doc_id in chunk]
+            return [snapshot async for snapshot in self.adb.get_all(refs)]
+        chunks = [doc_ids[i:i + self.FETCH_CHUNK] for i in range(0, len(doc_ids), self.FETCH_CHUNK)]
+        fetched = {doc_id: None for doc_id in doc_ids}
+        for snapshots in await self._gather(*(fetch(chunk) for chunk in chunks)):
+            for snapshot in snapshots:
+                if snapshot.exists: fetched[snapshot.id] = snapshot.to_dict()
+        return fetched
+
+    def _stream(self, collection):
+        """Liest eine ganze Collection über Partitionen parallel statt in einem einzigen Stream."""
+        docs = self._run(self._stream_partitioned(collection))
+        state = self._request_state()
+        result = []
+        for doc_id, data in docs:
+            if state is not None and (collection, doc_id) not in state['dirty']: state['docs'][(collection, doc_id)] = data
+            result.append(dict(data))
+        return result
+
+    async def _stream_partitioned(self, collection):
+        group = self.adb.collection_group(collection)
+        partitions = [partition async for partition in group.get_partitions(self.max_concurrency)]
+        async def read(partition):
+            return [(doc.id, doc.to_dict()) async for doc in partition.query().stream()
+                    if doc.reference.parent.parent is None]  # nur die Top-Level-Collection
+        return [doc for chunk in await self._gather(*(read(p) for p in partitions)) for doc in chunk]
+
+    # --- Auth + Firestore gleichzeitig ---
+    def find_user_by_email(self, email):
+        """Auth-Lookup und Firestore-Abfrage nach E-Mail laufen parallel statt nacheinander."""
+        self._check_db()
+        state = self._request_state()
+        if state is not None and email in state['emails']: return super().find_user_by_email(email)
+        try:
+            user_record, user_doc = self._run(self._find_user_async(email))
+        except auth.UserNotFoundError: return None
+        except Exception as e: print(f"FEHLER: {e}"); return None
+        if state is not None:
+            state['emails'][email] = user_record
+            if user_doc is not None: state['docs'][('users', user_record.uid)] = dict(user_doc)
+        if user_doc is None: return super().find_user_by_email(email)  # Dokument ohne/anderes E-Mail-Feld
+        user_doc['id'] = user_record.uid
+        return user_doc
+
+    async def _find_user_async(self, email):
+        async def by_email():
+            query = self.adb.collection('users').where(filter=firestore.FieldFilter('email', '==', email)).limit(5)
+            return [doc async for doc in query.stream()]
+        user_record, docs = await self._gather(asyncio.to_thread(auth.get_user_by_email, email), by_email())
+        match = next((doc for doc in docs if doc.id == user_record.uid), None)
+        return user_record, match.to_dict() if match is not None else None
+
+    def save_admin_status(self, user_data, is_admin):
+        """
+        Schreibt das Benutzerdokument und setzt die Custom Claims gleichzeitig. Schlägt einer der
+        beiden Schritte fehl, wird das Dokument auf den vorherigen Status zurückgesetzt und der
+        Fehler weitergereicht.
+        """
+        self._check_db()
+        self.commit_batch()
+        user_data['is_admin'] = is_admin
+        try: self._run(self._save_admin_status_async(user_data, is_admin))
+        finally:
+            state = self._request_state()
+            if state is not None: state['docs'].pop(('users', user_data.get('id')), None)
+        return user_data
+
+    async def _save_admin_status_async(self, user_data, is_admin):
+        ref = self.adb.collection('users').document(user_data.get('id'))
+        doc_result, claims_result = await self._gather(
+            ref.set(user_data, merge=True),
+            asyncio.to_thread(auth.set_custom_user_claims, user_data.get('id'), {'admin': is_admin}),
+            return_exceptions=True
+        )
+        if isinstance(claims_result, Exception):
+            if not isinstance(doc_result, Exception):
+                user_data['is_admin'] = not is_admin
+                await ref.set({'is_admin': not is_admin}, merge=True)
+            raise claims_result
+        if isinstance(doc_result, Exception): raise doc_result
@@ -1,15 +1,42 @@
 # location: app/services/firestore_service.py
-# Implementiert die Methode zum Speichern von Benutzereinstellungen.
+# after_fork: der on_snapshot-Listener startet im Gunicorn-Worker neu, Leser des Änderungsfeeds bauen einmal neu auf.
 
+import copy
+import threading
+import time
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 import os
+from flask import g, has_request_context, current_app
 from ..config import Config
+from ..models.project import apply_node_changes, summary_source_fields, project_summary, SUMMARY_FIELDS
+from .change_feed import ChangeLog
+from .pagination import parse_sort, clamp_limit, sort_value, encode_cursor, decode_cursor
+
+def _deep_merge(target, data):
+    """Bildet set(..., merge=True) im Cache nach: verschachtelte Maps werden zusammengeführt."""
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict): _deep_merge(target[key], value)
+        else: target[key] = value
+    return target
+
+def _next_version(project):
+    """
+    Neue '_version' eines Projekts: die alte + 1, mindestens aber die aktuelle Zeit in Nanosekunden.
+    Firestore zählt nicht selbst mit; so bekommen auch zwei Worker mit demselben Ausgangsstand
+    verschiedene Versionen und Caches können keine fremde Fassung unter derselben Version halten.
+    """
+    return max(int(project.get('_version') or 0) + 1, time.time_ns())
 
 class FirestoreService:
+    WATCH_TIMEOUT = 60  # Sekunden bis zum ersten Stand des Listeners
+
     def __init__(self, app_config=None):
         self.config = app_config if app_config else {}
         self.debug_mode = self.config.get('APP_SETTINGS', {}).get('debug_mode', False)
+        self._project_changes = ChangeLog(self.config.get('CHANGE_FEED_MAX_ENTRIES', Config.CHANGE_FEED_MAX_ENTRIES))
+        self._watch = None
+        self._watch_lock = threading.Lock()
         if not firebase_admin._apps:
             try:
                 cred_path = Config.FIREBASE_CREDENTIALS_PATH
@@ -24,6 +51,138 @@ class FirestoreService:
     def _check_db(self):
         if not self.db: raise ConnectionError("Firestore ist nicht initialisiert.")
 
+    def after_fork(self):
+        """Der Listener (gRPC-Stream) überlebt fork nicht: im Worker neu starten, Leser bauen einmal neu auf."""
+        self._watch = None
+        self._watch_lock = threading.Lock()
+        self._project_changes.after_fork()
+        self._project_changes.truncate()
+
+    # --- Änderungsfeed (Suchindex, Katalog) ---
+    # Ein on_snapshot-Listener auf 'projects' liefert Änderungen aller Worker und Instanzen samt Dokument.
+    # Sein erster Stand ist der komplette Bestand (einmal je Prozess gelesen) und zählt nicht als Änderung.
+    def _watch_projects(self):
+        if self._watch is not None: return
+        with self._watch_lock:
+            if self._watch is not None: return
+            ready = threading.Event()
+            def on_snapshot(snapshot, changes, read_time):
+                if not ready.is_set():
+                    ready.set()
+                    return
+                for change in changes:
+                    data = None if change.type.name == 'REMOVED' else change.document.to_dict()
+                    self._project_changes.record(change.document.id, data)
+            watch = self.db.collection('projects').on_snapshot(on_snapshot)
+            if not ready.wait(self.WATCH_TIMEOUT):
+                watch.unsubscribe()
+                raise ConnectionError("Firestore-Listener für 'projects' hat keinen Stand geliefert.")
+            self._watch = watch
+
+    def project_change_token(self):
+        """Token für den aktuellen Stand; project_changes(token) liefert später alles, was sich seitdem geändert hat."""
+        self._check_db()
+        self._watch_projects()
+        return self._project_changes.token()
+
+    def project_changes(self, since):
+        """(neues Token, [(id, Projekt oder None = gelöscht), ...]) seit since, oder None: Leser muss neu aufbauen."""
+        self._check_db()
+        self._watch_projects()
+        changes = self._project_changes.since(since)
+        if changes is None: return None
+        token, entries = changes
+        return token, [(key, dict(data, id=key) if data is not None else None) for key, data in entries]
+
+    # --- Request-Cache & Schreib-Batch ---
+    # Innerhalb eines Requests werden gelesene Dokumente in flask.g gemerkt und alle Schreibzugriffe
+    # in einem WriteBatch gesammelt, der in after_request einmal committet wird. Außerhalb eines
+    # Requests (CLI, Skripte) wird direkt gelesen und geschrieben.
+    MAX_BATCH_OPS = 500  # Firestore-Limit pro Batch
+
+    def _request_state(self):
+        if not has_request_context(): return None
+        state = g.get('_firestore_state')
+        if state is None:
+            state = g._firestore_state = {'docs': {}, 'emails': {}, 'batch': None, 'ops': 0, 'dirty': set()}
+        return state
+
+    def _get_doc(self, collection, doc_id):
+        """Liest ein Dokument (oder None); pro Request höchstens einmal."""
+        state = self._request_state()
+        key = (collection, doc_id)
+        if state is not None:
+            if key in state['docs']: return copy.deepcopy(state['docs'][key])
+            if key in state['dirty']: self.commit_batch()  # ungecachter Merge-Schreibvorgang steht noch aus
+        snapshot = self.db.collection(collection).document(doc_id).get()
+        data = snapshot.to_dict() if snapshot.exists else None
+        if state is not None: state['docs'][key] = data
+        return copy.deepcopy(data)
+
+    def _get_docs(self, collection, doc_ids):
+        """Mehrere Dokumente mit einem get_all()-Aufruf; bereits gecachte werden nicht erneut geholt."""
+        state = self._request_state()
+        docs = state['docs'] if state is not None else {}
+        if state is not None and any((collection, doc_id) in state['dirty'] and (collection, doc_id) not in docs for doc_id in doc_ids):
+            self.commit_batch()
+        missing = [doc_id for doc_id in dict.fromkeys(doc_ids) if (collection, doc_id) not in docs]
+        if missing:
+            for doc_id, data in self._fetch_docs(collection, missing).items(): docs[(collection, doc_id)] = data
+        return [copy.deepcopy(docs[(collection, doc_id)]) for doc_id in doc_ids]
+
+    def _fetch_docs(self, collection, doc_ids):
+        """Holt Dokumente per get_all(); gibt id -> Daten (None = existiert nicht) zurück."""
+        fetched = {doc_id: None for doc_id in doc_ids}
+        refs = [self.db.collection(collection).document(doc_id) for doc_id in doc_ids]
+        for snapshot in self.db.get_all(refs):
+            if snapshot.exists: fetched[snapshot.id] = snapshot.to_dict()
+        return fetched
+
+    def _remember(self, state, collection, doc_id, data, merge):
+        key = (collection, doc_id)
+        if not merge: state['docs'][key] = copy.deepcopy(data)
+        elif key in state['docs']:
+            state['docs'][key] = _deep_merge(copy.deepcopy(state['docs'][key] or {}), copy.deepcopy(data))
+        else: state['dirty'].add(key)
+
+    def _set(self, collection, doc_id, data, merge=False):
+        ref = self.db.collection(collection).document(doc_id)
+        state = self._request_state()
+        if state is None: return ref.set(data, merge=merge)
+        self._batch(state).set(ref, copy.deepcopy(data), merge=merge)
+        self._remember(state, collection, doc_id, data, merge)
+
+    def _delete(self, collection, doc_id):
+        ref = self.db.collection(collection).document(doc_id)
+        state = self._request_state()
+        if state is None: return ref.delete()
+        self._batch(state).delete(ref)
+        state['docs'][(collection, doc_id)] = None
+        state['dirty'].discard((collection, doc_id))
+
+    def _batch(self, state):
+        if state['ops'] >= self.MAX_BATCH_OPS: self.commit_batch()
+        if state['batch'] is None: state['batch'] = self.db.batch()
+        state['ops'] += 1
+        return state['batch']
+
+    def commit_batch(self):
+        """Schreibt alle im aktuellen Request gesammelten Änderungen mit einem Commit."""
+        state = self._request_state()
+        if state is None or state['batch'] is None: return
+        batch = state['batch']
+        state['batch'], state['ops'] = None, 0
+        state['dirty'].clear()
+        batch.commit()
+
+    def after_request(self, response):
+        """after_request-Hook: committet den Batch; schlägt das fehl, wird aus der Antwort ein Fehler."""
+        try: self.commit_batch()
+        except Exception as e:
+            print(f"FEHLER beim Firestore-Commit: {e}")
+            return current_app.response_class(f"Speichern fehlgeschlagen: {e}", status=500)
+        return response
+
     def save_user_settings(self, user_id, settings):
         """NEU: Speichert ein Einstellungs-Dictionary für einen Benutzer mit verbesserter Struktur."""
         self._check_db()
@@ -32,8 +191,6 @@ class FirestoreService:
         # users/{user_id}/settings/{category}/data
         # users/{user_id}/settings/{category}/metadata
         
-        user_ref = self.db.collection('users').document(user_id)
-        
         # Organisiere Einstellungen nach Kategorien
         organized_settings = {}
         
@@ -59,15 +216,14 @@ class FirestoreService:
                     'version': '1.0'
                 })
         
-        # Mit hierarchischer Struktur speichern
-        return user_ref.set({'settings': organized_settings}, merge=True)
+        # Mit hierarchischer Struktur speichern (im Request-Batch)
+        return self._set('users', user_id, {'settings': organized_settings}, merge=True)
 
     def get_user_settings(self, user_id):
         """NEU: Lädt Einstellungen für einen bestimmten Benutzer mit verbesserter Struktur."""
         self._check_db()
-        user_doc = self.db.collection('users').document(user_id).get()
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
+        user_data = self._get_doc('users', user_id)
+        if user_data is not None:
             settings = user_data.get('settings', {})
             
             # Flache Struktur für Backward-Kompatibilität zurückgeben
@@ -103,15 +259,13 @@ class FirestoreService:
             }
         }
         
-        user_ref = self.db.collection('users').document(user_id)
-        return user_ref.set({'settings': log_settings}, merge=True)
+        return self._set('users', user_id, {'settings': log_settings}, merge=True)
 
     def get_user_log_colors(self, user_id):
         """Spezialisierte Methode zum Laden von Log-Farbeinstellungen."""
         self._check_db()
-        user_doc = self.db.collection('users').document(user_id).get()
-        if user_doc.exists:
-            user_data = user_doc.to_dict()
+        user_data = self._get_doc('users', user_id)
+        if user_data is not None:
             settings = user_data.get('settings', {})
             
             # Direkt auf Log-Farben zugreifen
@@ -163,22 +317,135 @@ class FirestoreService:
         return datetime.utcnow().isoformat() + 'Z'
 
     # --- (Restliche Methoden unverändert) ---
-    def get_all_users(self): self._check_db(); return [doc.to_dict() for doc in self.db.collection('users').stream()]
+    def get_all_users(self): self._check_db(); return self._stream('users')
     def find_user_by_email(self, email):
         self._check_db()
         try:
-            user_record = auth.get_user_by_email(email)
-            user_doc = self.db.collection('users').document(user_record.uid).get()
-            if user_doc.exists:
-                user_data = user_doc.to_dict()
-                user_data['id'] = user_doc.id
+            state = self._request_state()
+            user_record = state['emails'].get(email) if state is not None else None
+            if user_record is None:
+                user_record = auth.get_user_by_email(email)
+                if state is not None: state['emails'][email] = user_record
+            user_data = self._get_doc('users', user_record.uid)
+            if user_data is not None:
+                user_data['id'] = user_record.uid
                 return user_data
             return {'id': user_record.uid, 'email': user_record.email, 'username': user_record.display_name or email}
         except auth.UserNotFoundError: return None
         except Exception as e: print(f"FEHLER: {e}"); return None
-    def get_all_projects(self): self._check_db(); return [doc.to_dict() for doc in self.db.collection('projects').stream()]
-    def get_project(self, project_id): self._check_db(); doc = self.db.collection('projects').document(project_id).get(); return doc.to_dict() if doc.exists else None
-    def save_project(self, project_data): self._check_db(); self.db.collection('projects').document(project_data.get('id')).set(project_data); return project_data
-    def delete_project(self, project_id): self._check_db(); self.db.collection('projects').document(project_id).delete(); return True
-    def get_user(self, user_id): self._check_db(); doc = self.db.collection('users').document(user_id).get(); return doc.to_dict() if doc.exists else None
-    def save_user(self, user_data): self._check_db(); self.db.collection('users').document(user_data.get('id')).set(user_data, merge=True); return user_data
+    def _stream(self, collection):
+        """Liest eine ganze Collection und füllt dabei den Request-Cache."""
+        state = self._request_state()
+        result = []
+        for doc in self.db.collection(collection).stream():
+            data = doc.to_dict()
+            if state is not None and (collection, doc.id) not in state['dirty']: state['docs'][(collection, doc.id)] = copy.deepcopy(data)
+            result.append(data)
+        return result
+    def get_all_projects(self): self._check_db(); return self._stream('projects')
+    def get_project(self, project_id): self._check_db(); return self._get_doc('projects', project_id)
+    def get_projects(self, project_ids): self._check_db(); return [p for p in self._get_docs('projects', project_ids) if p is not None]
+    def save_project(self, project_data):
+        self._check_db()
+        project_data['_version'] = _next_version(project_data)
+        self._set('projects', project_data.get('id'), project_data)
+        return project_data
+    def delete_project(self, project_id): self._check_db(); self._delete('projects', project_id); return True
+    def get_user(self, user_id): self._check_db(); return self._get_doc('users', user_id)
+    def get_users(self, user_ids): self._check_db(); return [u for u in self._get_docs('users', user_ids) if u is not None]
+    def save_user(self, user_data): self._check_db(); self._set('users', user_data.get('id'), user_data, merge=True); return user_data
+
+    # --- Massen-Export/-Import (siehe services/migration.py) ---
+    EXPORT_PAGE_SIZE = 500
+
+    def iter_records(self, name, start_after=None):
+        """Generator über (id, Dokument) in id-Reihenfolge; seitenweise, damit nie die ganze Collection im Speicher liegt."""
+        self._check_db()
+        while True:
+            query = self.db.collection(name).order_by('__name__').limit(self.EXPORT_PAGE_SIZE)
+            if start_after is not None: query = query.start_after({'__name__': start_after})
+            count = 0
+            for doc in query.stream():
+                count += 1
+                start_after = doc.id
+                yield doc.id, doc.to_dict()
+            if count < self.EXPORT_PAGE_SIZE: return
+
+    def save_many(self, name, records):
+        """Schreibt (id, Dokument)-Paare direkt in WriteBatches zu höchstens MAX_BATCH_OPS Operationen."""
+        self._check_db()
+        state = self._request_state()
+        for start in range(0, len(records), self.MAX_BATCH_OPS):
+            batch = self.db.batch()
+            for key, record in records[start:start + self.MAX_BATCH_OPS]:
+                if name == 'projects': record['_version'] = _next_version(record)
+                batch.set(self.db.collection(name).document(key), record)
+                if state is not None: state['docs'].pop((name, key), None)
+            batch.commit()
+        return len(records)
+
+    def get_project_access(self, project_id):
+        """Besitzer und Mitglieder eines Projekts; ohne Request-Cache werden nur diese beiden Felder gelesen."""
+        self._check_db()
+        state = self._request_state()
+        key = ('projects', project_id)
+        if state is not None and key in state['docs']: project = state['docs'][key]
+        else:
+            if state is not None and key in state['dirty']: self.commit_batch()
+            snapshot = self.db.collection('projects').document(project_id).get(field_paths=['owner', 'members'])
+            project = snapshot.to_dict() if snapshot.exists else None
+        if project is None: return None
+        return {'owner': project.get('owner'), 'members': list(project.get('members') or ())}
+
+    def list_projects(self, owner=None, limit=20, cursor=None, sort_by='created_at', fields=None, member=None):
+        """Eine Seite Projektzusammenfassungen; select() lädt nur die benötigten Felder, nicht die Struktur."""
+        self._check_db()
+        field, descending = parse_sort(sort_by)
+        fields = tuple(fields or SUMMARY_FIELDS)
+        limit = clamp_limit(limit)
+        direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+        query = self.db.collection('projects')
+        if owner is not None: query = query.where(filter=firestore.FieldFilter('owner', '==', owner))
+        if member is not None: query = query.where(filter=firestore.FieldFilter('members', 'array_contains', member))
+        query = (query.select([name for name in summary_source_fields(fields) if name not in ('id', field)] + [field])
+                 .order_by(field, direction=direction)
+                 .order_by('__name__', direction=direction))
+        cursor_key = decode_cursor(cursor)
+        if cursor_key: query = query.start_after({field: cursor_key[0], '__name__': cursor_key[1]})
+        docs = list(query.limit(limit + 1).stream())
+        page = docs[:limit]
+        items = []
+        for doc in page:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            items.append(project_summary(data, fields))
+        next_cursor = None
+        if len(docs) > limit:
+            last = page[-1]
+            next_cursor = encode_cursor(sort_value(last.to_dict(), field), last.id)
+        return {'items': items, 'next_cursor': next_cursor}
+
+    def update_project_node(self, project_id, node_id, changes):
+        """
+        Ändert Felder eines einzelnen Knotens. Firestore kann Array-Elemente nicht per Feldpfad
+        adressieren, daher werden in einer Transaktion nur 'structure', 'stats' und '_version' aktualisiert
+        (update statt set) - parallele Änderungen an anderen Feldern bleiben erhalten.
+        """
+        self._check_db()
+        self.commit_batch()  # die Transaktion muss ausstehende Schreibvorgänge sehen
+        ref = self.db.collection('projects').document(project_id)
+
+        @firestore.transactional
+        def _update(transaction):
+            snapshot = ref.get(transaction=transaction)
+            if not snapshot.exists: return None
+            project = snapshot.to_dict()
+            node = apply_node_changes(project, node_id, changes)
+            if node is None: return None
+            transaction.update(ref, {'structure': project.get('structure', []), 'stats': project.get('stats'), '_version': _next_version(project)})
+            return node
+
+        node = _update(self.db.transaction())
+        state = self._request_state()
+        if state is not None: state['docs'].pop(('projects', project_id), None)
+        return node
@@ -0,0 +1,173 @@
+# location: app/services/journal_service.py
+# Kompaktierer startet erst, wenn das Journal die Schwelle erreicht - nie im Gunicorn-Master vor dem Fork.
+
+import json
+import os
+import threading
+from ..config import Config
+from .json_service import JsonService, _ProjectCollection, _UserCollection
+from ..models.project import apply_node_changes
+
+class JournalService(JsonService):
+    """
+    Wie JsonService, schreibt Änderungen aber nicht mehr als komplette Datei,
+    sondern als eine Zeile pro Upsert/Löschung in ein Journal. projects.json und
+    users.json dienen als Snapshot; beim Start wird Snapshot + Journal eingespielt.
+    Übersteigt das Journal die Schwelle, schreibt ein Hintergrund-Thread einen
+    neuen Snapshot und kürzt das Journal. Der Thread wird erst dann gestartet, im
+    Gunicorn-Betrieb also im Worker und nicht im Master vor dem Fork.
+    """
+    def __init__(self, app_config=None):
+        config = app_config if app_config else {}
+        self.journal_file = Config.JSON_JOURNAL_PATH
+        self.compact_threshold = config.get('JOURNAL_COMPACT_THRESHOLD', Config.JOURNAL_COMPACT_THRESHOLD)
+        self.fsync = config.get('JOURNAL_FSYNC', Config.JOURNAL_FSYNC)
+        self._log_signature = None  # (Inode, Offset bis zu dem eingespielt wurde)
+        self._log_entries = 0
+        super().__init__(app_config)
+        self._compact_event = threading.Event()
+        self._compactor_pid = None  # Prozess, in dem der Kompaktierer läuft
+        with self._locked(self.journal_file): self._recover(repair=True)
+
+    def after_fork(self):
+        """Threads überleben fork nicht: der Worker startet bei Bedarf einen eigenen Kompaktierer."""
+        super().after_fork()
+        self._compact_event = threading.Event()
+
+    def _ensure_files_exist(self):
+        super()._ensure_files_exist()
+        if not os.path.exists(self.journal_file):
+            open(self.journal_file, 'a', encoding='utf-8').close()
+
+    # --- Wiederherstellung & Einspielen ---
+    def _recover(self, repair=False):
+        """Lädt die Snapshots und spielt das komplette Journal darüber."""
+        with self._cache_lock:
+            old = self._cache.get(self.projects_file)
+            projects = self._cache[self.projects_file] = _ProjectCollection(None, self._read_data(self.projects_file))
+            self._cache[self.users_file] = _UserCollection(None, self._read_data(self.users_file))
+            self._log_signature = (os.stat(self.journal_file).st_ino, 0)
+            self._log_entries = 0
+            self._replay()
+            self._track_changes(projects, old)
+            if repair and os.path.getsize(self.journal_file) > self._log_signature[1]:
+                # Beim Start: abgebrochene letzte Zeile abschneiden, sonst klebt der nächste Eintrag daran
+                print("WARNUNG: Unvollständigen Journal-Eintrag nach Absturz entfernt.")
+                os.truncate(self.journal_file, self._log_signature[1])
+
+    def _replay(self):
+        """Spielt alle Journalzeilen ab dem zuletzt bekannten Offset ein."""
+        inode, offset = self._log_signature
+        with open(self.journal_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # unvollständige letzte Zeile (Absturz beim Schreiben oder Schreiber noch aktiv)
+                try: entry = json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"WARNUNG: Beschädigter Journal-Eintrag bei Offset {offset} übersprungen.")
+                    offset += len(line)
+                    continue
+                self._apply(entry)
+                offset += len(line)
+                self._log_entries += 1
+        self._log_signature = (inode, offset)
+
+    def _apply(self, entry):
+        collection = self._cache[self._file_for(entry.get('c'))]
+        op = entry.get('op')
+        if op == 'del': collection.remove(entry.get('id'))
+        elif op == 'node':
+            project = collection.records.get(entry.get('id'))
+            if project is not None:
+                apply_node_changes(project, entry.get('node'), entry.get('set', {}), collection.node_index(entry.get('id')))
+                project['_version'] = entry.get('v', project.get('_version', 0))
+                collection.touch(entry.get('id'))
+        else: collection.put(entry.get('id'), entry.get('doc'))
+
+    def _collection(self, file_path):
+        """Liefert die Collection aus dem Speicher; fremde Journal-Anhänge und Kompaktierungen werden nachgezogen."""
+        with self._cache_lock:
+            try: st = os.stat(self.journal_file)
+            except FileNotFoundError: st = None
+            if st is None or st.st_ino != self._log_signature[0]:
+                self.cache_misses += 1
+                # Unter der Journal-Sperre: Snapshot und Journal passen sonst evtl. nicht zusammen (laufende Kompaktierung)
+                with self._locked(self.journal_file):
+                    self._ensure_files_exist()
+                    self._recover()
+            elif st.st_size > self._log_signature[1]:
+                self.cache_misses += 1
+                self._replay()
+            else:
+                self.cache_hits += 1
+            return self._cache[file_path]
+
+    # --- Schreiben ---
+    def _lock_path(self, file_path): return self.journal_file + '.lock'  # ein Journal für beide Collections
+    def _persist(self, file_path, collection, key, record):
+        """Hängt ein Upsert/Löschen an das Journal an; Kosten ~ Größe der Änderung."""
+        entry = {'c': self._name_for(file_path), 'op': 'del' if record is None else 'put', 'id': key}
+        if record is not None: entry['doc'] = record
+        self._append(entry)
+
+    def _persist_many(self, file_path, collection, records):
+        name = self._name_for(file_path)
+        self._append(*({'c': name, 'op': 'put', 'id': key, 'doc': record} for key, record in records))
+
+    def _persist_node(self, collection, project_id, node_id, changes, project):
+        """Nur die geänderten Felder des Knotens landen im Journal, nicht das ganze Projekt."""
+        # Der Datensatz ist bereits geändert; das Einspielen des eigenen Eintrags ist idempotent
+        self._append({'c': 'projects', 'op': 'node', 'id': project_id, 'node': node_id, 'set': changes, 'v': project['_version']})
+
+    def _append(self, *entries):
+        lines = b''.join((json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8') for entry in entries)
+        try:
+            with open(self.journal_file, 'ab') as f:
+                f.write(lines)
+                f.flush()
+                if self.fsync: os.fsync(f.fileno())
+        except Exception:
+            self._recover()  # Speicherstand wieder an Snapshot + Journal angleichen
+            raise
+        self._replay()
+        if self._log_entries >= self.compact_threshold: self._request_compaction()
+
+    # --- Kompaktierung ---
+    def _request_compaction(self):
+        """Weckt den Kompaktierer und startet ihn beim ersten Mal in diesem Prozess (Aufrufer hält _cache_lock)."""
+        if self._compactor_pid != os.getpid():
+            self._compactor_pid = os.getpid()
+            threading.Thread(target=self._compaction_loop, name='journal-compactor', daemon=True).start()
+        self._compact_event.set()
+
+    def _compaction_loop(self):
+        while True:
+            self._compact_event.wait()
+            self._compact_event.clear()
+            try: self.compact()
+            except Exception as e: print(f"FEHLER bei der Journal-Kompaktierung: {e}")
+
+    def compact(self):
+        """
+        Schreibt einen neuen Snapshot und ersetzt das Journal durch ein leeres. Die Journal-Sperre wird
+        vom Einlesen bis zum Austausch des Journals gehalten: kompaktieren zwei Prozesse gleichzeitig,
+        wartet der zweite und findet danach ein leeres Journal vor, statt einen älteren Snapshot über
+        einen neueren zu schreiben. Schreiber aller Prozesse warten so lange.
+        """
+        with self._locked(self.journal_file):
+            self._collection(self.projects_file)  # Anhänge/Kompaktierungen anderer Prozesse einspielen
+            if self._log_signature[1] == 0: return
+            for file_path in (self.projects_file, self.users_file):
+                self._write_data(file_path, self._cache[file_path].serialize())
+            tmp_path = f"{self.journal_file}.tmp.{os.getpid()}"
+            with open(tmp_path, 'wb') as f: os.fsync(f.fileno())
+            # Neues Journal = neuer Inode; andere Prozesse erkennen daran die Kompaktierung und laden den Snapshot
+            os.replace(tmp_path, self.journal_file)
+            self._log_signature = (os.stat(self.journal_file).st_ino, 0)
+            self._log_entries = 0
+
+    def journal_stats(self):
+        """Gibt Größe und Eintragszahl des Journals zurück."""
+        with self._cache_lock:
+            return {'entries': self._log_entries, 'bytes': self._log_signature[1], 'compact_threshold': self.compact_threshold}
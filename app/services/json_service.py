@@ -1,23 +1,159 @@
 # location: app/services/json_service.py
-# Implementiert die get_all_users-Methode.
+# after_fork: Sperren eines per fork gestarteten Workers neu anlegen (Gunicorn preload_app).
 
+import copy
 import json
 import os
+import threading
 import uuid
+from bisect import bisect_left, insort
+from contextlib import contextmanager
 from ..config import Config
+from ..models.project import apply_node_changes, compute_progress, NodeIndex, project_summary, SUMMARY_FIELDS
+from ..models.view import ReadOnlyView
+from .change_feed import ChangeLog
+from .pagination import parse_sort, clamp_limit, sort_value, encode_cursor, decode_cursor, keyset_page
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur die prozessinterne Sperre greift
+    fcntl = None
+
+class VersionConflictError(Exception):
+    """Das Dokument wurde seit dem Lesen von einem anderen Schreiber geändert; neu laden und erneut versuchen."""
+    def __init__(self, key, expected, current):
+        super().__init__(f"Versionskonflikt für '{key}': erwartet {expected}, gespeichert ist {current}.")
+        self.key, self.expected, self.current = key, expected, current
+
+class _Collection:
+    """Geparste Datei samt Indizes. Wird bei externer Dateiänderung komplett neu aufgebaut."""
+    def __init__(self, signature, records):
+        self.signature = signature
+        self.records = {}  # Primärschlüssel -> Datensatz (Reihenfolge = Dateireihenfolge)
+        for key, record in records: self.put(key, record)
+    def put(self, key, record):
+        old = self.records.get(key)
+        if old is not None: self._unindex(key, old)
+        self.records[key] = record
+        self._index(key, record)
+    def remove(self, key):
+        old = self.records.pop(key, None)
+        if old is not None: self._unindex(key, old)
+        return old
+    def _index(self, key, record): pass
+    def _unindex(self, key, record): pass
+
+class _ProjectCollection(_Collection):
+    """Projekte: id -> Projekt, zusätzlich id -> Besitzer, Besitzer -> ids, Mitglied -> ids und (lazy) Knoten-Indizes."""
+    def __init__(self, signature, data):
+        self.on_change = None  # on_change(id) nach jeder Änderung, gesetzt erst nach dem Laden
+        self.owner_of = {}
+        self.by_owner = {}
+        self.by_member = {}
+        self.node_indexes = {}
+        self.sort_indexes = {}  # Feld -> aufsteigend sortierte Liste (Sortierwert, id), lazy aufgebaut
+        records = []
+        for project in data if isinstance(data, list) else []:
+            if not project.get('id'): project['id'] = str(uuid.uuid4())
+            if 'stats' not in project: compute_progress(project)  # Altdaten: Zähler beim Laden nachtragen
+            records.append((project['id'], project))
+        super().__init__(signature, records)
+    def sorted_keys(self, field):
+        """Sortierindex für ein Feld; beim ersten Zugriff aufgebaut, danach per Einfügen/Entfernen gepflegt."""
+        keys = self.sort_indexes.get(field)
+        if keys is None:
+            keys = self.sort_indexes[field] = sorted((sort_value(record, field), key) for key, record in self.records.items())
+        return keys
+    def _index(self, key, record):
+        for field, keys in self.sort_indexes.items(): insort(keys, (sort_value(record, field), key))
+        owner = record.get('owner')
+        if owner:
+            self.owner_of[key] = owner
+            self.by_owner.setdefault(owner, {})[key] = None  # dict als geordnete Menge
+        for member in record.get('members') or ():
+            self.by_member.setdefault(member, {})[key] = None
+    def put(self, key, record):
+        # Derselbe, in place geänderte Datensatz (update_project_node): der Knoten-Index bleibt gültig
+        index = self.node_indexes.get(key) if self.records.get(key) is record else None
+        super().put(key, record)
+        if index is not None: self.node_indexes[key] = index
+        self.touch(key)
+    def remove(self, key):
+        old = super().remove(key)
+        if old is not None: self.touch(key)
+        return old
+    def touch(self, key):
+        if self.on_change is not None: self.on_change(key)
+    def diff(self, old):
+        """ids, die sich gegenüber einer älteren Fassung derselben Datei geändert haben (per _version)."""
+        changed = [key for key, record in self.records.items()
+                   if key not in old.records or old.records[key].get('_version') != record.get('_version')]
+        return changed + [key for key in old.records if key not in self.records]
+    def node_index(self, key):
+        """Knoten-Index eines Projekts; wird beim ersten Zugriff gebaut und beim Ersetzen verworfen."""
+        index = self.node_indexes.get(key)
+        if index is None and key in self.records:
+            index = self.node_indexes[key] = NodeIndex(self.records[key])
+        return index
+    def _unindex(self, key, record):
+        self.node_indexes.pop(key, None)
+        for field, keys in self.sort_indexes.items():
+            entry = (sort_value(record, field), key)
+            i = bisect_left(keys, entry)
+            if i < len(keys) and keys[i] == entry: del keys[i]
+        owner = self.owner_of.pop(key, None)
+        if owner:
+            ids = self.by_owner.get(owner, {})
+            ids.pop(key, None)
+            if not ids: self.by_owner.pop(owner, None)
+        for member in record.get('members') or ():
+            ids = self.by_member.get(member, {})
+            ids.pop(key, None)
+            if not ids: self.by_member.pop(member, None)
+    def serialize(self): return list(self.records.values())
+
+class _UserCollection(_Collection):
+    """Benutzer: id -> Benutzer, zusätzlich normalisierte E-Mail -> id."""
+    def __init__(self, signature, data):
+        self.by_email = {}
+        super().__init__(signature, (data if isinstance(data, dict) else {}).items())
+    @staticmethod
+    def normalize_email(email): return (email or '').strip().casefold()
+    def _index(self, key, record):
+        email = self.normalize_email(record.get('email'))
+        if email: self.by_email[email] = key
+    def _unindex(self, key, record):
+        email = self.normalize_email(record.get('email'))
+        if email and self.by_email.get(email) == key: del self.by_email[email]
+    def serialize(self): return self.records
 
 class JsonService:
     def __init__(self, app_config=None):
         self.projects_file = Config.JSON_PROJECTS_PATH
         self.users_file = Config.JSON_USERS_PATH
-        self._ensure_files_exist()
+        # Dokument-Cache: Pfad -> _Collection (geparste Daten + Indizes + Datei-Signatur)
+        self._cache = {}
+        self._cache_lock = threading.RLock()
+        self._held_locks = {}  # Sperrdatei -> [Dateideskriptor, Verschachtelungstiefe]
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.config = app_config if app_config else {}
+        self._project_changes = ChangeLog(self.config.get('CHANGE_FEED_MAX_ENTRIES', Config.CHANGE_FEED_MAX_ENTRIES))
+        self._ensure_files_exist()
         self.debug_mode = self.config.get('APP_SETTINGS', {}).get('debug_mode', False)
 
+    def after_fork(self):
+        """
+        Im per fork gestarteten Worker (Gunicorn preload_app): Sperren neu anlegen - ein Thread des
+        Elternprozesses könnte sie beim fork gehalten haben und existiert im Kind nicht mehr.
+        """
+        self._cache_lock = threading.RLock()
+        self._held_locks = {}
+        self._project_changes.after_fork()
+
     def get_all_users(self):
         """NEU: Gibt eine Liste aller Benutzer-Dictionaries zurück."""
-        users = self._read_data(self.users_file)
-        return list(users.values())
+        return [copy.deepcopy(u) for u in self._users().records.values()]
     
     # --- (Restliche Methoden bleiben unverändert) ---
     def _ensure_files_exist(self):
@@ -25,57 +161,226 @@ class JsonService:
             if not os.path.exists(path):
                 os.makedirs(os.path.dirname(path), exist_ok=True)
                 with open(path, 'w', encoding='utf-8') as f: json.dump([] if 'projects' in path else {}, f)
+    def _file_signature(self, file_path):
+        """Signatur zur Erkennung externer Änderungen (mtime, Größe, Inode)."""
+        try: st = os.stat(file_path)
+        except OSError: return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
     def _read_data(self, file_path):
         try:
             with open(file_path, 'r', encoding='utf-8') as f: return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError): return [] if 'projects' in file_path else {}
+        except FileNotFoundError: return [] if 'projects' in file_path else {}
+        except json.JSONDecodeError as e:
+            # Nicht stillschweigend leer weitermachen: der nächste Schreibvorgang würde sonst alle Daten überschreiben
+            raise RuntimeError(f"{file_path} enthält kein gültiges JSON ({e}).") from e
+    def _collection(self, file_path):
+        """Liefert die Collection aus dem Cache; parst die Datei und baut die Indizes nur nach Änderungen neu auf."""
+        signature = self._file_signature(file_path)
+        with self._cache_lock:
+            collection = self._cache.get(file_path)
+            if collection is not None and signature is not None and collection.signature == signature:
+                self.cache_hits += 1
+                return collection
+            self.cache_misses += 1
+            factory = _ProjectCollection if file_path == self.projects_file else _UserCollection
+            collection = factory(signature, self._read_data(file_path))
+            if file_path == self.projects_file: self._track_changes(collection, self._cache.get(file_path))
+            self._cache[file_path] = collection
+            return collection
+    def _track_changes(self, collection, old):
+        """Meldet die Unterschiede zur bisherigen Fassung (Schreiber anderer Prozesse) und hängt den Feed an die neue an."""
+        if old is not None:
+            for key in collection.diff(old): self._project_changes.record(key)
+        collection.on_change = self._project_changes.record
+    def _projects(self): return self._collection(self.projects_file)
+    def _file_for(self, name):
+        if name not in ('projects', 'users'): raise ValueError(f"Unbekannte Collection: {name}")
+        return self.projects_file if name == 'projects' else self.users_file
+    def _name_for(self, file_path): return 'projects' if file_path == self.projects_file else 'users'
+    def _users(self): return self._collection(self.users_file)
     def _write_data(self, file_path, data):
-        with open(file_path, 'w', encoding='utf-8') as f: json.dump(data, f, indent=4, ensure_ascii=False)
-    def get_user_count(self): return len(self._read_data(self.users_file))
-    def get_all_projects(self): return self._read_data(self.projects_file)
-    def get_project(self, project_id): return next((p for p in self.get_all_projects() if p.get('id') == project_id), None)
+        """Schreibt in eine temporäre Datei und ersetzt das Original atomar - Leser sehen nie eine halbe Datei."""
+        tmp_path = f"{file_path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=4, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
+    def _lock_path(self, file_path): return file_path + '.lock'
+    @contextmanager
+    def _locked(self, file_path):
+        """Exklusive Schreibsperre über Threads und Prozesse hinweg (flock auf <datei>.lock), reentrant."""
+        with self._cache_lock:
+            lock_path = self._lock_path(file_path)
+            held = self._held_locks.get(lock_path)
+            if held: held[1] += 1
+            else:
+                fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl: fcntl.flock(fd, fcntl.LOCK_EX)
+                held = self._held_locks[lock_path] = [fd, 1]
+            try: yield
+            finally:
+                held[1] -= 1
+                if held[1] == 0:
+                    del self._held_locks[lock_path]
+                    if fcntl: fcntl.flock(held[0], fcntl.LOCK_UN)
+                    os.close(held[0])
+    def _stamp_version(self, collection, key, record):
+        """Optimistische Versionierung: trägt der Datensatz eine veraltete _version, wird abgebrochen."""
+        current = collection.records.get(key)
+        current_version = current.get('_version', 0) if current is not None else 0
+        expected = record.get('_version')
+        if expected is not None and expected != current_version:
+            raise VersionConflictError(key, expected, current_version)
+        record['_version'] = current_version + 1
+    def _commit(self, file_path, key, record):
+        """Übernimmt ein Upsert (record) bzw. Löschen (record=None) unter Sperre in Cache, Indizes und Datei."""
+        with self._locked(file_path):
+            collection = self._collection(file_path)  # unter der Sperre frisch: Änderungen anderer Prozesse sind eingelesen
+            if record is not None: self._stamp_version(collection, key, record)
+            self._persist(file_path, collection, key, record)
+        return record
+    def _persist(self, file_path, collection, key, record):
+        if record is None: collection.remove(key)
+        else: collection.put(key, record)
+        self._flush(file_path, collection)
+    def _persist_many(self, file_path, collection, records):
+        for key, record in records: collection.put(key, record)
+        self._flush(file_path, collection)
+    def _flush(self, file_path, collection):
+        try: self._write_data(file_path, collection.serialize())
+        except Exception:
+            # Cache und Datei könnten auseinanderlaufen -> beim nächsten Lesen neu parsen (Feed-Leser bauen neu auf)
+            self._cache.pop(file_path, None)
+            if file_path == self.projects_file: self._project_changes.truncate()
+            raise
+        collection.signature = self._file_signature(file_path)
+    def cache_stats(self):
+        """Gibt die Trefferzähler des Dokument-Caches zurück."""
+        with self._cache_lock:
+            return {'hits': self.cache_hits, 'misses': self.cache_misses, 'files': len(self._cache)}
+    # Lesende Methoden geben tiefe Kopien zurück, damit Aufrufer (z.B. das Dashboard) auch in
+    # verschachtelten Feldern (structure, settings) nichts in den gecachten Datensätzen hinterlassen.
+    # Zum reinen Lesen ohne Kopie: get_project_view.
+    def get_user_count(self): return len(self._users().records)
+    def get_all_projects(self): return [copy.deepcopy(p) for p in self._projects().records.values()]
+    def get_project(self, project_id):
+        project = self._projects().records.get(project_id)
+        return copy.deepcopy(project) if project is not None else None
+    def get_project_view(self, project_id):
+        """Sicht auf den gecachten Datensatz statt einer Kopie - nur zum Lesen (Templates)."""
+        project = self._projects().records.get(project_id)
+        return ReadOnlyView(project) if project is not None else None
+    def get_projects(self, project_ids):
+        records = self._projects().records
+        return [copy.deepcopy(records[project_id]) for project_id in project_ids if project_id in records]
+    def get_project_owner(self, project_id): return self._projects().owner_of.get(project_id)
+    def get_project_access(self, project_id):
+        """Besitzer und Mitglieder eines Projekts (für Zugriffsprüfungen) ohne Kopie des Projekts."""
+        project = self._projects().records.get(project_id)
+        return {'owner': project.get('owner'), 'members': list(project.get('members') or ())} if project is not None else None
     def save_project(self, project_data):
-        projects = self.get_all_projects()
-        project_id = project_data.get('id')
-        if not project_id: project_data['id'] = str(uuid.uuid4()); projects.append(project_data)
-        else:
-            index = next((i for i, p in enumerate(projects) if p.get('id') == project_id), -1)
-            if index != -1: projects[index] = project_data
-            else: projects.append(project_data)
-        self._write_data(self.projects_file, projects)
+        if not project_data.get('id'): project_data['id'] = str(uuid.uuid4())
+        stored = self._commit(self.projects_file, project_data['id'], copy.deepcopy(project_data))
+        project_data['_version'] = stored['_version']
         return project_data
+    def list_projects(self, owner=None, limit=20, cursor=None, sort_by='created_at', fields=None, member=None):
+        """Eine Seite Projektzusammenfassungen per Keyset-Paginierung über den Sortierindex."""
+        field, descending = parse_sort(sort_by)
+        fields = tuple(fields or SUMMARY_FIELDS)
+        with self._cache_lock:
+            collection = self._projects()
+            if owner is None and member is None: entries = collection.sorted_keys(field)
+            else:
+                # Nur die Projekte des Besitzers/Mitglieds sortieren - die Kosten hängen nicht von der Gesamtzahl ab
+                keys = collection.by_owner.get(owner, {}) if owner is not None else collection.by_member.get(member, {})
+                if owner is not None and member is not None: keys = [key for key in keys if key in collection.by_member.get(member, ())]
+                entries = sorted((sort_value(collection.records[key], field), key) for key in keys)
+            page, has_more = keyset_page(entries, decode_cursor(cursor), clamp_limit(limit), descending)
+            items = [project_summary(collection.records[key], fields) for _, key in page]
+        return {'items': items, 'next_cursor': encode_cursor(*page[-1]) if has_more and page else None}
+    def update_project_node(self, project_id, node_id, changes):
+        """Ändert Felder eines einzelnen Knotens; gibt den Knoten zurück oder None."""
+        with self._locked(self.projects_file):
+            collection = self._projects()
+            project = collection.records.get(project_id)
+            if project is None: return None
+            node = apply_node_changes(project, node_id, changes, collection.node_index(project_id))
+            if node is None: return None
+            project['_version'] = project.get('_version', 0) + 1
+            self._persist_node(collection, project_id, node_id, changes, project)
+        return copy.deepcopy(node)
+    def _persist_node(self, collection, project_id, node_id, changes, project):
+        # Das JSON-Format kennt nur die ganze Datei - hier bleibt es beim kompletten (atomaren) Schreiben
+        self._persist(self.projects_file, collection, project_id, project)
     def delete_project(self, project_id):
-        projects = self.get_all_projects()
-        updated = [p for p in projects if p.get('id') != project_id]
-        if len(projects) != len(updated): self._write_data(self.projects_file, updated); return True
-        return False
-    def get_user(self, user_id): return self._read_data(self.users_file).get(user_id)
+        with self._locked(self.projects_file):
+            if project_id not in self._projects().records: return False
+            self._commit(self.projects_file, project_id, None)
+        return True
+    # --- Änderungsfeed (Suchindex, Katalog) ---
+    def project_change_token(self):
+        """Token für den aktuellen Stand; project_changes(token) liefert später alles, was sich seitdem geändert hat."""
+        self._projects()  # Änderungen anderer Prozesse vorher einlesen
+        return self._project_changes.token()
+    def project_changes(self, since):
+        """(neues Token, [(id, Projekt oder None = gelöscht), ...]) seit since, oder None: Leser muss neu aufbauen."""
+        with self._cache_lock:
+            records = self._projects().records
+            changes = self._project_changes.since(since)
+            if changes is None: return None
+            token, keys = changes
+            return token, [(key, copy.deepcopy(records[key]) if key in records else None) for key, _ in keys]
+    # --- Massen-Export/-Import (siehe services/migration.py) ---
+    def iter_records(self, name, start_after=None):
+        """Generator über (id, Datensatz) einer Collection in id-Reihenfolge, ab start_after (exklusiv)."""
+        collection = self._collection(self._file_for(name))
+        for key in sorted(key for key in collection.records if start_after is None or key > start_after):
+            record = collection.records.get(key)
+            if record is not None: yield key, copy.deepcopy(record)
+    def save_many(self, name, records):
+        """Übernimmt (id, Datensatz)-Paare mit einem Schreibvorgang; vorhandene Datensätze werden ersetzt."""
+        file_path = self._file_for(name)
+        with self._locked(file_path):
+            collection = self._collection(file_path)
+            records = [(key, copy.deepcopy(record)) for key, record in records]  # spätere Änderungen des Aufrufers bleiben außen vor
+            for key, record in records:
+                # Ohne Konfliktprüfung (Import/Massenänderung), aber mit neuer Version - andere Prozesse erkennen Änderungen daran
+                current = collection.records.get(key)
+                record['_version'] = (current.get('_version', 0) if current is not None else 0) + 1
+            self._persist_many(file_path, collection, records)
+        return len(records)
+    def get_user(self, user_id):
+        user = self._users().records.get(user_id)
+        return copy.deepcopy(user) if user is not None else None
+    def get_users(self, user_ids):
+        records = self._users().records
+        return [copy.deepcopy(records[user_id]) for user_id in user_ids if user_id in records]
     def find_user_by_email(self, email):
-        users = self._read_data(self.users_file)
-        for user_data in users.values():
-            if user_data.get('email') == email: return user_data
-        return None
+        users = self._users()
+        user_id = users.by_email.get(users.normalize_email(email))
+        return copy.deepcopy(users.records[user_id]) if user_id is not None else None
     def save_user(self, user_data):
-        users = self._read_data(self.users_file)
-        users[user_data.get('id')] = user_data
-        self._write_data(self.users_file, users)
+        stored = self._commit(self.users_file, user_data.get('id'), copy.deepcopy(user_data))
+        user_data['_version'] = stored['_version']
         return user_data
     
     def save_user_settings(self, user_id, settings):
         """NEU: Speichert ein Einstellungs-Dictionary für einen Benutzer (JSON-Version)."""
-        users = self._read_data(self.users_file)
-        if user_id in users:
-            users[user_id]['settings'] = settings
-            self._write_data(self.users_file, users)
-            return True
-        return False
+        with self._locked(self.users_file):
+            user = self._users().records.get(user_id)
+            if user is None: return False
+            self._commit(self.users_file, user_id, dict(user, settings=copy.deepcopy(settings)))
+        return True
 
     def get_user_settings(self, user_id):
         """NEU: Lädt Einstellungen für einen bestimmten Benutzer (JSON-Version)."""
-        users = self._read_data(self.users_file)
-        if user_id in users:
-            return users[user_id].get('settings', {})
-        return {}
+        user = self._users().records.get(user_id)
+        return copy.deepcopy(user.get('settings', {})) if user is not None else {}
 
     def save_user_log_colors(self, user_id, log_colors):
         """Spezialisierte Methode für Log-Farbeinstellungen (JSON-Version)."""
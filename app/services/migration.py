@@ -0,0 +1,127 @@
+# location: app/services/migration.py
+# Streamt Projekte und Benutzer als JSON-Lines zwischen Backends; Importe ins JSON-Backend schreiben die Datei einmal pro Collection.
+
+import json
+import os
+import sys
+import time
+
+COLLECTIONS = ('users', 'projects')
+CHUNK_SIZE = 500  # Datensätze pro save_many()-Aufruf bzw. Checkpoint (= Firestore-Batchlimit)
+
+# Zeilenformat (wie im Journal): {"c": "<collection>", "id": "<id>", "doc": {...}}
+
+class Throughput:
+    """Zählt Datensätze und Bytes und meldet den Durchsatz höchstens alle `interval` Sekunden auf stderr."""
+    def __init__(self, label, interval=2.0, stream=None, count=0):
+        self.label, self.interval, self.stream = label, interval, stream or sys.stderr
+        self.count, self.bytes = count, 0
+        self.started = self._last_report = time.monotonic()
+        self._initial = count
+
+    def add(self, records=1, size=0):
+        self.count += records
+        self.bytes += size
+        if time.monotonic() - self._last_report >= self.interval: self.report()
+
+    def report(self, final=False):
+        self._last_report = time.monotonic()
+        elapsed = max(self._last_report - self.started, 1e-9)
+        rate = (self.count - self._initial) / elapsed
+        print(f"{self.label}: {self.count} Datensätze, {rate:.0f}/s, {self.bytes / 1e6:.1f} MB"
+              f"{f' in {elapsed:.1f}s' if final else ''}", file=self.stream, flush=True)
+
+def load_checkpoint(path, direction):
+    """Liest einen Checkpoint; ein Checkpoint der anderen Richtung wird nicht übernommen."""
+    if not path or not os.path.exists(path): return {}
+    with open(path, 'r', encoding='utf-8') as f: state = json.load(f)
+    if state.get('direction') != direction:
+        raise ValueError(f"{path} ist ein {state.get('direction')}-Checkpoint, kein {direction}-Checkpoint.")
+    return state
+
+def save_checkpoint(path, state):
+    if not path: return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def clear_checkpoint(path):
+    if path and os.path.exists(path): os.remove(path)
+
+def _offset(out):
+    """Aktuelle Länge einer Ausgabedatei (None bei Pipes/stdout)."""
+    try: return out.tell() if out.seekable() else None
+    except (OSError, ValueError): return None
+
+def export_records(data_manager, out, collections=COLLECTIONS, checkpoint=None, meter=None):
+    """
+    Schreibt alle Datensätze der Collections als JSON-Lines nach `out`. Gelesen wird über
+    iter_records() in id-Reihenfolge, der Speicherbedarf ist also unabhängig von der Datenmenge.
+    Mit `checkpoint` wird nach jedem Block die zuletzt geschriebene id festgehalten; ein erneuter
+    Aufruf setzt dahinter fort (die Ausgabe muss dann angehängt werden; bei Dateien steht die
+    Länge zum Zeitpunkt des Checkpoints unter 'offset'). Gibt die Anzahl zurück.
+    """
+    state = load_checkpoint(checkpoint, 'export') or {'direction': 'export', 'done': [], 'count': 0}
+    meter = meter or Throughput('Export', count=state['count'])
+    for name in collections:
+        if name in state['done']: continue
+        start_after = state.get('after') if state.get('collection') == name else None
+        pending = 0
+        for key, doc in data_manager.iter_records(name, start_after):
+            line = json.dumps({'c': name, 'id': key, 'doc': doc}, ensure_ascii=False, separators=(',', ':')) + '\n'
+            out.write(line)
+            meter.add(size=len(line))
+            pending += 1
+            if pending >= CHUNK_SIZE:
+                out.flush()  # erst schreiben, dann den Fortschritt festhalten
+                save_checkpoint(checkpoint, dict(state, collection=name, after=key, count=meter.count, offset=_offset(out)))
+                pending = 0
+        out.flush()
+        state = dict(state, done=state['done'] + [name], collection=None, after=None, count=meter.count, offset=_offset(out))
+        save_checkpoint(checkpoint, state)
+    meter.report(final=True)
+    clear_checkpoint(checkpoint)
+    return meter.count
+
+def import_records(data_manager, lines, checkpoint=None, chunk_size=CHUNK_SIZE, meter=None):
+    """
+    Liest JSON-Lines aus `lines` (Datei oder stdin) und schreibt sie blockweise über save_many().
+    Im Speicher liegt immer nur ein Block - außer beim JSON-Backend, das bei jedem save_many die ganze
+    Datei schreibt: dort ist eine Collection ein Block (siehe DataManager.import_chunk_size). Der
+    Checkpoint zählt die vollständig übernommenen Zeilen; beim Fortsetzen werden sie übersprungen.
+    Gibt die Anzahl der Datensätze zurück.
+    """
+    state = load_checkpoint(checkpoint, 'import') or {'direction': 'import', 'lines': 0, 'count': 0}
+    meter = meter or Throughput('Import', count=state['count'])
+    skip = state['lines']
+    chunk_size = data_manager.import_chunk_size(chunk_size)
+    batch, batch_name, batch_bytes, line_no = [], None, 0, 0
+
+    def flush(done_lines):
+        nonlocal batch, batch_bytes
+        if batch:
+            data_manager.save_many(batch_name, batch)
+            meter.add(len(batch), batch_bytes)
+        save_checkpoint(checkpoint, dict(state, lines=done_lines, count=meter.count))
+        batch, batch_bytes = [], 0
+
+    for line_no, line in enumerate(lines, start=1):
+        if line_no <= skip or not line.strip(): continue
+        try:
+            entry = json.loads(line)
+            name, key, doc = entry['c'], entry['id'], entry['doc']
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Zeile {line_no}: ungültiger Datensatz ({e}).") from e
+        if name not in COLLECTIONS: raise ValueError(f"Zeile {line_no}: unbekannte Collection '{name}'.")
+        if batch and name != batch_name: flush(line_no - 1)  # die aktuelle Zeile gehört schon zum nächsten Block
+        batch_name = name
+        batch.append((key, doc))
+        batch_bytes += len(line)
+        if chunk_size and len(batch) >= chunk_size: flush(line_no)
+    flush(line_no)
+    meter.report(final=True)
+    clear_checkpoint(checkpoint)
+    return meter.count
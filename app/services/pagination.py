@@ -0,0 +1,56 @@
+# location: app/services/pagination.py
+# Keyset-Paginierung von list_projects; decode_cursor akzeptiert nur (str, str)-Paare.
+
+import base64
+import binascii
+import json
+from bisect import bisect_left, bisect_right
+
+# Felder, nach denen Projektlisten sortiert werden können ('-' als Präfix = absteigend)
+SORTABLE_FIELDS = ('created_at', 'name')
+MAX_PAGE_SIZE = 200
+
+def parse_sort(sort_by):
+    """'-created_at' -> ('created_at', True). Unbekannte Felder lösen ValueError aus."""
+    descending = sort_by.startswith('-')
+    field = sort_by.lstrip('-')
+    if field not in SORTABLE_FIELDS:
+        raise ValueError(f"Sortierung nach '{field}' wird nicht unterstützt.")
+    return field, descending
+
+def clamp_limit(limit):
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+def sort_value(record, field):
+    """Sortierschlüssel eines Datensatzes; fehlende Werte sortieren als leere Zeichenkette."""
+    value = record.get(field)
+    return value if isinstance(value, str) else ('' if value is None else str(value))
+
+def encode_cursor(value, key):
+    """Verpackt (Sortierwert, id) des letzten Eintrags einer Seite als undurchsichtigen Cursor."""
+    raw = json.dumps([value, key], ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """Gegenstück zu encode_cursor; ungültige Cursor lösen ValueError aus."""
+    if not cursor: return None
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError) as e:
+        raise ValueError("Ungültiger Cursor.") from e
+    # Sortierwerte und ids sind immer Zeichenketten (sort_value); andere Typen ließen bisect mit TypeError scheitern
+    if not isinstance(data, list) or len(data) != 2 or not all(isinstance(part, str) for part in data):
+        raise ValueError("Ungültiger Cursor.")
+    return data[0], data[1]
+
+def keyset_page(entries, cursor_key, limit, descending=False):
+    """
+    Schneidet eine Seite aus einer aufsteigend sortierten Liste von (Sortierwert, id)-Tupeln.
+    Gibt (Einträge der Seite, weitere Einträge vorhanden) zurück.
+    """
+    if descending:
+        end = bisect_left(entries, cursor_key) if cursor_key else len(entries)
+        start = max(0, end - limit)
+        return entries[start:end][::-1], start > 0
+    start = bisect_right(entries, cursor_key) if cursor_key else 0
+    return entries[start:start + limit], start + limit < len(entries)
@@ -0,0 +1,181 @@
+# location: app/services/profiling.py
+# DataManager-Profiling je Worker; after_fork legt die Sperre neu an und verwirft die geerbten Zähler.
+
+import json
+import os
+import threading
+
+# Log-lineare Buckets in Mikrosekunden: pro Zweierpotenz 2**SUB_BITS Unter-Buckets (relativer Fehler ~6 %)
+SUB_BITS = 4
+SUB_COUNT = 1 << SUB_BITS
+
+# Feste Grenzen (Sekunden) für den Prometheus-Export, damit die Bucket-Menge zwischen Abrufen gleich bleibt
+EXPORT_BOUNDS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Schreiboperationen: Position der geschriebenen Daten unter den Argumenten (die übrigen sind ids bzw. der Collection-Name)
+WRITE_PAYLOAD_ARGS = {'save_project': 0, 'save_user': 0, 'save_user_settings': 1, 'update_project_node': 2, 'save_many': 1}
+
+def _bucket_index(micros):
+    if micros < 2 * SUB_COUNT: return micros  # kleine Werte exakt
+    shift = micros.bit_length() - SUB_BITS - 1
+    return (shift + 1) * SUB_COUNT + (micros >> shift) - SUB_COUNT
+
+def _bucket_upper(index):
+    """Exklusive Obergrenze des Buckets in Mikrosekunden."""
+    if index < 2 * SUB_COUNT: return index + 1
+    shift = index // SUB_COUNT - 1
+    return (index % SUB_COUNT + SUB_COUNT + 1) << shift
+
+class LatencyHistogram:
+    """
+    Histogramm mit log-linearen Buckets (wie HdrHistogram): Einfügen ist eine Bitlängen-Rechnung
+    und ein Listenzugriff, Quantile sind auf ~6 % genau. Nicht threadsicher; Aufrufer sperren selbst.
+    """
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        self.counts, self.count, self.total = [], 0, 0.0
+
+    def record(self, seconds):
+        index = _bucket_index(max(0, int(seconds * 1_000_000)))
+        if index >= len(self.counts): self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+
+    def quantile(self, q):
+        """Obergrenze (Sekunden) des Buckets, in dem das q-Quantil liegt (q zwischen 0 und 1)."""
+        if not self.count: return 0.0
+        rank, seen = max(1, round(q * self.count)), 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank: return _bucket_upper(index) / 1_000_000
+        return _bucket_upper(len(self.counts) - 1) / 1_000_000
+
+    def cumulative(self, bounds=EXPORT_BOUNDS):
+        """Kumulierte Anzahl je Grenze (le); Buckets, die über eine Grenze reichen, zählen zur nächsten."""
+        result, seen, index = [], 0, 0
+        for bound in bounds:
+            limit = bound * 1_000_000
+            while index < len(self.counts) and _bucket_upper(index) <= limit:
+                seen += self.counts[index]
+                index += 1
+            result.append(seen)
+        return result
+
+class OperationStats:
+    __slots__ = ('latency', 'errors', 'payload_bytes', 'payload_samples')
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.payload_bytes = 0  # Summe der gemessenen Stichproben
+        self.payload_samples = 0
+
+def _within(value, budget):
+    """True, wenn dict/list-Verschachtelung insgesamt höchstens budget Einträge hat (bricht früh ab)."""
+    stack = [value]
+    while stack:
+        container = stack.pop()
+        budget -= len(container)
+        if budget < 0: return False
+        stack.extend(item for item in (container.values() if isinstance(container, dict) else container) if isinstance(item, (dict, list, tuple)))
+    return True
+
+def payload_size(value, max_entries=None):
+    """
+    Größe als kompaktes JSON in Bytes; None für Werte ohne sinnvolle Größe (Modelle, Generatoren) und
+    für Werte mit mehr als max_entries Einträgen - große Ergebnisse würde erst die Messung teuer machen.
+    """
+    if isinstance(value, str): return len(value.encode('utf-8')) + 2
+    if not isinstance(value, (dict, list)): return None
+    if max_entries is not None and not _within(value, max_entries): return None
+    try: return len(json.dumps(value, separators=(',', ':'), default=str).encode('utf-8'))
+    except (TypeError, ValueError): return None
+
+class DataManagerProfiler:
+    """
+    Beobachter für DataManager.add_observer: führt je (Backend, Operation) ein Latenz-Histogramm,
+    Fehlerzähler und Nutzlast-Bytes. Gelesene Daten zählen mit ihrem Ergebnis, Schreibvorgänge mit
+    den geschriebenen Daten (WRITE_PAYLOAD_ARGS). Die Bytes werden nur bei jedem PROFILING_BYTES_SAMPLE-ten Aufruf gemessen
+    (JSON-Serialisierung ist teurer als der Rest) und für den Export hochgerechnet; Werte mit mehr als
+    PROFILING_BYTES_MAX_ENTRIES Einträgen (z.B. alle Projekte) werden gar nicht gemessen. Jeder
+    Gunicorn-Worker zählt für sich, der Export trägt deshalb die PID als worker-Label.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.sample_every = 16
+        self.max_entries = 2000
+        self._data_manager = None
+        self._stats = {}  # (Backend, Operation) -> OperationStats
+        self._lock = threading.Lock()
+
+    def init_app(self, app, data_manager):
+        self.enabled = app.config.get('PROFILING_ENABLED', True)
+        if not self.enabled: return
+        self.sample_every = max(1, app.config.get('PROFILING_BYTES_SAMPLE', 16))
+        self.max_entries = app.config.get('PROFILING_BYTES_MAX_ENTRIES', 2000)
+        self._data_manager = data_manager
+        data_manager.add_observer(self.observe)
+
+    def observe(self, name, seconds, args, result, error):
+        key = (self._data_manager.backend_name(), name)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None: stats = self._stats[key] = OperationStats()
+            stats.latency.record(seconds)
+            if error is not None: stats.errors += 1
+            sample = stats.latency.count % self.sample_every == 1 % self.sample_every
+        if sample and error is None:
+            index = WRITE_PAYLOAD_ARGS.get(name)
+            value = result if index is None else args[index] if len(args) > index else None
+            size = payload_size(value, self.max_entries)
+            if size is not None:
+                with self._lock:
+                    stats.payload_bytes += size
+                    stats.payload_samples += 1
+
+    def reset(self):
+        with self._lock: self._stats = {}
+
+    def after_fork(self):
+        """Im per fork gestarteten Worker: neue Sperre, die Zähler des Masters gehören nicht zu dieser PID."""
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def summary(self):
+        """Kennzahlen je Backend/Operation (Millisekunden), z.B. für Benchmarks oder JSON-Ausgaben."""
+        with self._lock:
+            return [{
+                'backend': backend, 'operation': name, 'count': stats.latency.count, 'errors': stats.errors,
+                'mean_ms': round(stats.latency.total / stats.latency.count * 1000, 3),
+                'p50_ms': round(stats.latency.quantile(0.5) * 1000, 3),
+                'p95_ms': round(stats.latency.quantile(0.95) * 1000, 3),
+                'p99_ms': round(stats.latency.quantile(0.99) * 1000, 3),
+                'bytes_per_call': round(stats.payload_bytes / stats.payload_samples) if stats.payload_samples else None,
+            } for (backend, name), stats in sorted(self._stats.items())]
+
+    def prometheus(self):
+        """Alle Kennzahlen im Prometheus-Textformat (Version 0.0.4)."""
+        prefix = 'projektplaner_datamanager'
+        lines = [
+            f'# HELP {prefix}_call_duration_seconds Dauer der DataManager-Aufrufe.',
+            f'# TYPE {prefix}_call_duration_seconds histogram',
+        ]
+        errors = [f'# HELP {prefix}_call_errors_total Fehlgeschlagene DataManager-Aufrufe.', f'# TYPE {prefix}_call_errors_total counter']
+        payload = [f'# HELP {prefix}_payload_bytes_total Nutzlast in Bytes (kompaktes JSON, aus Stichproben hochgerechnet).',
+                   f'# TYPE {prefix}_payload_bytes_total counter']
+        worker = os.getpid()  # Zähler gelten je Prozess; ohne Label wären sie hinter dem Load Balancer nicht monoton
+        with self._lock:
+            for (backend, name), stats in sorted(self._stats.items()):
+                labels = f'backend="{backend}",operation="{name}",worker="{worker}"'
+                for bound, seen in zip(EXPORT_BOUNDS, stats.latency.cumulative()):
+                    lines.append(f'{prefix}_call_duration_seconds_bucket{{{labels},le="{bound}"}} {seen}')
+                lines.append(f'{prefix}_call_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.latency.count}')
+                lines.append(f'{prefix}_call_duration_seconds_sum{{{labels}}} {stats.latency.total:.6f}')
+                lines.append(f'{prefix}_call_duration_seconds_count{{{labels}}} {stats.latency.count}')
+                errors.append(f'{prefix}_call_errors_total{{{labels}}} {stats.errors}')
+                if stats.payload_samples:
+                    estimate = round(stats.payload_bytes / stats.payload_samples * stats.latency.count)
+                    payload.append(f'{prefix}_payload_bytes_total{{{labels}}} {estimate}')
+        return '\n'.join(lines + errors + payload) + '\n'
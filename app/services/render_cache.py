@@ -0,0 +1,167 @@
+# location: app/services/render_cache.py
+# Fragment-Cache ({% cache %}) mit LRU-Grenze und ETag/304; after_fork legt die Sperre im Gunicorn-Worker neu an.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from flask import current_app, make_response, render_template, request, session
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+# DataManager-Aufrufe, nach denen die Fragmente eines Projekts verworfen werden (Projekt-id im ersten Argument)
+INVALIDATING_METHODS = {'save_project', 'delete_project', 'update_project_node'}
+
+def content_digest(value):
+    """Hash über den JSON-Inhalt (Sichten werden über to_dict serialisiert)."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True, separators=(',', ':'),
+                                   default=lambda v: v.to_dict() if hasattr(v, 'to_dict') else str(v)).encode('utf-8')).hexdigest()
+
+def project_version(project):
+    """
+    Versionsmerkmal eines Projekts für Cache-Schlüssel und ETags: '_version' (alle Backends setzen sie
+    bei jedem Schreiben neu), nur für Altdaten ohne Version ein Hash über den Inhalt.
+    """
+    version = project.get('_version')
+    return version if version is not None else content_digest(project)
+
+class RenderCache:
+    """
+    LRU der gerenderten Fragmente, begrenzt auf RENDER_CACHE_MAX_BYTES. Schlüssel sind die Werte aus
+    dem {% cache %}-Tag (Name, Projekt-id, Version, Theme, ...); der zweite Wert dient als Projekt-id,
+    über die save_project/delete_project/update_project_node alle Fragmente des Projekts verwerfen.
+    Da die Version im Schlüssel steckt, liefern auch Schreibvorgänge anderer Worker nie alte Inhalte.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.max_bytes = 32 * 1024 * 1024
+        self._entries = OrderedDict()  # Schlüssel -> (Projekt-id, HTML)
+        self._by_project = {}  # Projekt-id -> Menge der Schlüssel
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._salt = ''
+
+    def init_app(self, app, data_manager):
+        self.enabled = app.config.get('RENDER_CACHE_ENABLED', True)
+        self.max_bytes = app.config.get('RENDER_CACHE_MAX_BYTES', self.max_bytes)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.render_cache = self
+        # Templates ändern sich nur mit einem Deployment; ihr Stand fließt in jeden ETag ein
+        template_dir = os.path.join(app.root_path, app.template_folder)
+        mtimes = [os.path.getmtime(os.path.join(root, name)) for root, _, names in os.walk(template_dir) for name in names]
+        self._salt = str(max(mtimes, default=0))
+        if self.enabled: data_manager.add_observer(self._observe)
+
+    def after_fork(self):
+        """Im per fork gestarteten Worker: neue Sperre; die geerbten Fragmente bleiben gültig (Version im Schlüssel)."""
+        self._lock = threading.Lock()
+
+    # --- Fragmente ---
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, html, project_id=None):
+        size = len(html)
+        if size > self.max_bytes: return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (project_id, html)
+            self._bytes += size
+            if project_id is not None: self._by_project.setdefault(project_id, set()).add(key)
+            while self._bytes > self.max_bytes: self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None: return
+        project_id, html = entry
+        self._bytes -= len(html)
+        keys = self._by_project.get(project_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys: del self._by_project[project_id]
+
+    def invalidate(self, project_id):
+        with self._lock:
+            for key in list(self._by_project.get(project_id, ())): self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_project.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock: return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self.hits, 'misses': self.misses}
+
+    def _observe(self, name, seconds, args, result, error):
+        """Beobachter für DataManager.add_observer: verwirft die Fragmente geänderter Projekte."""
+        if error is not None or not args: return
+        if name in INVALIDATING_METHODS:
+            target = args[0]
+            project_id = target if isinstance(target, str) else getattr(target, 'id', None) or target.get('id')
+            self.invalidate(project_id)
+        elif name == 'save_many' and args[0] == 'projects':
+            for key, _ in args[1]: self.invalidate(key)
+
+    # --- ETag / 304 ---
+    def page_etag(self, template_name, *parts):
+        """ETag einer Seite: Template, die übergebenen Teile und alles, was base.html aus Session und Einstellungen zeigt."""
+        from ..extensions import settings_service
+        identity = (self._salt, template_name, parts, session.get('user_id'), session.get('username'), session.get('is_admin'),
+                    session.get('user_theme', 'dark'), settings_service.version)
+        return hashlib.sha1(repr(identity).encode('utf-8')).hexdigest()
+
+def render_cached(template_name, etag_parts, public_max_age=None, **context):
+    """
+    render_template mit ETag: stimmt If-None-Match, antwortet 304 ohne zu rendern. Stehen Flash-Meldungen
+    aus, wird immer gerendert (sie würden sonst erst auf der nächsten Seite erscheinen). Mit public_max_age
+    dürfen Seiten für nicht angemeldete Besucher auch von Proxys/CDNs so viele Sekunden gecacht werden.
+    """
+    cache = current_app.jinja_env.render_cache
+    if not cache.enabled: return render_template(template_name, **context)
+    etag = cache.page_etag(template_name, *etag_parts)
+    pending_flashes = bool(session.get('_flashes'))
+    if not pending_flashes and etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = make_response(render_template(template_name, **context))
+    response.set_etag(etag)
+    if public_max_age and 'user_id' not in session and not pending_flashes:
+        response.headers['Cache-Control'] = f'public, max-age={public_max_age}'
+        response.vary.add('Cookie')  # angemeldete Besucher (Session-Cookie) dürfen die anonyme Fassung nicht bekommen
+    else:
+        response.headers['Cache-Control'] = 'private, no-cache'  # Browser fragt jedes Mal nach, lädt aber nur bei Änderung
+    return response
+
+class FragmentCacheExtension(Extension):
+    """
+    {% cache 'name', project.id, version, ... %}...{% endcache %}: der Inhalt wird einmal gerendert
+    und unter den angegebenen Werten im RenderCache abgelegt.
+    """
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        key = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'): key.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_cached', [nodes.Tuple(key, 'load')]), [], [], body).set_lineno(lineno)
+
+    def _cached(self, key, caller):
+        cache = self.environment.render_cache
+        if not cache.enabled: return caller()
+        html = cache.get(key)
+        if html is None:
+            html = str(caller())
+            cache.set(key, html, key[1] if len(key) > 1 else None)
+        return Markup(html)
@@ -0,0 +1,348 @@
+# location: app/services/search_index.py
+# Suchindex: warm() lädt vorab (Gunicorn preload_app), after_fork erneuert Sperre und Speicher-Timer im Worker.
+
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from operator import itemgetter
+from .render_cache import content_digest
+
+# Gewicht eines Treffers je Feld: ein Wort im Projektnamen zählt mehr als eins im Kommentar
+FIELD_WEIGHTS = {'project': 3.0, 'phase': 2.0, 'task': 1.5, 'subtask': 1.2, 'comment': 0.8}
+PREFIX_FACTOR = 0.6  # Präfix-Treffer ("anford" -> "anforderungen") zählen weniger als exakte
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 200
+INDEX_FORMAT = 2
+
+STOPWORDS = frozenset('''
+    der die das den dem des ein eine einer eines einem einen und oder aber mit von vom zu zum zur im in
+    am an auf aus bei für fuer ist sind war nicht noch nur auch als wie so es er sie wir ihr the of and to
+'''.split())
+
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+_WORD = re.compile(r'\w+')
+
+def normalize(text):
+    """Kleinschreibung mit Umlaut-Faltung (ä -> ae, ß -> ss) und ohne Akzente (é -> e)."""
+    text = (text or '').casefold().translate(_UMLAUTS)
+    return ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+
+def tokenize(text):
+    """Wörter ab zwei Zeichen ohne Stoppwörter; "Änderungs-Übersicht" -> ['aenderungs', 'uebersicht']."""
+    return [token for token in _WORD.findall(normalize(text)) if len(token) > 1 and token not in STOPWORDS]
+
+def _terms(*fields):
+    """Gewichtete Terme eines Dokuments aus (Feld, Text)-Paaren."""
+    terms = {}
+    for field, text in fields:
+        for token in tokenize(text): terms[token] = terms.get(token, 0.0) + FIELD_WEIGHTS[field]
+    return terms
+
+def _documents(project):
+    """Zerlegt ein Projekt in Dokumente: das Projekt selbst (node_id None) und jeden Knoten mit Namen/Kommentar."""
+    documents = [(None, 'project', project.get('name') or '', _terms(('project', project.get('name'))))]
+    stack = list(project.get('structure') or [])
+    while stack:
+        node = stack.pop()
+        node_type = node.get('type') if node.get('type') in FIELD_WEIGHTS else 'subtask'
+        terms = _terms((node_type, node.get('name')), ('comment', node.get('comment')))
+        if terms: documents.append((node.get('id'), node_type, node.get('name') or '', terms))
+        stack.extend(node.get('children') or [])
+    return documents
+
+def _stamp(project):
+    """Stand eines Projekts: '_version', falls das Backend sie führt, sonst ein Inhalts-Hash."""
+    version = project.get('_version')
+    return version if version is not None else content_digest(project)
+
+class SearchIndex:
+    """
+    Invertierter Index Term -> {Dokument: Gewicht}. Dokumente sind Projekte und ihre Knoten; gesucht
+    wird mit UND-Verknüpfung, jedes Wort auch als Präfix, gerankt nach Feldgewicht x IDF.
+
+    Geladen wird erst bei der ersten Suche: aus SEARCH_INDEX_PATH (einmal mit den Projekt-Ständen
+    abgeglichen, die Datei kann veraltet sein), sonst durch einen Lauf über alle Projekte. Danach
+    halten save_project/delete_project/update_project_node (DataManager-Beobachter) den Index im
+    eigenen Worker aktuell; Änderungen anderer Worker holt die Suche höchstens alle
+    CHANGE_FEED_POLL_INTERVAL Sekunden aus dem Änderungsfeed (project_changes). Gespeichert wird
+    verzögert (SEARCH_INDEX_SAVE_DELAY).
+    """
+    def __init__(self):
+        self.path = None
+        self.save_delay = 5.0
+        self.poll_interval = 2.0
+        self._data_manager = None
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+        self._save_timer = None
+        self._token = None  # Stand des Änderungsfeeds, bis zu dem der Index nachgezogen ist
+        self._next_poll = 0.0
+
+    def _reset(self):
+        self._postings = {}  # Term -> {doc: Gewicht}
+        self._docs = {}  # doc -> (project_id, node_id, Typ, Name, Terme)
+        self._projects = {}  # project_id -> {'name', 'stamp', 'owner', 'members', 'docs': [doc, ...]}
+        self._next_doc = 0
+        self._vocabulary = None  # sortierte Terme für die Präfixsuche, None = neu aufbauen
+
+    def init_app(self, app, data_manager):
+        self.path = app.config['SEARCH_INDEX_PATH']
+        self.save_delay = app.config.get('SEARCH_INDEX_SAVE_DELAY', 5.0)
+        self.poll_interval = app.config.get('CHANGE_FEED_POLL_INTERVAL', 2.0)
+        self._data_manager = data_manager
+        with self._lock:
+            self._loaded = False
+            self._reset()
+        data_manager.add_observer(self._observe)
+
+    def after_fork(self):
+        """
+        Im per fork gestarteten Worker: neue Sperre, einen Speicher-Timer des Elternprozesses gibt es hier
+        nicht. Ein vorab geladener Index (warm) wird übernommen und ab seinem Token weiter nachgezogen.
+        """
+        self._lock = threading.RLock()
+        self._save_timer = None
+        self._next_poll = 0.0
+
+    def warm(self):
+        """Lädt den Index sofort statt bei der ersten Suche (z.B. vor dem Fork der Worker)."""
+        self._ensure_loaded()
+
+    # --- Index pflegen ---
+    def _add(self, project_id, project):
+        self._add_documents(project_id, project.get('name') or '', _stamp(project), _documents(project),
+                            project.get('owner'), list(project.get('members') or ()))
+
+    def _add_documents(self, project_id, name, stamp, documents, owner=None, members=()):
+        docs = []
+        for node_id, node_type, node_name, terms in documents:
+            doc = self._next_doc
+            self._next_doc += 1
+            self._docs[doc] = (project_id, node_id, node_type, node_name, tuple(terms))  # Gewichte stehen in _postings
+            for term, weight in terms.items(): self._postings.setdefault(term, {})[doc] = weight
+            docs.append(doc)
+        self._projects[project_id] = {'name': name, 'stamp': stamp, 'owner': owner, 'members': members, 'docs': docs}
+        self._vocabulary = None
+
+    def _remove(self, project_id):
+        entry = self._projects.pop(project_id, None)
+        if entry is None: return
+        for doc in entry['docs']:
+            for term in self._docs.pop(doc)[4]:
+                postings = self._postings.get(term)
+                if postings is None: continue
+                postings.pop(doc, None)
+                if not postings: del self._postings[term]
+        self._vocabulary = None
+
+    def index_projects(self, projects):
+        """(Neu-)Indiziert Projekte; gespeichert wird danach einmal für alle."""
+        with self._lock:
+            for project in projects:
+                self._remove(project['id'])
+                self._add(project['id'], project)
+        self._schedule_save()
+
+    def remove_project(self, project_id):
+        with self._lock: self._remove(project_id)
+        self._schedule_save()
+
+    def _observe(self, name, seconds, args, result, error):
+        """Beobachter für DataManager.add_observer; vor dem ersten Laden gibt es nichts zu pflegen."""
+        if not self._loaded or error is not None or not args: return
+        if name == 'save_project' and isinstance(result, dict) and result.get('id'): self.index_projects([result])
+        elif name == 'delete_project' and result: self.remove_project(args[0])
+        elif name == 'update_project_node' and result is not None and {'name', 'comment'} & set(args[2] if len(args) > 2 else ()):
+            project = self._data_manager.get_project(args[0])
+            if project is not None: self.index_projects([project])
+        elif name == 'save_many' and args[0] == 'projects':
+            self.index_projects(record for _, record in args[1])
+
+    # --- Laden, Speichern, Abgleich ---
+    def _ensure_loaded(self):
+        if self._loaded: return
+        with self._lock:
+            if self._loaded: return
+            # Token vor dem Lesen: was sich währenddessen ändert, kommt beim nächsten Nachziehen erneut
+            self._token = self._data_manager.project_change_token()
+            if self._load_file():
+                if self.reconcile(): self.save()
+            else:
+                for project_id, project in self._data_manager.iter_records('projects'): self._add(project_id, project)
+                self.save()
+            self._loaded = True
+
+    def _catch_up(self):
+        """Übernimmt Änderungen anderer Worker aus dem Änderungsfeed; höchstens alle poll_interval Sekunden."""
+        now = time.monotonic()
+        if now < self._next_poll: return
+        with self._lock:
+            if now < self._next_poll: return
+            self._next_poll = now + self.poll_interval
+            changes = self._data_manager.project_changes(self._token)
+            if changes is None:
+                # Der Feed reicht nicht mehr bis zum eigenen Stand zurück: einmal komplett abgleichen
+                self._token = self._data_manager.project_change_token()
+                changed = self.reconcile()
+            else:
+                self._token, updates = changes
+                changed = self._apply_changes(updates)
+        if changed: self._schedule_save()
+
+    def _apply_changes(self, updates):
+        """Übernimmt [(id, Projekt oder None), ...] aus dem Änderungsfeed; gibt die Zahl der Änderungen zurück."""
+        changed = 0
+        with self._lock:
+            for project_id, project in updates:
+                entry = self._projects.get(project_id)
+                if project is None and entry is None: continue
+                if project is not None and entry is not None and entry['stamp'] == _stamp(project): continue  # eigener Schreibvorgang
+                self._remove(project_id)
+                if project is not None: self._add(project_id, project)
+                changed += 1
+        return changed
+
+    def _load_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: data = json.load(f)
+        except FileNotFoundError: return False
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"WARNUNG: Suchindex {self.path} nicht lesbar ({e}), wird neu aufgebaut.")
+            return False
+        if data.get('format') != INDEX_FORMAT: return False
+        for project_id, entry in data['projects'].items():
+            self._add_documents(project_id, entry['name'], entry['stamp'], entry['docs'], entry.get('owner'), entry.get('members') or [])
+        return True
+
+    def _schedule_save(self):
+        if not self.save_delay:
+            self.save()
+            return
+        with self._lock:
+            if self._save_timer is not None: return
+            self._save_timer = threading.Timer(self.save_delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def save(self):
+        """Schreibt den Index atomar nach SEARCH_INDEX_PATH."""
+        with self._lock:
+            self._save_timer = None
+            projects = {}
+            for project_id, entry in self._projects.items():
+                docs = []
+                for doc in entry['docs']:
+                    _, node_id, node_type, name, terms = self._docs[doc]
+                    docs.append((node_id, node_type, name, {term: self._postings[term][doc] for term in terms}))
+                projects[project_id] = {'name': entry['name'], 'stamp': entry['stamp'], 'owner': entry['owner'],
+                                        'members': entry['members'], 'docs': docs}
+            data = json.dumps({'format': INDEX_FORMAT, 'projects': projects}, separators=(',', ':'))
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f: f.write(data)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
+
+    def reconcile(self):
+        """
+        Gleicht den Index mit allen gespeicherten Projekten ab (ein Lauf über iter_records); gibt die Zahl
+        der Änderungen zurück. Nur nach dem Laden der Datei und wenn der Änderungsfeed nicht ausreicht.
+        """
+        seen, changed = set(), 0
+        for project_id, project in self._data_manager.iter_records('projects'):
+            seen.add(project_id)
+            entry = self._projects.get(project_id)
+            if entry is None or entry['stamp'] != _stamp(project):
+                with self._lock:
+                    self._remove(project_id)
+                    self._add(project_id, project)
+                changed += 1
+        with self._lock:
+            for project_id in set(self._projects) - seen:
+                self._remove(project_id)
+                changed += 1
+        return changed
+
+    # --- Suche ---
+    def _expand(self, term):
+        """Terme des Vokabulars, die term exakt (Faktor 1) oder als Präfix (PREFIX_FACTOR) treffen."""
+        if term in self._postings: yield term, 1.0
+        if len(term) < MIN_PREFIX_LENGTH: return
+        if self._vocabulary is None: self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, term)
+        for candidate in vocabulary[position:position + MAX_PREFIX_EXPANSIONS]:
+            if not candidate.startswith(term): break
+            if candidate != term: yield candidate, PREFIX_FACTOR
+
+    def search(self, query, limit=20, allowed=None):
+        """
+        Treffer für alle Wörter der Suchanfrage, bestes zuerst:
+        [{'project_id', 'project_name', 'node_id', 'type', 'name', 'score'}, ...]
+        Bewertet wird nur, was das seltenste Wort trifft; die übrigen Wörter werden je Kandidat nachgeschlagen.
+        allowed(eintrag) mit eintrag = {'owner', 'members', ...} filtert Projekte, auf die der Suchende keinen Zugriff hat.
+        """
+        self._ensure_loaded()
+        self._catch_up()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms: return []
+        with self._lock:
+            total = len(self._docs) or 1
+            expanded = []
+            for term in terms:
+                matches = [(self._postings[token], factor * math.log(1 + total / len(self._postings[token])))
+                           for token, factor in self._expand(term)]
+                if not matches: return []
+                expanded.append(matches)
+            expanded.sort(key=lambda matches: sum(len(postings) for postings, _ in matches))
+            if len(expanded) == 1 and len(expanded[0]) == 1:
+                # Ein einzelner Term: die Reihenfolge folgt direkt den Gewichten, ohne Zwischen-Dictionary
+                postings, boost = expanded[0][0]
+                candidates = postings.items() if allowed is None else filter(self._visibility(allowed), postings.items())
+                best = [(doc, weight * boost) for doc, weight in heapq.nlargest(limit, candidates, key=itemgetter(1))]
+                return self._results(best)
+            scores = {}
+            for postings, boost in expanded[0]:
+                for doc, weight in postings.items():
+                    score = weight * boost
+                    if score > scores.get(doc, 0.0): scores[doc] = score
+            for matches in expanded[1:]:
+                narrowed = {}
+                for doc, score in scores.items():
+                    best = max((postings[doc] * boost for postings, boost in matches if doc in postings), default=None)
+                    if best is not None: narrowed[doc] = score + best
+                scores = narrowed
+                if not scores: return []
+            candidates = scores.items() if allowed is None else filter(self._visibility(allowed), scores.items())
+            return self._results(heapq.nlargest(limit, candidates, key=itemgetter(1)))
+
+    def _visibility(self, allowed):
+        """Filter für (doc, Gewicht)-Paare; allowed wird je Projekt nur einmal ausgewertet."""
+        verdicts = {}
+        def visible(item):
+            project_id = self._docs[item[0]][0]
+            verdict = verdicts.get(project_id)
+            if verdict is None: verdict = verdicts[project_id] = bool(allowed(self._projects[project_id]))
+            return verdict
+        return visible
+
+    def _results(self, best):
+        results = []
+        for doc, score in best:
+            project_id, node_id, node_type, name, _ = self._docs[doc]
+            results.append({'project_id': project_id, 'project_name': self._projects[project_id]['name'],
+                            'node_id': node_id, 'type': node_type, 'name': name, 'score': round(score, 3)})
+        return results
+
+    def stats(self):
+        with self._lock: return {'loaded': self._loaded, 'projects': len(self._projects), 'documents': len(self._docs), 'terms': len(self._postings)}
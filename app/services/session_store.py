@@ -0,0 +1,146 @@
+# location: app/services/session_store.py
+# Serverseitige Sessions (Speicher oder SQLite); SQLite-Store öffnet nach dem Fork eines Workers eigene Verbindungen.
+
+import copy
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+class MemorySessionStore:
+    """LRU mit TTL im Prozess; schnell, aber nur für einen Worker (nach Neustart sind alle abgemeldet)."""
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # sid -> (Ablaufzeit, Daten)
+        self._lock = threading.Lock()
+
+    def get(self, sid, ttl):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None: return None
+            if entry[0] < time.time():
+                del self._entries[sid]
+                return None
+            self._entries[sid] = (time.time() + ttl, entry[1])  # gleitender Ablauf
+            self._entries.move_to_end(sid)
+            return copy.deepcopy(entry[1])
+
+    def set(self, sid, data, ttl):
+        with self._lock:
+            self._entries[sid] = (time.time() + ttl, copy.deepcopy(dict(data)))
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries: self._entries.popitem(last=False)
+
+    def delete(self, sid):
+        with self._lock: self._entries.pop(sid, None)
+
+class SqliteSessionStore:
+    """Sessions in einer SQLite-Datei; von mehreren Workern/Prozessen gemeinsam nutzbar."""
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.serializer = TaggedJSONSerializer()  # wie Flasks Cookie-Session (Tupel, Bytes, Markup, ...)
+        self._local = threading.local()
+        self._conn().execute('CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)')
+        self._conn().execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires)')
+
+    def after_fork(self):
+        """Verbindungen des Elternprozesses nicht weiterverwenden (Gunicorn preload_app)."""
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, sid, ttl):
+        row = self._conn().execute('SELECT data, expires FROM sessions WHERE sid = ?', (sid,)).fetchone()
+        if row is None: return None
+        now = time.time()
+        if row[1] < now:
+            self.delete(sid)
+            return None
+        if row[1] - now < ttl / 2:  # Ablauf nur gelegentlich verlängern, nicht bei jedem Lesen schreiben
+            self._conn().execute('UPDATE sessions SET expires = ? WHERE sid = ?', (now + ttl, sid))
+        return self.serializer.loads(row[0])
+
+    def set(self, sid, data, ttl):
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)', (sid, self.serializer.dumps(dict(data)), time.time() + ttl))
+        if secrets.randbelow(100) == 0:  # abgelaufene Sessions gelegentlich aufräumen
+            conn.execute('DELETE FROM sessions WHERE expires < ?', (time.time(),))
+
+    def delete(self, sid):
+        self._conn().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session-Dictionary mit id; clear() (Login/Logout) vergibt beim Speichern eine neue id."""
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session): session.modified = True
+        super().__init__(initial, on_update)
+        self.sid, self.new, self.modified, self.rotate = sid, new, False, False
+
+    def clear(self):
+        super().clear()
+        self.rotate = True  # Schutz vor Session-Fixation
+
+class ServerSessionInterface(SessionInterface):
+    """Flask-SessionInterface über einem der Stores oben; das Cookie enthält nur die signierte id."""
+    server_side = True
+
+    def __init__(self, store, ttl):
+        self.store, self.ttl = store, ttl
+
+    def _signer(self, app): return Signer(app.secret_key, salt='server-session')
+    def _ttl(self, app, session):
+        return app.permanent_session_lifetime.total_seconds() if session.permanent else self.ttl
+
+    def open_session(self, app, request):
+        if not app.secret_key: return None
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try: sid = self._signer(app).unsign(cookie).decode('ascii')
+            except BadSignature: sid = None  # z.B. ein altes Cookie mit Session-Inhalt
+            if sid:
+                data = self.store.get(sid, self.ttl)
+                if data is not None: return ServerSession(data, sid=sid)
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name, domain, path = self.get_cookie_name(app), self.get_cookie_domain(app), self.get_cookie_path(app)
+        secure, samesite, httponly = self.get_cookie_secure(app), self.get_cookie_samesite(app), self.get_cookie_httponly(app)
+        if not session:
+            if not session.new and (session.modified or session.rotate):  # geleert, z.B. beim Logout
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+        response.vary.add('Cookie')
+        if session.rotate and not session.new:
+            self.store.delete(session.sid)
+            session.sid, session.new = secrets.token_urlsafe(32), True
+        if session.modified or session.new:
+            self.store.set(session.sid, session, self._ttl(app, session))
+        if session.new or (session.permanent and app.config.get('SESSION_REFRESH_EACH_REQUEST')):
+            expires = self.get_expiration_time(app, session)
+            response.set_cookie(name, self._signer(app).sign(session.sid).decode('ascii'), expires=expires,
+                                httponly=httponly, domain=domain, path=path, secure=secure, samesite=samesite)
+
+def create_session_interface(config):
+    """Erzeugt das Session-Backend laut SESSION_BACKEND ('memory', 'sqlite'); 'cookie' behält Flasks Standard."""
+    backend = config.get('SESSION_BACKEND', 'memory')
+    ttl = config.get('SESSION_TTL', 12 * 3600)
+    if backend == 'cookie': return None
+    if backend == 'sqlite': return ServerSessionInterface(SqliteSessionStore(config['SESSION_SQLITE_PATH']), ttl)
+    if backend == 'memory': return ServerSessionInterface(MemorySessionStore(config.get('SESSION_MAX_ENTRIES', 10000)), ttl)
+    raise ValueError(f"Unbekanntes SESSION_BACKEND: {backend}")
@@ -0,0 +1,137 @@
+# location: app/services/settings_service.py
+# Globale Einstellungen (settings.json) als versionierter Schnappschuss; der Watcher startet mit dem ersten Request im Worker.
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from types import MappingProxyType
+from .json_service import VersionConflictError
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur die prozessinterne Sperre greift
+    fcntl = None
+
+class SettingsService:
+    """
+    Hält settings.json als unveränderlichen Schnappschuss im Speicher. Lesen (snapshot/get) macht
+    keine Datei-I/O; ein Hintergrund-Thread (ab dem ersten Request des Prozesses) prüft alle SETTINGS_POLL_INTERVAL Sekunden die
+    Datei-Signatur und lädt Änderungen anderer Worker nach. Schreiben läuft unter Dateisperre,
+    erhöht '_version' in der Datei und ersetzt sie atomar.
+    """
+    def __init__(self):
+        self.path = None
+        self.poll_interval = 1.0
+        self._app = None
+        self._snapshot = MappingProxyType({})
+        self._signature = None
+        self._lock = threading.RLock()
+        self._watcher_pid = None  # Prozess, in dem der Beobachter läuft
+
+    def init_app(self, app, initial=None):
+        """Startwerte: die übergebenen Einstellungen (z.B. aus run.py), sonst der Dateiinhalt."""
+        with self._lock:
+            self._app = app
+            self.path = app.config['SETTINGS_PATH']
+            self.poll_interval = app.config.get('SETTINGS_POLL_INTERVAL', 1.0)
+            self._signature = self._file_signature()
+            self._publish(dict(initial) if initial is not None else self._read())
+        app.before_request(self._ensure_watcher)
+
+    def _ensure_watcher(self):
+        """Startet den Beobachter beim ersten Request dieses Prozesses - nie im Gunicorn-Master vor dem Fork."""
+        if self._watcher_pid == os.getpid(): return
+        with self._lock:
+            if self._watcher_pid == os.getpid(): return
+            threading.Thread(target=self._watch, name='settings-watcher', daemon=True).start()
+            self._watcher_pid = os.getpid()
+
+    def after_fork(self):
+        """Im per fork gestarteten Worker: neue Sperre; der Beobachter startet mit dem ersten Request."""
+        self._lock = threading.RLock()
+
+    # --- Lesen (ohne I/O) ---
+    def snapshot(self):
+        """Aktuelle Einstellungen als schreibgeschützte Mapping-Sicht."""
+        return self._snapshot
+    def get(self, key, default=None): return self._snapshot.get(key, default)
+    @property
+    def version(self): return self._snapshot.get('_version', 0)
+
+    # --- Datei ---
+    def _file_signature(self):
+        try: st = os.stat(self.path)
+        except OSError: return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f: data = json.load(f)
+        except FileNotFoundError: return {}
+        except json.JSONDecodeError as e: raise RuntimeError(f"{self.path} enthält kein gültiges JSON ({e}).") from e
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data):
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def _file_lock(self):
+        fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl: fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            if fcntl: fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def _publish(self, data):
+        self._snapshot = MappingProxyType(data)
+        if self._app is not None: self._app.config['APP_SETTINGS'] = data  # für Code, der die Config liest
+
+    # --- Nachladen & Schreiben ---
+    def refresh(self):
+        """Lädt die Datei neu, falls sie sich seit dem letzten Stand geändert hat. Gibt True bei Änderung zurück."""
+        signature = self._file_signature()
+        if signature is None or signature == self._signature: return False
+        with self._lock:
+            signature = self._file_signature()
+            if signature is None or signature == self._signature: return False
+            data = self._read()
+            self._signature = signature
+            self._publish(data)
+        return True
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try: self.refresh()
+            except Exception as e: print(f"FEHLER beim Nachladen der Einstellungen: {e}")  # z.B. halb editierte Datei
+
+    def update(self, changes, expected_version=None):
+        """
+        Übernimmt Änderungen in Datei und Schnappschuss. Gelesen wird unter der Sperre frisch von
+        der Platte, damit Änderungen anderer Worker erhalten bleiben. Mit expected_version wird bei
+        abweichender '_version' ein VersionConflictError ausgelöst.
+        """
+        with self._lock, self._file_lock():
+            data = self._read()
+            current = data.get('_version', 0)
+            if expected_version is not None and expected_version != current:
+                raise VersionConflictError('settings', expected_version, current)
+            data.update(changes)
+            data['_version'] = current + 1
+            self._write(data)
+            self._signature = self._file_signature()
+            self._publish(data)
+        return self._snapshot
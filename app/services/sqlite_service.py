@@ -0,0 +1,287 @@
+# location: app/services/sqlite_service.py
+# after_fork: geerbte SQLite-Verbindungen verwerfen, jeder Gunicorn-Worker öffnet eigene.
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from ..config import Config
+from ..models.project import apply_node_changes, compute_progress, summary_source_fields, project_summary, SUMMARY_FIELDS
+from .pagination import parse_sort, clamp_limit, sort_value, encode_cursor, decode_cursor
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    owner TEXT,
+    created_at TEXT NOT NULL DEFAULT '',
+    name TEXT NOT NULL DEFAULT '',
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    email TEXT,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS project_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL UNIQUE
+);
+"""
+
+# Änderung eines Projekts vermerken: REPLACE löscht den alten Eintrag des Projekts, die neue Nummer ist die höchste
+RECORD_CHANGE = 'INSERT OR REPLACE INTO project_changes (project_id) VALUES (?)'
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_projects_owner ON projects(owner);
+CREATE INDEX IF NOT EXISTS idx_projects_created ON projects(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_name ON projects(name, id);
+CREATE INDEX IF NOT EXISTS idx_projects_owner_created ON projects(owner, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_projects_owner_name ON projects(owner, name, id);
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+"""
+
+# Upsert eines Projekts; '_version' im Dokument wird aus der gespeicherten Zeile hochgezählt (wie im JSON-Backend)
+PROJECT_UPSERT = ("INSERT OR REPLACE INTO projects (id, owner, created_at, name, doc) VALUES (?1, ?2, ?3, ?4, "
+                  "json_set(?5, '$._version', COALESCE((SELECT json_extract(doc, '$._version') FROM projects WHERE id = ?1), 0) + 1))")
+
+MEMBERS_TABLE = """
+CREATE TABLE project_members (
+    user_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, project_id)
+) WITHOUT ROWID;
+CREATE INDEX idx_project_members_project ON project_members(project_id);
+"""
+
+class SqliteService:
+    def __init__(self, app_config=None):
+        self.config = app_config if app_config else {}
+        self.debug_mode = self.config.get('APP_SETTINGS', {}).get('debug_mode', False)
+        self.db_path = Config.SQLITE_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(TABLES)
+        self._migrate(conn)
+        conn.executescript(INDEXES)
+        if self.config.get('SQLITE_IMPORT_JSON', True) and self.get_user_count() == 0 and not self._has_projects():
+            self.import_json(Config.JSON_PROJECTS_PATH, Config.JSON_USERS_PATH)
+
+    # --- Verbindungen ---
+    def after_fork(self):
+        """SQLite-Verbindungen dürfen nicht über fork hinweg benutzt werden: jeder Worker öffnet eigene."""
+        self._local = threading.local()
+
+    def _conn(self):
+        """Eine Verbindung pro Thread (sqlite3-Verbindungen sind nicht threadübergreifend nutzbar)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Schreibtransaktion; BEGIN IMMEDIATE holt die Schreibsperre sofort statt erst beim ersten UPDATE."""
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try: yield conn
+        except BaseException: conn.execute('ROLLBACK'); raise
+        else: conn.execute('COMMIT')
+
+    def _migrate(self, conn):
+        """Ergänzt Spalten/Tabellen älterer Datenbanken (Sortierspalte 'name', project_members, '_version') und füllt sie aus den Dokumenten."""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(projects)')}
+        if 'name' not in columns:
+            with self._transaction() as tx:
+                tx.execute("ALTER TABLE projects ADD COLUMN name TEXT NOT NULL DEFAULT ''")
+                tx.execute("UPDATE projects SET name = COALESCE(json_extract(doc, '$.name'), ''), created_at = COALESCE(created_at, '')")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'project_members'").fetchone() is None:
+            with self._transaction() as tx:
+                for statement in MEMBERS_TABLE.split(';'):
+                    if statement.strip(): tx.execute(statement)
+                tx.execute("INSERT OR IGNORE INTO project_members (user_id, project_id) "
+                           "SELECT m.value, p.id FROM projects p, json_each(p.doc, '$.members') m")
+        if conn.execute("SELECT 1 FROM projects WHERE json_type(doc, '$._version') IS NULL LIMIT 1").fetchone() is not None:
+            with self._transaction() as tx:
+                tx.execute("UPDATE projects SET doc = json_set(doc, '$._version', 1) WHERE json_type(doc, '$._version') IS NULL")
+
+    @staticmethod
+    def _normalize_email(email): return (email or '').strip().casefold()
+    @staticmethod
+    def _dump(doc): return json.dumps(doc, ensure_ascii=False, separators=(',', ':'))
+    def _project_row(self, project):
+        return (project['id'], project.get('owner'), sort_value(project, 'created_at'), sort_value(project, 'name'), self._dump(project))
+    def _user_row(self, user): return (user.get('id'), self._normalize_email(user.get('email')), self._dump(user))
+    def _upsert_sql(self, name):
+        if name == 'projects': return PROJECT_UPSERT, self._project_row
+        if name == 'users': return 'INSERT OR REPLACE INTO users (id, email, doc) VALUES (?, ?, ?)', self._user_row
+        raise ValueError(f"Unbekannte Collection: {name}")
+    def _has_projects(self): return self._conn().execute('SELECT 1 FROM projects LIMIT 1').fetchone() is not None
+
+    # --- Import ---
+    def import_json(self, projects_path, users_path):
+        """Einmaliger Import der bestehenden data/*.json-Dateien. Gibt (Projekte, Benutzer) zurück."""
+        projects, users = [], {}
+        try:
+            with open(projects_path, 'r', encoding='utf-8') as f: projects = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError): pass
+        try:
+            with open(users_path, 'r', encoding='utf-8') as f: users = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError): pass
+        for project in projects:
+            if not project.get('id'): project['id'] = str(uuid.uuid4())
+            if 'stats' not in project: compute_progress(project)
+        for user_id, user in users.items(): user.setdefault('id', user_id)
+        self.save_many('projects', [(p['id'], p) for p in projects])
+        self.save_many('users', list(users.items()))
+        if projects or users: print(f"SQLite: {len(projects)} Projekte und {len(users)} Benutzer aus JSON importiert.")
+        return len(projects), len(users)
+
+    # --- Massen-Export/-Import (siehe services/migration.py) ---
+    def iter_records(self, name, start_after=None, chunk_size=500):
+        """Generator über (id, Dokument) in id-Reihenfolge; der Cursor liefert blockweise, nie die ganze Tabelle."""
+        self._upsert_sql(name)  # prüft den Namen, bevor er in das SQL eingesetzt wird
+        cursor = self._conn().execute(f'SELECT id, doc FROM {name} WHERE id > ? ORDER BY id', (start_after or '',))
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows: return
+            for row in rows: yield row[0], json.loads(row[1])
+    def save_many(self, name, records):
+        """Schreibt (id, Dokument)-Paare mit einem executemany in einer Transaktion."""
+        sql, row_for = self._upsert_sql(name)
+        with self._transaction() as conn:
+            conn.executemany(sql, [row_for(record) for _, record in records])
+            if name == 'projects':
+                self._set_members(conn, [record for _, record in records])
+                conn.executemany(RECORD_CHANGE, [(key,) for key, _ in records])
+        return len(records)
+    @staticmethod
+    def _set_members(conn, projects):
+        """Gleicht project_members mit den 'members' der gespeicherten Projekte ab."""
+        conn.executemany('DELETE FROM project_members WHERE project_id = ?', [(project['id'],) for project in projects])
+        conn.executemany('INSERT OR IGNORE INTO project_members (user_id, project_id) VALUES (?, ?)',
+                         [(member, project['id']) for project in projects for member in project.get('members') or ()])
+
+    # --- Projekte ---
+    def get_all_projects(self):
+        return [json.loads(row[0]) for row in self._conn().execute('SELECT doc FROM projects ORDER BY rowid')]
+    def get_project(self, project_id):
+        row = self._conn().execute('SELECT doc FROM projects WHERE id = ?', (project_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    def get_projects(self, project_ids):
+        return self._get_many('projects', project_ids)
+    def _get_many(self, table, ids):
+        """Mehrere Dokumente per IN-Abfrage, in der Reihenfolge der übergebenen ids."""
+        ids = list(dict.fromkeys(ids))
+        docs = {}
+        for start in range(0, len(ids), 500):  # SQLite-Parameterlimit
+            chunk = ids[start:start + 500]
+            sql = f"SELECT id, doc FROM {table} WHERE id IN ({', '.join('?' * len(chunk))})"
+            docs.update((row[0], json.loads(row[1])) for row in self._conn().execute(sql, chunk))
+        return [docs[doc_id] for doc_id in ids if doc_id in docs]
+    def get_project_owner(self, project_id):
+        row = self._conn().execute('SELECT owner FROM projects WHERE id = ?', (project_id,)).fetchone()
+        return row[0] if row else None
+    def get_project_access(self, project_id):
+        """Besitzer und Mitglieder eines Projekts, ohne das Dokument zu laden."""
+        conn = self._conn()
+        row = conn.execute('SELECT owner FROM projects WHERE id = ?', (project_id,)).fetchone()
+        if row is None: return None
+        members = [r[0] for r in conn.execute('SELECT user_id FROM project_members WHERE project_id = ?', (project_id,))]
+        return {'owner': row[0], 'members': members}
+    def save_project(self, project_data):
+        if not project_data.get('id'): project_data['id'] = str(uuid.uuid4())
+        with self._transaction() as conn:
+            conn.execute(PROJECT_UPSERT, self._project_row(project_data))
+            self._set_members(conn, [project_data])
+            conn.execute(RECORD_CHANGE, (project_data['id'],))
+            project_data['_version'] = conn.execute("SELECT json_extract(doc, '$._version') FROM projects WHERE id = ?", (project_data['id'],)).fetchone()[0]
+        return project_data
+    def list_projects(self, owner=None, limit=20, cursor=None, sort_by='created_at', fields=None, member=None):
+        """Eine Seite Projektzusammenfassungen; Keyset-Bedingung und Projektion laufen in SQLite über die Indizes."""
+        field, descending = parse_sort(sort_by)
+        fields = tuple(fields or SUMMARY_FIELDS)
+        limit = clamp_limit(limit)
+        source = summary_source_fields(fields)
+        # Nur die benötigten Felder aus dem Dokument ziehen; die Struktur verlässt die Datenbank nicht
+        projection = ', '.join(f"'{name}', json_extract(doc, '$.{name}')" for name in source if name.isidentifier())
+        where, params = [], []
+        if owner is not None:
+            where.append('owner = ?'); params.append(owner)
+        if member is not None:
+            where.append('id IN (SELECT project_id FROM project_members WHERE user_id = ?)'); params.append(member)
+        cursor_key = decode_cursor(cursor)
+        if cursor_key:
+            where.append(f"({field}, id) {'<' if descending else '>'} (?, ?)"); params.extend(cursor_key)
+        direction = 'DESC' if descending else 'ASC'
+        sql = (f"SELECT {field}, id, json_object({projection}) FROM projects"
+               f"{' WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {field} {direction}, id {direction} LIMIT ?")
+        rows = self._conn().execute(sql, (*params, limit + 1)).fetchall()
+        page = rows[:limit]
+        items = [project_summary(json.loads(row[2]), fields) for row in page]
+        next_cursor = encode_cursor(page[-1][0], page[-1][1]) if len(rows) > limit else None
+        return {'items': items, 'next_cursor': next_cursor}
+    def update_project_node(self, project_id, node_id, changes):
+        """Ändert Felder eines einzelnen Knotens innerhalb einer Transaktion; gibt den Knoten zurück oder None."""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT doc FROM projects WHERE id = ?', (project_id,)).fetchone()
+            if not row: return None
+            project = json.loads(row[0])
+            node = apply_node_changes(project, node_id, changes)
+            if node is None: return None
+            project['_version'] = project.get('_version', 0) + 1
+            conn.execute('UPDATE projects SET doc = ? WHERE id = ?', (self._dump(project), project_id))
+            conn.execute(RECORD_CHANGE, (project_id,))
+        return node
+    def delete_project(self, project_id):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM project_members WHERE project_id = ?', (project_id,))
+            deleted = conn.execute('DELETE FROM projects WHERE id = ?', (project_id,)).rowcount > 0
+            if deleted: conn.execute(RECORD_CHANGE, (project_id,))
+            return deleted
+
+    # --- Änderungsfeed (Suchindex, Katalog) ---
+    def project_change_token(self):
+        """Token für den aktuellen Stand (höchste Änderungsnummer); gilt prozess- und neustartübergreifend."""
+        return self._conn().execute('SELECT COALESCE(MAX(seq), 0) FROM project_changes').fetchone()[0]
+    def project_changes(self, since):
+        """(neues Token, [(id, Projekt oder None = gelöscht), ...]) seit since - eine Abfrage über den seq-Index."""
+        rows = self._conn().execute('SELECT c.seq, c.project_id, p.doc FROM project_changes c LEFT JOIN projects p ON p.id = c.project_id '
+                                    'WHERE c.seq > ? ORDER BY c.seq', (since,)).fetchall()
+        return (rows[-1][0] if rows else since), [(row[1], json.loads(row[2]) if row[2] is not None else None) for row in rows]
+
+    # --- Benutzer ---
+    def get_all_users(self): return [json.loads(row[0]) for row in self._conn().execute('SELECT doc FROM users ORDER BY rowid')]
+    def get_user_count(self): return self._conn().execute('SELECT COUNT(*) FROM users').fetchone()[0]
+    def get_user(self, user_id):
+        row = self._conn().execute('SELECT doc FROM users WHERE id = ?', (user_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+    def get_users(self, user_ids): return self._get_many('users', user_ids)
+    def find_user_by_email(self, email):
+        row = self._conn().execute('SELECT doc FROM users WHERE email = ? LIMIT 1', (self._normalize_email(email),)).fetchone()
+        return json.loads(row[0]) if row else None
+    def save_user(self, user_data):
+        with self._transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO users (id, email, doc) VALUES (?, ?, ?)', self._user_row(user_data))
+        return user_data
+
+    def save_user_settings(self, user_id, settings):
+        """Speichert ein Einstellungs-Dictionary für einen Benutzer (SQLite-Version)."""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT doc FROM users WHERE id = ?', (user_id,)).fetchone()
+            if not row: return False
+            user = json.loads(row[0])
+            user['settings'] = settings
+            conn.execute('UPDATE users SET doc = ? WHERE id = ?', (self._dump(user), user_id))
+        return True
+
+    def get_user_settings(self, user_id):
+        """Lädt Einstellungen für einen bestimmten Benutzer (SQLite-Version)."""
+        user = self.get_user(user_id)
+        return user.get('settings', {}) if user else {}
@@ -0,0 +1,93 @@
+# location: app/services/telemetry.py
+# Request-Telemetrie im Ringpuffer; DataManager-Aufrufe über add_observer, after_fork legt die Sperre im Worker neu an.
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import g, has_request_context, request
+
+class Telemetry:
+    """
+    Sammelt pro Request einen Datensatz und legt ihn in einem begrenzten Ringpuffer ab
+    (TELEMETRY_BUFFER_SIZE). Jeder Datensatz hat eine fortlaufende Nummer 'seq', über die
+    Leser (JSON-Abruf mit ?since=, SSE mit Last-Event-ID) nur Neues abholen.
+    """
+    def __init__(self):
+        self.enabled = False
+        self._records = deque(maxlen=500)
+        self._seq = 0
+        self._changed = threading.Condition()
+        self._skip_prefixes = ()
+
+    def init_app(self, app, data_manager):
+        self.enabled = app.config.get('TELEMETRY_ENABLED', True)
+        if not self.enabled: return
+        with self._changed: self._records = deque(self._records, maxlen=app.config.get('TELEMETRY_BUFFER_SIZE', 500))
+        # Statische Dateien und die Telemetrie-Endpunkte selbst würden den Puffer nur fluten
+        self._skip_prefixes = (app.static_url_path or '/static', '/admin/api/telemetry')
+        data_manager.add_observer(self._observe)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+
+    def after_fork(self):
+        """Im per fork gestarteten Worker: neue Bedingungsvariable (ein Thread des Masters könnte sie gehalten haben)."""
+        self._changed = threading.Condition()
+
+    # --- DataManager ---
+    def _observe(self, name, seconds, args, result, error):
+        """Beobachter für DataManager.add_observer: zählt Aufrufe und Dauer im laufenden Request."""
+        stats = g.get('_telemetry') if has_request_context() else None
+        if stats is None: return
+        entry = stats['db'].setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    # --- Request-Hooks ---
+    def _tracked(self): return not request.path.startswith(self._skip_prefixes)
+
+    def _start(self):
+        if self._tracked(): g._telemetry = {'start': time.perf_counter(), 'db': {}}
+
+    def _finish(self, response):
+        stats = g.pop('_telemetry', None)
+        if stats is None: return response
+        duration = time.perf_counter() - stats['start']
+        db = {name: {'calls': calls, 'ms': round(seconds * 1000, 3)} for name, (calls, seconds) in stats['db'].items()}
+        record = {
+            'time': datetime.now().isoformat(timespec='milliseconds'),
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            'ms': round(duration * 1000, 3),
+            'bytes': response.content_length if not response.is_streamed else None,
+            'db_calls': sum(entry['calls'] for entry in db.values()),
+            'db_ms': round(sum(entry['ms'] for entry in db.values()), 3),
+            'db': db,
+        }
+        self.record(record)
+        return response
+
+    # --- Ringpuffer ---
+    def record(self, record):
+        with self._changed:
+            self._seq += 1
+            record['seq'] = self._seq
+            self._records.append(record)
+            self._changed.notify_all()
+
+    def since(self, seq=0, limit=None):
+        """Datensätze mit seq > seq (älteste zuerst), höchstens limit (die neuesten)."""
+        with self._changed:
+            records = [record for record in self._records if record['seq'] > seq]
+        return records[-limit:] if limit else records
+
+    @property
+    def last_seq(self): return self._seq
+
+    def wait(self, seq, timeout):
+        """Blockiert, bis es Datensätze nach seq gibt oder timeout abläuft (für SSE)."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._seq > seq, timeout=timeout)
+            return self._seq > seq
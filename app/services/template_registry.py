@@ -0,0 +1,120 @@
+# location: app/services/template_registry.py
+# Vorlagen-Registry: Projektvorlagen (JSON) werden einmal geladen, zu unveränderlichen Bauplänen kompiliert und schnell instanziiert.
+
+import glob
+import hashlib
+import json
+import os
+import uuid
+from ..models.project import Project
+
+# Erlaubter Kindknotentyp je Ebene (None = Wurzel, Unteraufgaben sind Blätter)
+CHILD_TYPES = {None: 'phase', 'phase': 'task', 'task': 'subtask', 'subtask': None}
+# Felder, die beim Instanziieren neu entstehen und deshalb nicht aus der Vorlage übernommen werden
+GENERATED_FIELDS = ('id', 'children', 'stats')
+
+def _compile(nodes, parent_type, source):
+    """
+    Wandelt die Knoten einer Vorlage in verschachtelte Tupel (Felder, Zähler, Kinder) um. Die Zähler
+    werden dabei einmal berechnet, beim Instanziieren müssen sie nur noch übernommen werden.
+    """
+    expected = CHILD_TYPES[parent_type]
+    compiled = []
+    for node in nodes:
+        if not isinstance(node, dict) or node.get('type') != expected or not node.get('name'):
+            raise ValueError(f"Vorlage {source}: erwartet '{expected}' mit Namen unter '{parent_type or 'Projekt'}', erhalten: {node!r}")
+        fields = {key: value for key, value in node.items() if key not in GENERATED_FIELDS}
+        if expected == 'subtask':
+            fields.setdefault('completed', False)
+            fields.setdefault('comment', '')
+            if node.get('children'): raise ValueError(f"Vorlage {source}: Unteraufgabe '{node['name']}' darf keine Kinder haben")
+            compiled.append((tuple(fields.items()), None, None))
+            continue
+        children = _compile(node.get('children') or [], expected, source)
+        if expected == 'task': completed, total = sum(1 for child in children if dict(child[0]).get('completed')), len(children)
+        else: completed, total = sum(child[1][0] for child in children), sum(child[1][1] for child in children)
+        compiled.append((tuple(fields.items()), (completed, total), tuple(children)))
+    return tuple(compiled)
+
+def _instantiate(compiled):
+    """Baut aus den kompilierten Knoten frische Dictionaries mit neuen ids."""
+    nodes = []
+    for fields, stats, children in compiled:
+        node = dict(fields)
+        node['id'] = str(uuid.uuid4())
+        if stats is not None:
+            node['stats'] = {'completed': stats[0], 'total': stats[1]}
+            node['children'] = _instantiate(children)
+        nodes.append(node)
+    return nodes
+
+class ProjectTemplate:
+    """Unveränderlicher Bauplan einer Vorlage: Schlüssel (Dateiname), Anzeigename und kompilierte Struktur."""
+    __slots__ = ('key', 'name', '_structure', '_stats')
+
+    def __init__(self, key, name, structure, source='?'):
+        self.key = key
+        self.name = name
+        self._structure = _compile(structure, None, source)
+        self._stats = (sum(phase[1][0] for phase in self._structure), sum(phase[1][1] for phase in self._structure))
+
+    def instantiate(self, name, **extra):
+        """Neues Projekt (Dictionary) mit dieser Struktur; extra (z.B. owner) wird mitgespeichert."""
+        project = Project(name=name, template=self.key).to_dict()
+        project.update(extra)
+        project['structure'] = _instantiate(self._structure)
+        project['stats'] = {'completed': self._stats[0], 'total': self._stats[1]}
+        return project
+
+class TemplateRegistry:
+    """
+    Lädt beim Start alle Vorlagen aus PROJECT_TEMPLATES_DIR (eine JSON-Datei je Vorlage, Dateiname =
+    Schlüssel). Fehlerhafte Vorlagen verhindern den Start, statt erst beim Anlegen aufzufallen.
+    """
+    def __init__(self):
+        self._templates = {}
+        self._data_manager = None
+        self.version = ''  # Hash über alle Vorlagendateien, z.B. für ETags von Seiten mit Vorlagenauswahl
+
+    def init_app(self, app, data_manager):
+        self._data_manager = data_manager
+        self.load(app.config['PROJECT_TEMPLATES_DIR'])
+
+    def load(self, directory):
+        templates, digest = {}, hashlib.sha1()
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            with open(path, 'rb') as f: raw = f.read()
+            digest.update(raw)
+            data = json.loads(raw)
+            key = os.path.splitext(os.path.basename(path))[0]
+            templates[key] = ProjectTemplate(key, data.get('name') or key, data.get('structure') or [], path)
+        self._templates, self.version = templates, digest.hexdigest()
+
+    def __contains__(self, key): return key in self._templates
+    def get(self, key): return self._templates.get(key)
+
+    def choices(self):
+        """[(Schlüssel, Anzeigename), ...] für Auswahllisten; das leere Projekt zuerst."""
+        return sorted(((key, template.name) for key, template in self._templates.items()), key=lambda choice: (choice[0] != 'leer', choice[1]))
+
+    def _template(self, key):
+        template = self._templates.get(key)
+        if template is None: raise KeyError(f"Unbekannte Vorlage: {key}")
+        return template
+
+    def create_project(self, key, name, **extra):
+        """Legt ein Projekt aus der Vorlage an und speichert es."""
+        return self._data_manager.save_project(self._template(key).instantiate(name, **extra))
+
+    def create_projects(self, key, entries):
+        """
+        Legt viele Projekte aus einer Vorlage mit einem einzigen save_many an (eine Dateischreibung bzw.
+        Transaktion statt einer je Projekt). entries: Namen oder Dictionaries {'name': ..., 'owner': ...}.
+        """
+        template = self._template(key)
+        projects = []
+        for entry in entries:
+            extra = dict(entry) if isinstance(entry, dict) else {'name': entry}
+            projects.append(template.instantiate(extra.pop('name'), **extra))
+        self._data_manager.save_many('projects', [(project['id'], project) for project in projects])
+        return projects
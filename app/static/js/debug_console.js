@@ -1,5 +1,5 @@
 // location: app/static/js/debug_console.js
-// Steuert die Funktionalität der globalen Live-Log-Konsole.
+// Steuert die Live-Log-Konsole; zeigt zusätzlich die Server-Telemetrie (SSE) als api_req/api_ans/database an.
 
 // Sofortige Initialisierung der globalen Log-Funktion
 window.log = (type, message) => {
@@ -112,6 +112,32 @@ XMLHttpRequest.prototype.send = function(data) {
     return originalXHRSend.apply(this, arguments);
 };
 
+// Server-Telemetrie: Requests, wie der Server sie gesehen hat (Dauer, Bytes, DataManager-Aufrufe)
+document.addEventListener('DOMContentLoaded', () => {
+    const streamUrl = window.TELEMETRY_STREAM_URL;
+    if (!streamUrl || !window.EventSource || localStorage.getItem('logs_enabled') !== 'true') return;
+
+    const SEQ_STORAGE_KEY = 'telemetry_last_seq';
+    const lastSeq = sessionStorage.getItem(SEQ_STORAGE_KEY);
+    const source = new EventSource(lastSeq ? `${streamUrl}?since=${lastSeq}` : streamUrl);
+
+    source.addEventListener('request', (event) => {
+        const record = JSON.parse(event.data);
+        sessionStorage.setItem(SEQ_STORAGE_KEY, record.seq);
+        const route = `${record.method} ${record.path}`;
+        const size = record.bytes !== null ? `, ${record.bytes} B` : '';
+        window.log('api_req', `[Server] ${route}`);
+        window.log('api_ans', `[Server] ${record.status} - ${route} (${record.ms.toFixed(1)} ms${size})`);
+        if (record.db_calls) {
+            const calls = Object.entries(record.db)
+                .map(([name, stats]) => `${name} ×${stats.calls} (${stats.ms.toFixed(1)} ms)`)
+                .join(', ');
+            window.log('database', `[Server] ${route}: ${record.db_calls} Aufrufe, ${record.db_ms.toFixed(1)} ms - ${calls}`);
+        }
+    });
+    window.addEventListener('beforeunload', () => source.close());
+});
+
 document.addEventListener('DOMContentLoaded', () => {
     const logConsole = document.getElementById('log-console');
     if (!logConsole) return;
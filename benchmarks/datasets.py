@@ -0,0 +1,62 @@
+# location: benchmarks/datasets.py
+# Erzeugt reproduzierbare synthetische Datensätze (Benutzer, Projekte mit wählbarer Baumtiefe und -breite).
+
+import random
+import uuid
+from datetime import datetime, timedelta
+
+NODE_TYPES = ('phase', 'task', 'subtask')
+PASSWORD = 'bench1234'
+
+def _uuid(rng): return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def generate_users(count, password_hash, seed=0):
+    """count Benutzer (der erste ist Admin), alle mit demselben vorab berechneten Hash von PASSWORD."""
+    rng = random.Random(seed)
+    users = []
+    for i in range(count):
+        users.append({
+            'id': _uuid(rng), 'username': f'Benutzer {i}', 'email': f'user{i}@bench.test',
+            'password_hash': password_hash, 'friends': [], 'is_admin': i == 0,
+            'user_settings': {'theme': 'dark', 'language': 'de', 'notifications': True},
+        })
+    return users
+
+def _nodes(rng, depth, width, level, prefix):
+    """Ebene level des Baums (0 = Phasen, 1 = Aufgaben, 2 = Unteraufgaben) mit je width Knoten."""
+    nodes = []
+    for i in range(1, width + 1):
+        number = f'{prefix}{i}.'
+        node = {'id': _uuid(rng), 'type': NODE_TYPES[level], 'name': f'{number} Knoten'}
+        if level + 1 < depth: node['children'] = _nodes(rng, depth, width, level + 1, number)
+        elif node['type'] == 'subtask': node.update(completed=rng.random() < 0.4, comment='')
+        nodes.append(node)
+    return nodes
+
+def generate_projects(count, owners, depth=3, width=4, seed=0):
+    """
+    count Projekte, reihum den owners (Benutzer-ids) zugeordnet. depth (1-3) ist die Zahl der Ebenen
+    (Phase/Aufgabe/Unteraufgabe), jede Ebene hat width Knoten je Elternknoten;
+    'stats' fehlt absichtlich und wird beim Speichern (DataManager.save_many) berechnet.
+    """
+    if not 1 <= depth <= len(NODE_TYPES): raise ValueError(f"depth muss zwischen 1 und {len(NODE_TYPES)} liegen.")
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    projects = []
+    for i in range(count):
+        projects.append({
+            'id': _uuid(rng), 'name': f'Projekt {i}', 'template': 'leer',
+            'created_at': (start + timedelta(minutes=i)).isoformat(),
+            'owner': owners[i % len(owners)] if owners else None,
+            'structure': _nodes(rng, depth, width, 0, ''),
+        })
+    return projects
+
+def leaf_ids(project):
+    """ids aller Blattknoten (für Änderungen per update_project_node)."""
+    stack, leaves = list(project['structure']), []
+    while stack:
+        node = stack.pop()
+        if node.get('children'): stack.extend(node['children'])
+        else: leaves.append(node['id'])
+    return leaves
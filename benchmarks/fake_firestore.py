@@ -0,0 +1,131 @@
+# location: benchmarks/fake_firestore.py
+# Lokaler Firestore-Ersatz im Speicher; kann auch array_contains-Filter und get(field_paths=...) für Mitgliederabfragen.
+
+"""
+Bildet die Teile von google.cloud.firestore.Client nach, die FirestoreService verwendet:
+collection/document/get/set/update/delete, get_all, batch und Abfragen mit where (==, array_contains), select,
+order_by, start_after und limit. Dokumente werden beim Schreiben und Lesen kopiert, wie es die
+Serialisierung über das Netz auch tut. Mit latency (Sekunden) kostet jeder Round-Trip zusätzlich
+eine feste Wartezeit; round_trips zählt sie. Transaktionen (update_project_node) fehlen.
+"""
+
+import copy
+import time
+from functools import cmp_to_key
+
+def _merge(target, data):
+    for key, value in data.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict): _merge(target[key], value)
+        else: target[key] = copy.deepcopy(value)
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference, self.id, self._data = reference, reference.id, data
+        self.exists = data is not None
+    def to_dict(self): return copy.deepcopy(self._data) if self._data is not None else None
+    def get(self, field): return (self._data or {}).get(field)
+
+class FakeDocument:
+    def __init__(self, collection, doc_id):
+        self._collection, self.id = collection, doc_id
+    def _snapshot(self): return FakeSnapshot(self, self._collection._docs.get(self.id))
+    def get(self, field_paths=None, transaction=None):
+        self._collection._client._round_trip()
+        snapshot = self._snapshot()
+        if field_paths is not None and snapshot.exists:
+            snapshot._data = {field: snapshot._data[field] for field in field_paths if field in snapshot._data}
+        return snapshot
+    def set(self, data, merge=False):
+        self._collection._client._round_trip()
+        self._apply_set(data, merge)
+    def update(self, data):
+        self._collection._client._round_trip()
+        self._apply_update(data)
+    def delete(self):
+        self._collection._client._round_trip()
+        self._collection._docs.pop(self.id, None)
+    def _apply_set(self, data, merge):
+        docs = self._collection._docs
+        if merge and self.id in docs: _merge(docs[self.id], data)
+        else: docs[self.id] = copy.deepcopy(data)
+    def _apply_update(self, data):
+        if self.id not in self._collection._docs: raise KeyError(f"Dokument {self.id} existiert nicht.")
+        self._collection._docs[self.id].update(copy.deepcopy(data))
+
+class FakeQuery:
+    OPERATORS = {'==': lambda actual, value: actual == value,
+                 'array_contains': lambda actual, value: isinstance(actual, list) and value in actual}
+
+    def __init__(self, collection, filters=(), fields=None, orders=(), cursor=None, count=None):
+        self._collection, self._filters, self._fields = collection, filters, fields
+        self._orders, self._cursor, self._count = orders, cursor, count
+
+    def _with(self, **changes):
+        state = dict(filters=self._filters, fields=self._fields, orders=self._orders, cursor=self._cursor, count=self._count)
+        state.update(changes)
+        return FakeQuery(self._collection, **state)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None: field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        if op_string not in self.OPERATORS: raise NotImplementedError(f"FakeFirestore unterstützt {op_string} nicht.")
+        return self._with(filters=self._filters + ((field_path, self.OPERATORS[op_string], value),))
+    def select(self, field_paths): return self._with(fields=tuple(field_paths))
+    def order_by(self, field_path, direction='ASCENDING'): return self._with(orders=self._orders + ((field_path, direction == 'DESCENDING'),))
+    def start_after(self, values): return self._with(cursor=values)
+    def limit(self, count): return self._with(count=count)
+
+    def _key(self, doc_id, data):
+        return [doc_id if field == '__name__' else data.get(field) for field, _ in self._orders]
+
+    def _compare(self, left, right):
+        for (_, descending), a, b in zip(self._orders, left, right):
+            a, b = (a is not None, a), (b is not None, b)  # None zuerst, wie Firestores Null-Ordnung
+            if a != b: return (1 if a > b else -1) * (-1 if descending else 1)
+        return 0
+
+    def stream(self):
+        self._collection._client._round_trip()
+        docs = [(doc_id, data) for doc_id, data in self._collection._docs.items()
+                if all(matches(data.get(field), value) for field, matches, value in self._filters)]
+        if self._orders:
+            docs.sort(key=cmp_to_key(lambda a, b: self._compare(self._key(*a), self._key(*b))))
+            if self._cursor is not None:
+                cursor = [self._cursor.get(field) for field, _ in self._orders]
+                docs = [doc for doc in docs if self._compare(self._key(*doc), cursor) > 0]
+        if self._count is not None: docs = docs[:self._count]
+        for doc_id, data in docs:
+            if self._fields is not None: data = {field: data[field] for field in self._fields if field in data}
+            yield FakeSnapshot(self._collection.document(doc_id), data)
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, name):
+        self._client, self.id = client, name
+        self._docs = client._data.setdefault(name, {})
+        super().__init__(self)
+    def document(self, doc_id): return FakeDocument(self, doc_id)
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client, self._ops = client, []
+    def set(self, reference, data, merge=False): self._ops.append(lambda: reference._apply_set(data, merge))
+    def update(self, reference, data): self._ops.append(lambda: reference._apply_update(data))
+    def delete(self, reference): self._ops.append(lambda: reference._collection._docs.pop(reference.id, None))
+    def commit(self):
+        self._client._round_trip()
+        for op in self._ops: op()
+        self._ops = []
+
+class FakeFirestore:
+    """In-Memory-Ersatz für firestore.Client (siehe Modul-Docstring)."""
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.round_trips = 0
+        self._data = {}
+    def _round_trip(self):
+        self.round_trips += 1
+        if self.latency: time.sleep(self.latency)
+    def collection(self, name): return FakeCollection(self, name)
+    def batch(self): return FakeBatch(self)
+    def get_all(self, references):
+        self._round_trip()
+        return [reference._snapshot() for reference in references]
@@ -0,0 +1,60 @@
+# location: benchmarks/login_benchmark.py
+# Misst den Login-Durchsatz (Logins/s) über den Flask-Testclient mit einem temporären Datenverzeichnis.
+
+"""
+Aufruf aus dem Projektverzeichnis:
+    python benchmarks/login_benchmark.py [--logins 50] [--method scrypt:32768:8:1] [--mode offline]
+
+Legt in einem temporären Verzeichnis einen Testbenutzer an und meldet ihn wiederholt über
+POST /auth/login an. Ausgegeben werden Logins/s sowie die Zeit pro Login; mit --method lässt
+sich der Einfluss des Hash-Verfahrens (PASSWORD_HASH_METHOD) vergleichen.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def main():
+    parser = argparse.ArgumentParser(description='Login-Durchsatz messen.')
+    parser.add_argument('--logins', type=int, default=50)
+    parser.add_argument('--method', help='Hash-Verfahren, Standard: Config.PASSWORD_HASH_METHOD')
+    parser.add_argument('--mode', choices=['offline', 'journal', 'sqlite'], default='offline')
+    args = parser.parse_args()
+
+    from app.config import Config
+    data_dir = tempfile.mkdtemp(prefix='projektplaner-bench-')
+    Config.JSON_USERS_PATH = os.path.join(data_dir, 'users.json')
+    Config.JSON_PROJECTS_PATH = os.path.join(data_dir, 'projects.json')
+    Config.JSON_JOURNAL_PATH = os.path.join(data_dir, 'journal.log')
+    Config.SQLITE_PATH = os.path.join(data_dir, 'projektplaner.db')
+    Config.SEARCH_INDEX_PATH = os.path.join(data_dir, 'search_index.json')
+    if args.method: Config.PASSWORD_HASH_METHOD = args.method
+
+    try:
+        from app import create_app
+        app = create_app(mode=args.mode, settings={'test_mode': True})
+        client = app.test_client()
+        credentials = {'email': 'testuser@test.at', 'password': 'test1234'}
+        client.post('/auth/login', data=credentials)  # Aufwärmen (Caches, Hash-Präfix)
+        timings = []
+        for _ in range(args.logins):
+            start = time.perf_counter()
+            response = client.post('/auth/login', data=credentials)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 302 or not response.location.endswith('/projects/dashboard'):
+                sys.exit(f"Login fehlgeschlagen: {response.status_code} {response.location}")
+        total = sum(timings)
+        print(f"Verfahren: {Config.PASSWORD_HASH_METHOD} | Modus: {args.mode}")
+        print(f"{args.logins} Logins in {total:.2f}s -> {args.logins / total:.1f} Logins/s "
+              f"(Median {statistics.median(timings) * 1000:.1f} ms)")
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+# location: benchmarks/suite.py
+# Benchmark-Suite: Backend-Operationen und Hot-Routes bei mehreren Datensatzgrößen, Ergebnisse als JSON mit Regressionsvergleich.
+
+"""
+Aufruf aus dem Projektverzeichnis:
+    python benchmarks/suite.py [--sizes 100,1000] [--users 50] [--depth 3] [--width 4]
+                               [--iterations 200] [--backends offline,journal,sqlite,firestore]
+                               [--output benchmarks/results/lauf.json] [--compare alter_lauf.json]
+
+Für jede Größe (Anzahl Projekte) und jedes Backend wird in einem temporären Verzeichnis ein
+synthetischer Datensatz angelegt (siehe datasets.py). Gemessen werden die DataManager-Operationen
+und die Routen /projects/dashboard, /projects/<id>/checklist, /auth/login und /admin/ über den
+Flask-Testclient. Ausgegeben werden p50/p95/p99 und Durchsatz; mit --output werden die Ergebnisse
+als JSON gespeichert, mit --compare gegen einen früheren Lauf verglichen (Exit-Code 1, wenn ein
+p50 um mehr als --threshold langsamer geworden ist).
+
+'firestore' nutzt FirestoreService mit dem lokalen FakeFirestore (fake_firestore.py); die
+Firebase-Anmeldung (/auth/login) und update_project_node (Transaktion) entfallen dort.
+Telemetrie und Profiling sind abgeschaltet, außer mit --instrumented.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datasets import PASSWORD, generate_projects, generate_users, leaf_ids
+from fake_firestore import FakeFirestore
+
+BACKENDS = {'offline': 'offline', 'journal': 'journal', 'sqlite': 'sqlite', 'firestore': 'cloud'}
+
+def summarize(timings):
+    """p50/p95/p99 und Mittelwert in Millisekunden sowie Durchsatz (Aufrufe/s) einer Messreihe."""
+    ms = sorted(t * 1000 for t in timings)
+    cuts = statistics.quantiles(ms, n=100, method='inclusive') if len(ms) > 1 else ms * 99
+    return {'n': len(ms), 'p50_ms': round(cuts[49], 4), 'p95_ms': round(cuts[94], 4), 'p99_ms': round(cuts[98], 4),
+            'mean_ms': round(statistics.fmean(ms), 4), 'ops_per_s': round(len(ms) / (sum(ms) / 1000), 1) if sum(ms) else None}
+
+def measure(fn, iterations, warmup=3):
+    for _ in range(min(warmup, iterations)): fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return summarize(timings)
+
+def _configure(data_dir, instrumented):
+    from app.config import Config
+    Config.JSON_USERS_PATH = os.path.join(data_dir, 'users.json')
+    Config.JSON_PROJECTS_PATH = os.path.join(data_dir, 'projects.json')
+    Config.JSON_JOURNAL_PATH = os.path.join(data_dir, 'journal.log')
+    Config.SQLITE_PATH = os.path.join(data_dir, 'projektplaner.db')
+    Config.SQLITE_IMPORT_JSON = False
+    Config.SETTINGS_PATH = os.path.join(data_dir, 'settings.json')
+    Config.SEARCH_INDEX_PATH = os.path.join(data_dir, 'search_index.json')
+    Config.FIRESTORE_ASYNC = False
+    Config.TELEMETRY_ENABLED = Config.PROFILING_ENABLED = instrumented
+
+def _login(client, backend, user):
+    """Meldet den Client an; bei Firestore direkt über die Session, da Firebase Auth fehlt."""
+    if backend != 'firestore':
+        response = client.post('/auth/login', data={'email': user['email'], 'password': PASSWORD})
+        if response.status_code != 302: sys.exit(f"Login fehlgeschlagen ({backend}): {response.status_code}")
+        return
+    with client.session_transaction() as session:
+        session.update(user_id=user['id'], username=user['username'], is_admin=user['is_admin'])
+
+def run_backend(backend, size, args, password_hash):
+    """Misst ein Backend bei einer Datensatzgröße; gibt eine Liste von Ergebnis-Einträgen zurück."""
+    data_dir = tempfile.mkdtemp(prefix='projektplaner-bench-')
+    _configure(data_dir, args.instrumented)
+    try:
+        from app import create_app
+        from app.extensions import data_manager
+        app = create_app(mode=BACKENDS[backend], settings={})
+        fake = None
+        if backend == 'firestore':
+            fake = data_manager._service.db = FakeFirestore(latency=args.firestore_latency)
+
+        users = generate_users(args.users, password_hash, seed=args.seed)
+        projects = generate_projects(size, [u['id'] for u in users], args.depth, args.width, seed=args.seed)
+        start = time.perf_counter()
+        data_manager.save_many('users', [(u['id'], u) for u in users])
+        data_manager.save_many('projects', [(p['id'], p) for p in projects])
+        load_seconds = time.perf_counter() - start
+
+        rng = random.Random(args.seed)
+        ids = [p['id'] for p in projects]
+        leaves = {p['id']: leaf_ids(p) for p in rng.sample(projects, min(20, len(projects)))}
+        owner = users[-1]['id']
+        n = args.iterations
+        rows = [dict(kind='load', name='save_many', n=1, seconds=round(load_seconds, 3))]
+
+        def toggle():
+            project_id = rng.choice(list(leaves))
+            node_id = rng.choice(leaves[project_id])
+            field = {'completed': rng.random() < 0.5} if args.depth == 3 else {'name': f'Knoten {rng.random():.6f}'}
+            data_manager.update_project_node(project_id, node_id, field)
+
+        def save():
+            project = data_manager.get_project(rng.choice(ids))
+            project['name'] = f'Projekt {rng.random():.6f}'
+            data_manager.save_project(project)
+
+        operations = {
+            'get_project': lambda: data_manager.get_project(rng.choice(ids)),
+            'get_project_view': lambda: data_manager.get_project_view(rng.choice(ids)),
+            'get_projects[10]': lambda: data_manager.get_projects(rng.sample(ids, min(10, len(ids)))),
+            'list_projects': lambda: data_manager.list_projects(limit=24, sort_by='-created_at'),
+            'list_projects[owner]': lambda: data_manager.list_projects(owner=owner, limit=24, sort_by='-created_at'),
+            'get_user': lambda: data_manager.get_user(rng.choice(users)['id']),
+            'get_all_users': data_manager.get_all_users,
+            'save_project': save,
+            'update_project_node': toggle,
+            'iter_records': lambda: sum(1 for _ in data_manager.iter_records('projects')),
+        }
+        if backend != 'firestore':
+            operations['find_user_by_email'] = lambda: data_manager.find_user_by_email(rng.choice(users)['email'])
+        else:
+            del operations['update_project_node']
+        full_scans = {'iter_records', 'get_all_users'}
+        with app.app_context():
+            for name, fn in operations.items():
+                round_trips = fake.round_trips if fake else None
+                iterations = max(5, n // 10) if name in full_scans else n
+                row = dict(kind='operation', name=name, **measure(fn, iterations))
+                if fake: row['round_trips'] = round((fake.round_trips - round_trips) / (iterations + min(3, iterations)), 2)
+                rows.append(row)
+
+        client = app.test_client()
+        admin, user = users[0], users[-1]
+        routes = {
+            'GET /projects/dashboard': lambda: client.get('/projects/dashboard'),
+            'GET /projects/<id>/checklist': lambda: client.get(f'/projects/{rng.choice(ids)}/checklist'),
+            'GET /admin/': lambda: client.get('/admin/'),
+        }
+        _login(client, backend, admin)
+        for name, fn in routes.items():
+            status = fn().status_code
+            if status != 200: sys.exit(f"{name} liefert {status} ({backend})")
+            rows.append(dict(kind='route', name=name, **measure(fn, n)))
+        if backend != 'firestore':
+            login_client = app.test_client()
+            rows.append(dict(kind='route', name='POST /auth/login', **measure(lambda: _login(login_client, backend, user), max(5, n // 10), warmup=1)))
+
+        for row in rows: row.update(backend=backend, size=size)
+        return rows
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+def _key(row): return (row['backend'], row['size'], row['kind'], row['name'])
+
+# Parameter, die die Messwerte beeinflussen; weichen sie ab, ist der Vergleich nur eingeschränkt aussagekräftig
+COMPARABLE_ARGS = ('users', 'depth', 'width', 'iterations', 'seed', 'firestore_latency', 'instrumented')
+
+def compare(rows, args, previous_path, threshold):
+    """Vergleicht p50 mit einem früheren Lauf; gibt die Zahl der Regressionen zurück."""
+    with open(previous_path, 'r', encoding='utf-8') as f: data = json.load(f)
+    previous = {_key(row): row for row in data['results']}
+    regressions = 0
+    print(f"\nVergleich mit {previous_path} (Schwelle +{threshold:.0%} auf p50):")
+    old_args = data.get('meta', {}).get('args', {})
+    differing = [name for name in COMPARABLE_ARGS if name in old_args and old_args[name] != getattr(args, name)]
+    if differing: print(f"  ACHTUNG: abweichende Parameter ({', '.join(differing)})")
+    for row in rows:
+        old = previous.get(_key(row))
+        if not old or 'p50_ms' not in row or not old.get('p50_ms'): continue
+        change = row['p50_ms'] / old['p50_ms'] - 1
+        if change > threshold:
+            regressions += 1
+            print(f"  LANGSAMER {row['backend']:9} {row['size']:>6} {row['name']:28} {old['p50_ms']:.3f} -> {row['p50_ms']:.3f} ms ({change:+.0%})")
+        elif change < -threshold:
+            print(f"  schneller {row['backend']:9} {row['size']:>6} {row['name']:28} {old['p50_ms']:.3f} -> {row['p50_ms']:.3f} ms ({change:+.0%})")
+    if not regressions: print("  keine Regressionen")
+    return regressions
+
+def _git_commit():
+    try: return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError): return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Backends und Hot-Routes bei mehreren Datensatzgrößen messen.')
+    parser.add_argument('--sizes', default='100,1000', help='Anzahl Projekte, kommagetrennt')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--depth', type=int, choices=[1, 2, 3], default=3, help='Ebenen: Phase/Aufgabe/Unteraufgabe')
+    parser.add_argument('--width', type=int, default=4, help='Kindknoten je Knoten')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--firestore-latency', type=float, default=0.0, help='simulierte Sekunden pro Firestore-Round-Trip')
+    parser.add_argument('--instrumented', action='store_true', help='Telemetrie und Profiling eingeschaltet lassen')
+    parser.add_argument('--output', help='Ergebnisse als JSON speichern')
+    parser.add_argument('--compare', help='früheres Ergebnis-JSON zum Vergleich')
+    parser.add_argument('--threshold', type=float, default=0.2, help='erlaubte Verschlechterung von p50 (0.2 = 20 %%)')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    backends = [name for name in args.backends.split(',') if name]
+    unknown = set(backends) - set(BACKENDS)
+    if unknown: parser.error(f"unbekannte Backends: {', '.join(sorted(unknown))}")
+
+    from app.config import Config
+    from werkzeug.security import generate_password_hash
+    password_hash = generate_password_hash(PASSWORD, method=Config.PASSWORD_HASH_METHOD)  # einmal, für alle Benutzer
+
+    rows = []
+    for size in sizes:
+        for backend in backends:
+            print(f"\n== {backend} | {size} Projekte | {args.users} Benutzer | Tiefe {args.depth} x Breite {args.width} ==")
+            for row in run_backend(backend, size, args, password_hash):
+                rows.append(row)
+                if row['kind'] == 'load': print(f"  Laden: {row['seconds']:.2f}s")
+                else: print(f"  {row['name']:30} p50 {row['p50_ms']:8.3f}  p95 {row['p95_ms']:8.3f}  p99 {row['p99_ms']:8.3f} ms  {row['ops_per_s'] or 0:9.1f}/s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        meta = {'time': datetime.now().isoformat(timespec='seconds'), 'commit': _git_commit(), 'python': platform.python_version(),
+                'platform': platform.platform(), 'hash_method': Config.PASSWORD_HASH_METHOD,
+                'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')}}
+        with open(args.output, 'w', encoding='utf-8') as f: json.dump({'meta': meta, 'results': rows}, f, indent=2)
+        print(f"\nErgebnisse gespeichert: {args.output}")
+    if args.compare and compare(rows, args, args.compare, args.threshold): sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# location: /gunicorn.conf.py
+# Gunicorn-Konfiguration: Worker/Threads aus der Umgebung, preload_app mit neuen Sperren im Worker nach dem Fork.
+
+"""
+Start: 'python run.py serve [--mode ...] [--workers N] [--threads N]' oder direkt
+'PROJEKTPLANER_MODE=sqlite gunicorn -c gunicorn.conf.py wsgi:app'.
+
+- gthread-Worker: jeder Prozess bedient GUNICORN_THREADS Requests gleichzeitig; die Telemetrie-
+  Konsole (SSE) hält pro offenem Tab einen Thread belegt.
+- preload_app: die App (Daten-Cache, Suchindex, Katalog) wird einmal im Master geladen und per
+  fork an die Worker weitergegeben (copy-on-write). Im Cloud-Modus standardmäßig aus, weil
+  gRPC-Verbindungen des Firestore-Clients einen fork nicht überstehen.
+- Neu laden: 'kill -HUP <master>' startet die Worker neu (mit preload_app ohne neuen Code),
+  ein Deployment mit neuem Code per 'kill -USR2 <master>' und danach 'kill -QUIT <alter master>'.
+  Laufende Requests dürfen graceful_timeout Sekunden fertig werden.
+"""
+
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from run import resolve_mode
+
+mode = os.environ['PROJEKTPLANER_MODE'] = resolve_mode()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+preload_app = os.environ.get('GUNICORN_PRELOAD', '0' if mode == 'cloud' else '1') == '1'
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+# Worker nach so vielen Requests ersetzen (0 = nie); die Streuung verhindert gleichzeitige Neustarts
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+# Sessions im Speicher sieht nur der Worker, der sie angelegt hat - bei mehreren Workern in SQLite
+# (muss vor dem Import der App gesetzt sein, Config liest SESSION_BACKEND beim Import)
+if workers > 1 and not os.environ.get('SESSION_BACKEND'):
+    os.environ['SESSION_BACKEND'] = 'sqlite'
+
+def when_ready(server):
+    server.log.info(f"Projektplaner im Modus '{mode}': {workers} Worker x {threads} Threads, "
+                    f"preload_app={preload_app}, Sessions: {os.environ.get('SESSION_BACKEND', 'memory')}")
+
+def post_fork(server, worker):
+    """
+    Mit preload_app erbt der Worker die geladene App, aber keine Threads - und womöglich gehaltene Sperren.
+    Der Master startet keine Hintergrund-Threads; Watcher und Kompaktierer entstehen erst im Worker.
+    """
+    if not preload_app: return
+    from app import after_fork
+    from wsgi import app
+    after_fork(app)
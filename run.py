@@ -1,5 +1,5 @@
 # location: /run.py
-# Fügt einen Zeitstempel zur Startnachricht des Servers hinzu.
+# 'python run.py serve': Produktionsbetrieb mit Gunicorn (ohne Rückfrage); ohne Argumente weiter der Entwicklungsserver.
 
 import os
 import sys
@@ -7,6 +7,7 @@ import json
 from datetime import datetime # NEU: Import für Zeitstempel
 
 MODE_CACHE_FILE = '.mode_cache'
+MODES = ['offline', 'cloud', 'journal', 'sqlite']
 
 # --- (Funktionen für Tastatureingabe, save_mode, load_mode, select_mode bleiben unverändert) ---
 try:
@@ -37,7 +38,8 @@ def load_mode():
     return None
 
 def select_mode():
-    options = ["Offline (lokale JSON-Dateien)", "Cloud (Google Firestore)"]
+    options = ["Offline (lokale JSON-Dateien)", "Cloud (Google Firestore)", "Journal (JSON-Snapshot + Append-only-Log)", "SQLite (lokale Datenbank)"]
+    modes = MODES
     selected = 0
     while True:
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -55,23 +57,114 @@ def select_mode():
             if final_key == b'A': selected = (selected - 1) % len(options)
             elif final_key == b'B': selected = (selected + 1) % len(options)
         elif key in [b'\r', b'\n']:
-            mode = 'cloud' if selected == 1 else 'offline'
+            mode = modes[selected]
             os.system('cls' if os.name == 'nt' else 'clear')
             return mode
 # --- (Ende der unveränderten Funktionen) ---
 
 def load_settings():
-    """Lädt die globalen Einstellungen aus settings.json."""
+    """Lädt die globalen Einstellungen aus settings.json (Pfad: Config.SETTINGS_PATH)."""
+    from app.config import Config
     try:
-        with open('settings.json', 'r', encoding='utf-8') as f:
+        with open(Config.SETTINGS_PATH, 'r', encoding='utf-8') as f:
             return json.load(f)
     except (FileNotFoundError, json.JSONDecodeError):
         default_settings = {"debug_mode": False}
-        with open('settings.json', 'w', encoding='utf-8') as f:
+        with open(Config.SETTINGS_PATH, 'w', encoding='utf-8') as f:
             json.dump(default_settings, f, indent=2)
         return default_settings
 
+def resolve_mode(mode=None):
+    """Betriebsmodus ohne Rückfrage: Argument, sonst PROJEKTPLANER_MODE, sonst der zuletzt gewählte, sonst offline."""
+    mode = mode or os.environ.get('PROJEKTPLANER_MODE') or load_mode() or 'offline'
+    if mode not in MODES: raise ValueError(f"Unbekannter Modus '{mode}' (erlaubt: {', '.join(MODES)})")
+    return mode
+
+def run_server(argv):
+    """
+    Startet Gunicorn mit gunicorn.conf.py und wsgi:app, z.B.:
+        python run.py serve --mode sqlite --workers 4 --threads 8 --bind 0.0.0.0:8000
+    Die Optionen werden als Umgebungsvariablen an gunicorn.conf.py/wsgi.py weitergereicht, damit
+    'gunicorn -c gunicorn.conf.py wsgi:app' mit denselben Variablen genauso startet.
+    """
+    import argparse
+    parser = argparse.ArgumentParser(prog='run.py serve', description='Produktionsserver (Gunicorn) starten.')
+    parser.add_argument('--mode', choices=MODES, help='Betriebsmodus (Standard: PROJEKTPLANER_MODE bzw. zuletzt gewählt)')
+    parser.add_argument('--workers', type=int, help='Anzahl Worker-Prozesse (Standard: 2 x CPU-Kerne + 1)')
+    parser.add_argument('--threads', type=int, help='Threads je Worker (Standard: 4; SSE-Verbindungen belegen je einen)')
+    parser.add_argument('--bind', help='Adresse, z.B. 0.0.0.0:8000 oder unix:/run/projektplaner.sock')
+    parser.add_argument('--no-preload', action='store_true', help='App in jedem Worker laden statt einmal vor dem Fork')
+    args = parser.parse_args(argv)
+
+    os.environ['PROJEKTPLANER_MODE'] = resolve_mode(args.mode)
+    for name, value in (('GUNICORN_WORKERS', args.workers), ('GUNICORN_THREADS', args.threads), ('GUNICORN_BIND', args.bind)):
+        if value is not None: os.environ[name] = str(value)
+    if args.no_preload: os.environ['GUNICORN_PRELOAD'] = '0'
+    root = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(root)
+    os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '--config', os.path.join(root, 'gunicorn.conf.py'), 'wsgi:app'])
+
+def run_migration(argv):
+    """
+    Datentransfer zwischen Backends, z.B.:
+        python run.py export --from offline > daten.jsonl
+        python run.py import --to cloud < daten.jsonl
+        python run.py export --from sqlite | python run.py import --to cloud --checkpoint import.ckpt
+    """
+    import argparse
+    from app.config import Config
+    from app.extensions import data_manager
+    from app.services.migration import COLLECTIONS, CHUNK_SIZE, export_records, import_records, load_checkpoint
+
+    parser = argparse.ArgumentParser(prog='run.py', description='Projekte und Benutzer als JSON-Lines exportieren/importieren.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_parser = commands.add_parser('export', help='Datensätze eines Backends nach stdout (oder --output) schreiben')
+    export_parser.add_argument('--from', dest='mode', choices=MODES, required=True)
+    export_parser.add_argument('--only', choices=COLLECTIONS, action='append', help='nur diese Collection(s) exportieren')
+    export_parser.add_argument('--output', '-o', help='Zieldatei (wird beim Fortsetzen angehängt)')
+    export_parser.add_argument('--checkpoint', help='Checkpoint-Datei zum Fortsetzen nach einem Abbruch')
+    import_parser = commands.add_parser('import', help='Datensätze von stdin (oder --input) in ein Backend schreiben')
+    import_parser.add_argument('--to', dest='mode', choices=MODES, required=True)
+    import_parser.add_argument('--input', '-i', help='Quelldatei statt stdin')
+    import_parser.add_argument('--checkpoint', help='Checkpoint-Datei zum Fortsetzen nach einem Abbruch')
+    import_parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    # Keine Test-Benutzer, kein Beispielprojekt und kein automatischer JSON-Import: nur das nackte Backend
+    data_manager.init_app(args.mode, app_config={'APP_SETTINGS': load_settings(), 'SQLITE_IMPORT_JSON': False,
+                                                  'FIRESTORE_ASYNC': Config.FIRESTORE_ASYNC})
+    if args.command == 'export':
+        offset = load_checkpoint(args.checkpoint, 'export').get('offset')
+        if args.output and offset is not None and os.path.exists(args.output):
+            # Fortsetzen: alles nach dem letzten Checkpoint wird erneut exportiert, also abschneiden
+            out = open(args.output, 'r+', encoding='utf-8')
+            out.truncate(offset)
+            out.seek(offset)
+        elif args.output: out = open(args.output, 'w', encoding='utf-8')
+        else:
+            sys.stdout.reconfigure(encoding='utf-8')
+            out = sys.stdout
+        try: export_records(data_manager, out, collections=tuple(args.only or COLLECTIONS), checkpoint=args.checkpoint)
+        finally:
+            if out is not sys.stdout: out.close()
+    else:
+        if args.input: lines = open(args.input, 'r', encoding='utf-8')
+        else:
+            sys.stdin.reconfigure(encoding='utf-8')
+            lines = sys.stdin
+        try: import_records(data_manager, lines, checkpoint=args.checkpoint, chunk_size=max(1, args.chunk_size))
+        finally:
+            if lines is not sys.stdin: lines.close()
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in ('export', 'import'):
+        try: run_migration(sys.argv[1:])
+        except (ValueError, ConnectionError) as e: sys.exit(f"FEHLER: {e}")
+        sys.exit(0)
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        try: run_server(sys.argv[2:])
+        except ValueError as e: sys.exit(f"FEHLER: {e}")
+
     from app import create_app
     
     final_mode = None
@@ -81,11 +174,17 @@ if __name__ == '__main__':
     elif '--offline' in sys.argv:
         final_mode = 'offline'
         save_mode(final_mode)
+    elif '--journal' in sys.argv:
+        final_mode = 'journal'
+        save_mode(final_mode)
+    elif '--sqlite' in sys.argv:
+        final_mode = 'sqlite'
+        save_mode(final_mode)
     
     if final_mode is None:
         force_select = '--force-select' in sys.argv
         last_mode = load_mode()
-        if force_select or last_mode not in ['offline', 'cloud']:
+        if force_select or last_mode not in MODES:
             final_mode = select_mode()
             save_mode(final_mode)
         else:
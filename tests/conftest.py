@@ -0,0 +1,29 @@
+# location: tests/conftest.py
+# Gemeinsame Fixtures: Speicherpfade auf ein temporäres Verzeichnis umbiegen, App im Test-Modus erzeugen.
+
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Leeres Datenverzeichnis; projects.json, users.json, Journal und SQLite-Dateien liegen darin."""
+    for attr, name in (('JSON_PROJECTS_PATH', 'projects.json'), ('JSON_USERS_PATH', 'users.json'),
+                       ('JSON_JOURNAL_PATH', 'journal.log'), ('SQLITE_PATH', 'projektplaner.db'),
+                       ('SESSION_SQLITE_PATH', 'sessions.db'), ('SEARCH_INDEX_PATH', 'search_index.json')):
+        monkeypatch.setattr(Config, attr, str(tmp_path / name))
+    return tmp_path
+
+@pytest.fixture
+def make_app(data_dir):
+    """Erzeugt die App für ein Backend ('offline', 'journal', 'sqlite') mit den Test-Benutzern (Passwort test1234)."""
+    from app import create_app
+    def make(mode='offline'):
+        app = create_app(mode, {'test_mode': True})
+        app.config['TESTING'] = True
+        return app
+    return make
@@ -0,0 +1,45 @@
+# location: tests/test_admin.py
+# Admin-Routen und Zugriff: Massenanlage mit Standardbesitzer, Projekte ohne Besitzer nur für Administratoren bis zur Zuordnung.
+
+from app.extensions import data_manager, template_registry
+
+def _login(client, email='testadmin@test.at'):
+    return client.post('/auth/login', data={'email': email, 'password': 'test1234'})
+
+def _template():
+    return template_registry.choices()[0][0]
+
+def test_bulk_create_defaults_owner_to_caller(make_app):
+    client = make_app().test_client()
+    _login(client)
+    admin = data_manager.find_user_by_email('testadmin@test.at')
+    user = data_manager.find_user_by_email('testuser@test.at')
+    response = client.post('/admin/api/projects/bulk', json={
+        'template': _template(), 'projects': ['Ohne Besitzer', {'name': 'Mit Besitzer', 'owner': user['id']}]})
+    assert response.status_code == 201
+    owners = [data_manager.get_project(project_id)['owner'] for project_id in response.get_json()['ids']]
+    assert owners == [admin['id'], user['id']]
+
+def test_bulk_create_rejects_unknown_owner(make_app):
+    client = make_app().test_client()
+    _login(client)
+    before = len(data_manager.get_all_projects())
+    response = client.post('/admin/api/projects/bulk', json={
+        'template': _template(), 'projects': [{'name': 'Verwaist', 'owner': 'gibt-es-nicht'}]})
+    assert response.status_code == 400
+    assert 'gibt-es-nicht' in response.get_json()['message']
+    assert len(data_manager.get_all_projects()) == before
+
+def test_unowned_project_needs_admin_until_assigned(make_app):
+    client = make_app().test_client()
+    project = data_manager.save_project({'name': 'Altbestand', 'structure': []})
+    _login(client, 'testuser@test.at')
+    assert client.post(f'/projects/{project["id"]}/visibility', json={'public': True}).status_code == 403
+    assert client.get(f'/projects/{project["id"]}/editor').status_code == 403
+    assert not data_manager.get_project(project['id']).get('public')
+
+    admin = client.application.test_client()
+    _login(admin)
+    user = data_manager.find_user_by_email('testuser@test.at')
+    assert admin.post('/admin/api/projects/assign-owner', json={'owner': user['id']}).status_code == 200
+    assert client.post(f'/projects/{project["id"]}/visibility', json={'public': True}).status_code == 200
@@ -0,0 +1,21 @@
+# location: tests/test_auth.py
+# Benutzer-Einstellungen: ein Versionskonflikt beim Speichern ergibt 409 statt 500, der Cache bleibt unverändert.
+
+from app.extensions import data_manager
+from app.services.json_service import VersionConflictError
+
+def _login(client, email='testuser@test.at'):
+    return client.post('/auth/login', data={'email': email, 'password': 'test1234'})
+
+def test_preference_conflict_returns_409(make_app, monkeypatch):
+    client = make_app().test_client()
+    _login(client)
+    user_id = data_manager.find_user_by_email('testuser@test.at')['id']
+    before = data_manager.get_user(user_id).get('user_settings')
+
+    def conflict(user_data): raise VersionConflictError('users', 1, 2)
+    monkeypatch.setattr(data_manager, 'save_user', conflict)
+    response = client.post('/auth/api/update-user-preferences', json={'setting': 'theme', 'value': 'light'})
+    assert response.status_code == 409
+    assert response.get_json()['retryable'] is True
+    assert data_manager.get_user(user_id).get('user_settings') == before
@@ -0,0 +1,75 @@
+# location: tests/test_change_feed.py
+# Änderungsfeed: Schreibvorgänge eines Workers erreichen Feed, Suchindex und Katalog eines anderen ohne Komplettlauf.
+
+import pytest
+from app.services.change_feed import ChangeLog
+from app.services.journal_service import JournalService
+from app.services.json_service import JsonService
+from app.services.search_index import SearchIndex
+from app.services.sqlite_service import SqliteService
+from .test_journal_service import _project
+
+BACKENDS = {'offline': JsonService, 'journal': JournalService, 'sqlite': SqliteService}
+
+def test_change_log_evicts_and_truncates():
+    log = ChangeLog(max_entries=2)
+    start = log.token()
+    log.record('a')
+    log.record('b')
+    log.record('a')
+    assert log.since(start) == (3, [('b', None), ('a', None)])
+    log.record('c')  # verdrängt 'b' (Nummer 2)
+    assert log.since(start) is None
+    assert log.since(2) == (4, [('a', None), ('c', None)])
+    log.truncate()
+    assert log.since(4) is None and log.since(log.token()) == (log.token(), [])
+
+@pytest.mark.parametrize('mode', BACKENDS)
+def test_writes_of_other_workers_reach_the_feed(data_dir, mode):
+    writer, reader = BACKENDS[mode](), BACKENDS[mode]()  # zwei Worker auf denselben Dateien
+    writer.save_project(_project('keep'))
+    writer.save_project(_project('gone'))
+    token = reader.project_change_token()
+
+    writer.save_project(_project('new'))
+    writer.update_project_node('keep', 'keep-s', {'comment': 'Neuer Kommentar'})
+    writer.delete_project('gone')
+
+    token, changes = reader.project_changes(token)
+    changes = dict(changes)
+    assert set(changes) == {'new', 'keep', 'gone'}
+    assert changes['gone'] is None
+    assert changes['keep']['structure'][0]['children'][0]['children'][0]['comment'] == 'Neuer Kommentar'
+    assert reader.project_changes(token) == (token, [])
+
+@pytest.mark.parametrize('mode', BACKENDS)
+def test_search_index_catches_up_from_feed(data_dir, mode):
+    writer, reader = BACKENDS[mode](), BACKENDS[mode]()
+    writer.save_project(_project('alt'))
+    index = SearchIndex()
+    index.path, index.save_delay, index.poll_interval = str(data_dir / 'search_index.json'), 0, 0
+    index._data_manager = reader
+    assert [hit['project_id'] for hit in index.search('alt')] == ['alt']
+
+    reader.iter_records = None  # ab hier darf kein Komplettlauf mehr stattfinden
+    project = _project('frisch')
+    project['name'] = 'Frischer Auftrag'
+    writer.save_project(project)
+    writer.delete_project('alt')
+    assert [hit['project_id'] for hit in index.search('frisch')] == ['frisch']
+    assert index.search('alt') == []
+
+@pytest.mark.parametrize('mode', BACKENDS)
+def test_catalog_catches_up_from_feed(data_dir, mode):
+    from app.services.catalog import PublicCatalog
+    writer, reader = BACKENDS[mode](), BACKENDS[mode]()
+    catalog = PublicCatalog()
+    catalog.poll_interval, catalog._data_manager = 0, reader
+    assert len(catalog) == 0
+
+    reader.iter_records = None  # ab hier darf kein Komplettlauf mehr stattfinden
+    writer.save_project(dict(_project('offen'), public=True, template='software'))
+    assert [entry['id'] for entry in catalog.page()['items']] == ['offen']
+    assert catalog.popular_templates() == [('software', 1)]
+    writer.save_project(dict(writer.get_project('offen'), public=False))
+    assert catalog.page()['items'] == []
@@ -0,0 +1,40 @@
+# location: tests/test_fork.py
+# Gunicorn preload_app: der Master startet beim Laden keine Threads, after_fork legt alle Sperren im Worker neu an.
+
+import multiprocessing
+import os
+import threading
+import pytest
+from app import after_fork, warm_caches
+from app.extensions import data_manager, profiler, render_cache, settings_service, telemetry
+
+@pytest.mark.parametrize('mode', ['offline', 'journal', 'sqlite'])
+def test_loading_starts_no_threads(make_app, mode):
+    before = set(threading.enumerate())
+    app = make_app(mode)
+    for i in range(3): data_manager.save_project({'name': f'Projekt {i}', 'structure': []})
+    warm_caches()
+    assert set(threading.enumerate()) - before == set()
+
+    app.test_client().get('/auth/login')
+    assert settings_service._watcher_pid == os.getpid()
+
+def _worker(app):
+    after_fork(app)
+    data_manager.get_all_projects()
+    app.test_client().get('/discover')
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='benötigt fork')
+def test_after_fork_replaces_observer_locks(make_app):
+    app = make_app()
+    # Beim fork gehaltene Sperren gehören im Kind niemandem mehr
+    held = [profiler._lock, render_cache._lock, telemetry._changed]
+    for lock in held: lock.acquire()
+    try:
+        process = multiprocessing.get_context('fork').Process(target=_worker, args=(app,))
+        process.start()
+        process.join(30)
+    finally:
+        for lock in held: lock.release()
+    if process.is_alive(): process.kill()
+    assert process.exitcode == 0
@@ -0,0 +1,66 @@
+# location: tests/test_journal_service.py
+# Kompaktierung des Journals bei gleichzeitigen Schreibern/Kompaktierern (mehrere Gunicorn-Worker).
+
+import multiprocessing
+import threading
+import time
+import pytest
+from app.services.journal_service import JournalService
+from .test_json_service import _project
+
+CONFIG = {'JOURNAL_COMPACT_THRESHOLD': 10 ** 6, 'JOURNAL_FSYNC': False}  # nur explizit kompaktieren
+
+def test_concurrent_compaction_keeps_interleaved_writes(data_dir):
+    first, second = JournalService(CONFIG), JournalService(CONFIG)  # wie zwei Prozesse: eigene Caches und Sperr-Deskriptoren
+    for i in range(5): first.save_project(_project(f'a{i}'))
+
+    # Der erste Kompaktierer hängt mitten im Schreiben seines Snapshots ...
+    in_snapshot, release = threading.Event(), threading.Event()
+    write_data = first._write_data
+    def slow_write(file_path, data):
+        in_snapshot.set()
+        release.wait(5)
+        write_data(file_path, data)
+    first._write_data = slow_write
+    compacting = threading.Thread(target=first.compact)
+    compacting.start()
+    assert in_snapshot.wait(5)
+
+    # ... während der zweite schreibt, ein Projekt ändert und selbst kompaktiert
+    def write_and_compact():
+        for i in range(5): second.save_project(_project(f'b{i}'))
+        second.save_project(dict(_project('a0'), name='a0 geändert'))
+        second.compact()
+    writing = threading.Thread(target=write_and_compact)
+    writing.start()
+    time.sleep(0.2)
+    release.set()
+    compacting.join(5)
+    writing.join(5)
+    assert not compacting.is_alive() and not writing.is_alive()
+
+    fresh = JournalService(CONFIG)
+    assert {project['id'] for project in fresh.get_all_projects()} == {f'a{i}' for i in range(5)} | {f'b{i}' for i in range(5)}
+    assert fresh.get_project('a0')['name'] == 'a0 geändert'
+    # Der Snapshot allein (ohne Journal) enthält bereits alles
+    assert fresh.journal_stats()['entries'] == 0
+
+def _worker(prefix, count):
+    service = JournalService(CONFIG)
+    for i in range(count):
+        service.save_project(_project(f'{prefix}{i}'))
+        service.save_project(dict(_project(f'{prefix}{i}'), name=f'{prefix}{i} geändert'))
+        if i % 5 == 4: service.compact()
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='benötigt fork')
+def test_compaction_across_processes(data_dir):
+    JournalService(CONFIG)  # Dateien anlegen, bevor die Prozesse starten
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_worker, args=(prefix, 30)) for prefix in 'xyz']
+    for process in processes: process.start()
+    for process in processes: process.join(60)
+    assert all(process.exitcode == 0 for process in processes)
+
+    projects = JournalService(CONFIG).get_all_projects()
+    assert len(projects) == 90
+    assert all(project['name'] == f"{project['id']} geändert" for project in projects)
@@ -0,0 +1,50 @@
+# location: tests/test_json_service.py
+# JSON-Backend: gelesene und per save_many gespeicherte Datensätze teilen keine verschachtelten Felder mit dem Cache; Knoten-Patches behalten den Knoten-Index.
+
+from app.services.json_service import JsonService
+
+def _project(project_id):
+    return {'id': project_id, 'name': project_id, 'structure': [
+        {'id': f'{project_id}-p', 'type': 'phase', 'name': 'Phase', 'children': [
+            {'id': f'{project_id}-t', 'type': 'task', 'name': 'Aufgabe', 'children': [
+                {'id': f'{project_id}-s', 'type': 'subtask', 'name': 'Unteraufgabe', 'completed': False, 'comment': ''}]}]}]}
+
+def test_reads_do_not_share_nested_fields_with_the_cache(data_dir):
+    service = JsonService()
+    service.save_user({'id': 'u1', 'email': 'u1@test.at', 'user_settings': {'x': 1}, 'settings': {'theme': 'dark'}})
+    service.save_project(_project('p'))
+
+    service.get_user('u1')['user_settings']['x'] = 99
+    service.find_user_by_email('u1@test.at')['user_settings']['x'] = 99
+    service.get_user_settings('u1')['theme'] = 'light'
+    service.get_project('p')['structure'][0]['name'] = 'Geändert'
+    service.get_all_projects()[0]['structure'].clear()
+    assert service.get_user('u1')['user_settings'] == {'x': 1}
+    assert service.get_user_settings('u1') == {'theme': 'dark'}
+    assert service.get_project('p')['structure'][0]['name'] != 'Geändert'
+
+    # Auch was nach dem Speichern am übergebenen Dictionary geändert wird, landet nicht im Cache
+    project = _project('q')
+    service.save_project(project)
+    project['structure'].clear()
+    assert service.get_project('q')['structure']
+
+def test_save_many_stores_copies(data_dir):
+    service = JsonService()
+    records = [('r', _project('r'))]
+    service.save_many('projects', records)
+    records[0][1]['structure'].clear()
+    assert service.get_project('r')['structure']
+
+def test_node_patch_keeps_node_index(data_dir):
+    service = JsonService()
+    service.save_project(_project('p'))
+    collection = service._projects()
+    index = collection.node_index('p')
+
+    assert service.update_project_node('p', 'p-s', {'completed': True})['completed'] is True
+    assert service._projects().node_index('p') is index
+    assert service.get_project('p')['stats'] == {'completed': 1, 'total': 1}
+
+    service.save_project(_project('p'))  # neuer Datensatz: Index wird neu aufgebaut
+    assert service._projects().node_index('p') is not index
@@ -0,0 +1,21 @@
+# location: tests/test_main.py
+# /discover: die Einträge verlinken eine öffentliche Übersicht, die auch ohne Anmeldung erreichbar ist.
+
+from app.extensions import data_manager
+
+def _save(name, public):
+    return data_manager.save_project({'name': name, 'public': public, 'owner': 'someone', 'structure': [
+        {'id': 'p', 'type': 'phase', 'name': 'Sichtbare Phase', 'children': []}]})
+
+def test_discover_links_open_without_login(make_app):
+    client = make_app().test_client()
+    shared, hidden = _save('Geteilt', True), _save('Geheim', False)
+
+    page = client.get('/discover').get_data(as_text=True)
+    assert f'/discover/{shared["id"]}' in page
+
+    response = client.get(f'/discover/{shared["id"]}')
+    assert response.status_code == 200
+    assert 'Sichtbare Phase' in response.get_data(as_text=True)
+    assert 'Öffentlich teilen' not in response.get_data(as_text=True) and 'Privat machen' not in response.get_data(as_text=True)
+    assert client.get(f'/discover/{hidden["id"]}').status_code == 404
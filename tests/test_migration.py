@@ -0,0 +1,32 @@
+# location: tests/test_migration.py
+# Import über import_records: das JSON-Backend schreibt die Datei einmal pro Collection, nicht einmal pro Block.
+
+import io
+import json
+from app.extensions import data_manager
+from app.services.json_service import JsonService
+from app.services.migration import export_records, import_records
+
+def _lines(count):
+    return [json.dumps({'c': 'projects', 'id': f'p{i:04d}', 'doc': {'name': f'Projekt {i}', 'structure': []}}) + '\n' for i in range(count)]
+
+class _Silent:
+    """Durchsatzanzeige ohne Ausgabe."""
+    count = 0
+    def add(self, records=1, size=0): self.count += records
+    def report(self, final=False): pass
+
+def test_import_rewrites_json_file_once(make_app, monkeypatch):
+    make_app()
+    written = []
+    original = JsonService._write_data
+    def counting(self, file_path, data):
+        written.append(file_path)
+        return original(self, file_path, data)
+    monkeypatch.setattr(JsonService, '_write_data', counting)
+
+    assert import_records(data_manager, _lines(1200), chunk_size=500, meter=_Silent()) == 1200
+    assert len(written) == 1
+    out = io.StringIO()
+    export_records(data_manager, out, collections=('projects',), meter=_Silent())
+    assert sum(1 for line in out.getvalue().splitlines() if json.loads(line)['id'].startswith('p')) == 1200
@@ -0,0 +1,26 @@
+# location: tests/test_pagination.py
+# Keyset-Cursor: manipulierte Cursor führen zu ValueError (400), nicht zu TypeError (500).
+
+import base64
+import json
+import pytest
+from app.services.json_service import JsonService
+from app.services.pagination import decode_cursor, encode_cursor
+
+def _raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor('2024-01-01', 'abc')) == ('2024-01-01', 'abc')
+    assert decode_cursor(None) is None
+
+@pytest.mark.parametrize('payload', [[1, 2], ['a', 2], [None, 'b'], [['a'], 'b'], 'ab', {'a': 1}])
+def test_cursor_rejects_non_string_pairs(payload):
+    with pytest.raises(ValueError):
+        decode_cursor(_raw_cursor(payload))
+
+def test_list_projects_rejects_forged_cursor(data_dir):
+    service = JsonService()
+    service.save_project({'id': 'p', 'name': 'p', 'created_at': '2024-01-01', 'structure': []})
+    with pytest.raises(ValueError):
+        service.list_projects(cursor=_raw_cursor([1, 2]))
@@ -0,0 +1,40 @@
+# location: tests/test_profiling.py
+# Profiler: Prometheus-Export je Worker, keine Nutzlast-Messung für große Ergebnisse, Schreibvorgänge mit ihren Daten.
+
+import os
+from app.services.profiling import DataManagerProfiler, payload_size
+
+class _Backend:
+    def backend_name(self): return 'json'
+
+def _profiler():
+    profiler = DataManagerProfiler()
+    profiler._data_manager, profiler.sample_every, profiler.max_entries = _Backend(), 1, 100
+    return profiler
+
+def test_export_is_labelled_with_worker_pid():
+    profiler = _profiler()
+    profiler.observe('get_user', 0.001, ('u',), {'id': 'u'}, None)
+    assert f'operation="get_user",worker="{os.getpid()}"' in profiler.prometheus()
+
+def test_large_results_are_not_measured():
+    assert payload_size([{'id': str(i)} for i in range(101)], max_entries=100) is None
+    assert payload_size({'structure': [{'children': [{'id': 'x'}] * 60}] * 2}, max_entries=100) is None
+    assert payload_size({'id': 'x'}, max_entries=100) == len('{"id":"x"}')
+
+    profiler = _profiler()
+    profiler.observe('get_all_projects', 0.01, (), [{'id': str(i)} for i in range(500)], None)
+    assert profiler.summary()[0]['bytes_per_call'] is None
+
+def test_writes_measure_the_written_data():
+    records = [('p1', {'id': 'p1', 'name': 'Erstes Projekt'}), ('p2', {'id': 'p2', 'name': 'Zweites Projekt'})]
+    calls = [
+        ('save_many', ('projects', records), len('[["p1",{"id":"p1","name":"Erstes Projekt"}],["p2",{"id":"p2","name":"Zweites Projekt"}]]')),
+        ('save_user_settings', ('u1', {'theme': 'light'}), len('{"theme":"light"}')),
+        ('update_project_node', ('p1', 'n1', {'completed': True}), len('{"completed":true}')),
+        ('save_project', ({'id': 'p1', 'name': 'Erstes Projekt'},), len('{"id":"p1","name":"Erstes Projekt"}')),
+    ]
+    profiler = _profiler()
+    for name, args, _ in calls: profiler.observe(name, 0.001, args, None, None)
+    sizes = {entry['operation']: entry['bytes_per_call'] for entry in profiler.summary()}
+    assert sizes == {name: size for name, _, size in calls}
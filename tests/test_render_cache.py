@@ -0,0 +1,35 @@
+# location: tests/test_render_cache.py
+# Seiten-Cache: öffentliche anonyme Seiten mit Vary: Cookie, gespeicherte '_version' in allen Offline-Backends.
+
+import pytest
+from app.extensions import data_manager
+
+def _login(client, email='testadmin@test.at'):
+    return client.post('/auth/login', data={'email': email, 'password': 'test1234'})
+
+def test_public_pages_vary_on_cookie(make_app):
+    client = make_app().test_client()
+    response = client.get('/discover')
+    assert response.headers['Cache-Control'].startswith('public')
+    assert 'Cookie' in response.vary
+
+    _login(client)
+    response = client.get('/discover')
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+
+@pytest.mark.parametrize('mode', ['offline', 'journal', 'sqlite'])
+def test_writes_stamp_project_version(make_app, mode):
+    make_app(mode)
+    project = data_manager.save_project({'name': 'Versioniert', 'structure': [
+        {'id': 'p', 'type': 'phase', 'name': 'Phase', 'children': [
+            {'id': 't', 'type': 'task', 'name': 'Aufgabe', 'children': [
+                {'id': 's', 'type': 'subtask', 'name': 'Unteraufgabe', 'completed': False, 'comment': ''}]}]}]})
+    first = data_manager.get_project(project['id'])['_version']
+    assert first == project['_version']
+
+    data_manager.update_project_node(project['id'], 's', {'completed': True})
+    second = data_manager.get_project(project['id'])['_version']
+    assert second > first
+
+    data_manager.save_project(data_manager.get_project(project['id']))
+    assert data_manager.get_project(project['id'])['_version'] > second
@@ -0,0 +1,15 @@
+# location: /wsgi.py
+# WSGI-Einstiegspunkt für Gunicorn (gunicorn -c gunicorn.conf.py wsgi:app); Modus aus PROJEKTPLANER_MODE, ohne Rückfrage.
+
+import os
+import sys
+from app import create_app, warm_caches
+from run import load_settings, resolve_mode
+
+try: mode = resolve_mode()
+except ValueError as e: sys.exit(f"FEHLER: {e}")
+
+app = create_app(mode=mode, settings=load_settings())
+
+# Im Cloud-Modus würde das Vorladen die ganze Collection lesen - dort nur auf ausdrücklichen Wunsch
+if os.environ.get('PROJEKTPLANER_WARM', '0' if mode == 'cloud' else '1') == '1': warm_caches()